@@ -15,6 +15,7 @@ from app.models.application import Application
 from app.models.comment import FeedbackComment
 from app.models.feedback import Feedback
 from app.models.interview import Interview
+from app.models.job_offer import JobIngestionState, JobOffer
 from app.models.question_answer import QuestionAnswer
 from app.models.resume_models import Education, Language, Project, Skill, WorkExperience
 from app.models.user import User
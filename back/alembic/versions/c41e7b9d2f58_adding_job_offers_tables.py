@@ -0,0 +1,64 @@
+"""adding job offers tables
+Revision ID: c41e7b9d2f58
+Revises: 1598313bc3fa
+Create Date: 2026-10-18 10:12:44.318027
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c41e7b9d2f58"
+down_revision: str | None = "1598313bc3fa"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "job_offers",
+        sa.Column("id", sa.String(), nullable=False),
+        sa.Column("intitule", sa.String(), nullable=True),
+        sa.Column("departement", sa.String(), nullable=True),
+        sa.Column("grand_domaine", sa.String(), nullable=True),
+        sa.Column("data", sa.JSON(), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("date_creation", sa.DateTime(), nullable=True),
+        sa.Column("date_actualisation", sa.DateTime(), nullable=True),
+        sa.Column("fetched_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index(
+        op.f("ix_job_offers_departement"), "job_offers", ["departement"], unique=False
+    )
+    op.create_index(
+        op.f("ix_job_offers_grand_domaine"),
+        "job_offers",
+        ["grand_domaine"],
+        unique=False,
+    )
+    op.create_index(
+        op.f("ix_job_offers_date_actualisation"),
+        "job_offers",
+        ["date_actualisation"],
+        unique=False,
+    )
+
+    op.create_table(
+        "job_ingestion_state",
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("high_water_mark", sa.DateTime(), nullable=True),
+        sa.Column("last_run_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("scope"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("job_ingestion_state")
+    op.drop_index(op.f("ix_job_offers_date_actualisation"), table_name="job_offers")
+    op.drop_index(op.f("ix_job_offers_grand_domaine"), table_name="job_offers")
+    op.drop_index(op.f("ix_job_offers_departement"), table_name="job_offers")
+    op.drop_table("job_offers")
@@ -0,0 +1,377 @@
+"""Full-duplex WebSocket interview session endpoint"""
+
+import asyncio
+import json
+import logging
+from dataclasses import dataclass
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO
+
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
+
+from app.core.auth import decode_supabase_token
+from app.core.config import settings
+from app.db import SessionLocal
+from app.models.user import User
+from app.services.interview_service import InterviewSession, interview_service
+from app.services.streaming_transcriber import (
+    SUPPORTED_SAMPLE_RATES,
+    StreamingTranscriber,
+)
+from app.services.voice_service import voice_service
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+
+class SessionSender:
+    """Serializes sends from the turn, TTS and heartbeat tasks on one socket."""
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self._lock = asyncio.Lock()
+
+    async def json(self, data: dict):
+        async with self._lock:
+            await self.websocket.send_text(json.dumps(data, default=str))
+
+    async def bytes(self, data: bytes):
+        async with self._lock:
+            await self.websocket.send_bytes(data)
+
+
+def _authenticate(token: str) -> int:
+    """Resolve a Supabase access token to the local user id."""
+    claims = decode_supabase_token(token)
+    supabase_id = claims.get("sub")
+    if not supabase_id:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid Supabase token: missing subject",
+        )
+
+    db = SessionLocal()
+    try:
+        user = db.query(User).filter(User.supabase_id == supabase_id).first()
+        if not user:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED, detail="Unknown user"
+            )
+        return user.id
+    finally:
+        db.close()
+
+
+def _open_session(interview_id: int, user_id: int) -> InterviewSession:
+    db = SessionLocal()
+    try:
+        return interview_service.open_session(db, interview_id, user_id)
+    finally:
+        db.close()
+
+
+def _new_audio_buffer() -> SpooledTemporaryFile:
+    """Turn audio buffer that stays in memory unless the answer is unusually long."""
+    return SpooledTemporaryFile(max_size=settings.AUDIO_SPOOL_MAX_BYTES)
+
+
+async def _heartbeat(sender: SessionSender):
+    """Keep idle connections alive through proxies."""
+    while True:
+        await asyncio.sleep(settings.WS_HEARTBEAT_INTERVAL)
+        await sender.json({"type": "ping"})
+
+
+@dataclass
+class LiveTurn:
+    """One turn running in the background while the socket keeps receiving."""
+
+    task: asyncio.Task | None = None
+    # The candidate's answer once transcribed
+    transcription: str | None = None
+    # Whether the answer and reply were saved (the turn can no longer be retried)
+    persisted: bool = False
+
+    @property
+    def running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+
+async def _run_turn(
+    sender: SessionSender,
+    session: InterviewSession,
+    language: str,
+    turn: LiveTurn,
+    audio: BinaryIO | None = None,
+    transcription: str | None = None,
+):
+    """
+    Run one interview turn: push transcription and reply text events, and
+    stream TTS audio as binary frames while the reply is still being generated.
+
+    The answer is either recorded `audio` (transcribed here) or a
+    `transcription` already produced while the candidate was speaking.
+    Progress is recorded on `turn`, so an interrupted turn can be resumed.
+    """
+    text_queue: asyncio.Queue[str | None] = asyncio.Queue()
+
+    async def reply_text():
+        while (chunk := await text_queue.get()) is not None:
+            yield chunk
+
+    async def speak():
+        async for audio_chunk in voice_service.text_to_speech_pipeline(reply_text()):
+            await sender.bytes(audio_chunk)
+
+    tts_task = asyncio.create_task(speak())
+    try:
+        async for event in interview_service.process_session_turn(
+            session, audio, language=language, transcription=transcription
+        ):
+            if event["type"] == "transcription":
+                turn.transcription = event["text"]
+            elif event["type"] == "delta":
+                text_queue.put_nowait(event["text"])
+            elif event["type"] == "done":
+                turn.persisted = True
+            await sender.json(event)
+
+        text_queue.put_nowait(None)
+        await tts_task
+        await sender.json({"type": "audio_end"})
+    finally:
+        if not tts_task.done():
+            tts_task.cancel()
+
+
+async def _answer_turn(
+    sender: SessionSender,
+    session: InterviewSession,
+    language: str,
+    turn: LiveTurn,
+    audio: BinaryIO | None = None,
+    streaming: StreamingTranscriber | None = None,
+    carried: str | None = None,
+):
+    """
+    Transcribe an answer (live stream or recorded audio) and run its turn.
+
+    `carried` is the transcript of an interrupted, unsaved answer, merged in
+    front of this one. Errors are reported to the client as `error` frames.
+    """
+    try:
+        transcription = None
+        if streaming is not None:
+            # A failed segment raises rather than saving a partial answer
+            transcription = await streaming.finish()
+            if not transcription and not carried:
+                await sender.json({"type": "error", "detail": "No speech detected"})
+                return
+        elif carried and audio is not None:
+            transcription = await voice_service.transcribe_audio(
+                audio, language=language
+            )
+        if carried:
+            transcription = f"{carried} {transcription or ''}".strip()
+
+        await _run_turn(
+            sender,
+            session,
+            language,
+            turn,
+            audio=audio if transcription is None else None,
+            transcription=transcription,
+        )
+    except Exception as e:
+        logger.error(f"Error processing live turn: {str(e)}")
+        logger.exception("Full traceback:")
+        await sender.json({"type": "error", "detail": str(e)})
+    finally:
+        if streaming is not None:
+            await streaming.cancel()
+        if audio is not None:
+            audio.close()
+
+
+async def _interrupt(turn: LiveTurn) -> str | None:
+    """
+    Cancel a running turn.
+
+    Returns:
+        The transcript to merge into the next answer if the interrupted one
+        was not saved, else None
+    """
+    turn.task.cancel()
+    await asyncio.gather(turn.task, return_exceptions=True)
+    return None if turn.persisted else turn.transcription
+
+
+@router.websocket("/interviews/{interview_id}")
+async def interview_session(websocket: WebSocket, interview_id: int, token: str):
+    """
+    Live interview session over a single authenticated WebSocket.
+
+    The access token is passed as the `token` query parameter and checked once
+    at connection time. Protocol:
+
+    - client -> server: binary frames carry the candidate's recorded audio;
+      `{"type": "end_of_turn", "language": "fr"}` submits the buffered audio;
+      `{"type": "start_stream", "sample_rate": 16000, "language": "fr"}` switches
+      the current turn to live 16-bit mono PCM, transcribed while it arrives;
+      `{"type": "interrupt"}` stops the interviewer's reply (barge-in);
+      `{"type": "end_interview"}` ends the interview and closes the session.
+    - server -> client: `ready`, `partial_transcription` while a live stream is
+      being transcribed, then per turn `transcription`, `delta` text
+      events, binary MP3 frames, `done` (with the persisted question id) and
+      `audio_end`; `interrupted` after a barge-in; `summary` after
+      `end_interview`; `error` and `ping` at any time.
+
+    Turns run in the background, so the socket keeps receiving while the reply
+    is generated and spoken: audio for the next answer can be sent early, and
+    `interrupt` or `start_stream` during a turn cancels it. If the interrupted
+    answer was not saved yet, its transcript is merged into the next answer.
+    """
+    try:
+        user_id = _authenticate(token)
+        session = _open_session(interview_id, user_id)
+    except (HTTPException, ValueError) as e:
+        logger.warning(f"Rejected WebSocket for interview {interview_id}: {e}")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    sender = SessionSender(websocket)
+    heartbeat = asyncio.create_task(_heartbeat(sender))
+    audio_buffer = _new_audio_buffer()
+    transcriber: StreamingTranscriber | None = None
+    turn = LiveTurn()
+    # Transcript of an interrupted answer that was not saved
+    carried: str | None = None
+
+    async def send_partial(text: str):
+        await sender.json({"type": "partial_transcription", "text": text})
+
+    await sender.json(
+        {
+            "type": "ready",
+            "session_id": str(session.interview_id),
+            "interviewer_style": session.interviewer_style,
+            "question_count": session.question_count,
+            "pending_question": session.pending_question,
+        }
+    )
+
+    try:
+        while True:
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                break
+
+            if message.get("bytes") is not None:
+                if transcriber is not None:
+                    transcriber.feed(message["bytes"])
+                else:
+                    audio_buffer.write(message["bytes"])
+                continue
+
+            try:
+                data = json.loads(message.get("text") or "{}")
+            except json.JSONDecodeError:
+                await sender.json({"type": "error", "detail": "Invalid JSON message"})
+                continue
+
+            kind = data.get("type")
+
+            if kind in ("interrupt", "start_stream") and turn.running:
+                # Barge-in: the candidate speaks over the interviewer's reply
+                merged = await _interrupt(turn)
+                carried = " ".join(filter(None, [carried, merged])) or None
+                await sender.json({"type": "interrupted", "persisted": turn.persisted})
+
+            if kind == "interrupt":
+                continue
+
+            if kind == "start_stream":
+                sample_rate = data.get("sample_rate", 16000)
+                if type(sample_rate) is not int or (
+                    sample_rate not in SUPPORTED_SAMPLE_RATES
+                ):
+                    await sender.json(
+                        {
+                            "type": "error",
+                            "detail": f"Unsupported sample_rate: {sample_rate!r} "
+                            f"(expected one of {list(SUPPORTED_SAMPLE_RATES)})",
+                        }
+                    )
+                    continue
+                if transcriber is not None:
+                    await transcriber.cancel()
+                audio_buffer.seek(0)
+                audio_buffer.truncate()
+                transcriber = voice_service.streaming_transcriber(
+                    sample_rate=sample_rate,
+                    language=data.get("language", "fr"),
+                    on_partial=send_partial,
+                )
+
+            elif kind == "end_of_turn":
+                if turn.running:
+                    await sender.json(
+                        {
+                            "type": "error",
+                            "detail": "A turn is already in progress "
+                            "(send interrupt to cut it short)",
+                        }
+                    )
+                    continue
+
+                language = data.get("language", "fr")
+                streaming, audio = transcriber, None
+                if streaming is not None:
+                    transcriber = None
+                elif audio_buffer.tell():
+                    audio, audio_buffer = audio_buffer, _new_audio_buffer()
+                elif not carried:
+                    await sender.json({"type": "error", "detail": "No audio received"})
+                    continue
+
+                turn = LiveTurn()
+                turn.task = asyncio.create_task(
+                    _answer_turn(
+                        sender,
+                        session,
+                        language,
+                        turn,
+                        audio=audio,
+                        streaming=streaming,
+                        carried=carried,
+                    )
+                )
+                carried = None
+
+            elif kind == "end_interview":
+                if turn.running:
+                    await _interrupt(turn)
+                summary = await interview_service.end_session(session)
+                await sender.json({"type": "summary", "summary": summary})
+                await websocket.close()
+                break
+
+            elif kind == "ping":
+                await sender.json({"type": "pong"})
+
+            elif kind != "pong":
+                await sender.json(
+                    {"type": "error", "detail": f"Unknown message type: {kind}"}
+                )
+
+    except WebSocketDisconnect:
+        pass
+    finally:
+        heartbeat.cancel()
+        if turn.running:
+            await _interrupt(turn)
+        audio_buffer.close()
+        if transcriber is not None:
+            await transcriber.cancel()
+        logger.info(f"Live session closed for interview {interview_id}")
@@ -1,12 +1,12 @@
 import logging
-import os
-import tempfile
 from typing import Annotated
 
 from fastapi import APIRouter, BackgroundTasks, File, Form, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
 
 from app.core.auth import CurrentUser
 from app.core.deps import DbSession
+from app.core.sse import SSE_HEADERS, format_sse
 from app.schemas import StartInterviewRequest
 from app.services.interview_service import interview_service
 
@@ -66,30 +66,17 @@ async def process_audio_response(
     try:
         logger.info(f"Processing audio for interview {interview_id}")
 
-        # Save uploaded audio to temporary file
-        with tempfile.NamedTemporaryFile(suffix=".wav", delete=False) as temp_audio:
-            content = await audio.read()
-            temp_audio.write(content)
-            temp_audio_path = temp_audio.name
-
-        try:
-            # Process through service
-            result = await interview_service.process_response(
-                db=db,
-                interview_id=interview_id,
-                audio_file_path=temp_audio_path,
-                user_id=user.id,
-                background_tasks=background_tasks,
-                language=language,
-            )
-            return result
-
-        finally:
-            # Clean up temp file
-            try:
-                os.unlink(temp_audio_path)
-            except OSError:
-                pass
+        # The upload's spooled buffer (in memory, on disk past the multipart
+        # parser's spool size) goes straight to the STT client
+        result = await interview_service.process_response(
+            db=db,
+            interview_id=interview_id,
+            audio=audio.file,
+            user_id=user.id,
+            background_tasks=background_tasks,
+            language=language,
+        )
+        return result
 
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e)) from e
@@ -99,6 +86,50 @@ async def process_audio_response(
         raise HTTPException(status_code=500, detail=str(e)) from e
 
 
+@router.post("/{interview_id}/respond/stream")
+async def stream_audio_response(
+    interview_id: int,
+    audio: Annotated[UploadFile, File()],
+    user: CurrentUser,
+    db: DbSession,
+    background_tasks: BackgroundTasks,
+    language: Annotated[str, Form()] = "fr",
+):
+    """
+    Process audio response from candidate and stream the interviewer reply (SSE).
+
+    Emits a `transcription` event, then `delta` events carrying the interviewer
+    text as it is generated, then a `done` event with the persisted question id.
+    """
+    try:
+        interview_service.get_owned_interview(db, interview_id, user.id)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e)) from e
+
+    logger.info(f"Streaming audio response for interview {interview_id}")
+
+    # Uploaded files stay open until the response has been fully sent
+    async def event_stream():
+        try:
+            async for event in interview_service.process_response_stream(
+                db=db,
+                interview_id=interview_id,
+                audio=audio.file,
+                user_id=user.id,
+                background_tasks=background_tasks,
+                language=language,
+            ):
+                yield format_sse(event, event=event["type"])
+        except Exception as e:
+            logger.error(f"Error streaming response: {str(e)}")
+            logger.exception("Full traceback:")
+            yield format_sse({"type": "error", "detail": str(e)}, event="error")
+
+    return StreamingResponse(
+        event_stream(), media_type="text/event-stream", headers=SSE_HEADERS
+    )
+
+
 @router.post("/{interview_id}/end")
 async def end_interview(interview_id: int, user: CurrentUser, db: DbSession):
     """End interview session and get summary."""
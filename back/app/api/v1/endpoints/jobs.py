@@ -1,13 +1,25 @@
 """Jobs REST API Endpoints"""
 
+import logging
+
 from fastapi import APIRouter, HTTPException
+from fastapi.responses import StreamingResponse
 
 from app.core.auth import CurrentUser
+from app.core.sse import SSE_HEADERS, format_sse
+from app.services.location_service import location_service
 from app.services.smart_job_service import smart_job_service
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
+@router.get("/cache/stats")
+async def get_location_cache_stats():
+    """Hit/miss counters and size of the geo.api.gouv.fr location cache."""
+    return location_service.cache_stats()
+
+
 @router.get("/smart-search", response_model=list[dict])
 async def smart_search_jobs(
     current_user: CurrentUser,
@@ -21,3 +33,32 @@ async def smart_search_jobs(
         return jobs
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e)) from e
+
+
+@router.get("/smart-search/stream")
+async def stream_smart_search_jobs(
+    current_user: CurrentUser,
+    query: str | None = None,
+):
+    """
+    Smart search streamed as Server-Sent Events.
+
+    Emits `jobs` events with new offers as soon as the local index or any search
+    returns, `removed` events for indexed offers outside the searched scopes,
+    `ranking` events with the current order as embeddings finish, then a `done`
+    event with the same reranked list as `/smart-search`.
+    """
+
+    async def event_stream():
+        try:
+            async for event in smart_job_service.smart_search_stream(
+                current_user, query
+            ):
+                yield format_sse(event, event=event["type"])
+        except Exception as e:
+            logger.error(f"Error streaming smart search: {str(e)}")
+            yield format_sse({"type": "error", "detail": str(e)}, event="error")
+
+    return StreamingResponse(
+        event_stream(), media_type="text/event-stream", headers=SSE_HEADERS
+    )
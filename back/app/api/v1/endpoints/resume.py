@@ -29,6 +29,7 @@ from app.schemas.resume import (
     ResumeUpdate,
     TailorRequest,
 )
+from app.services.ranking_service import ranking_service
 from app.services.resume_service import resume_service_instance
 
 logger = logging.getLogger(__name__)
@@ -122,6 +123,7 @@ async def update_full_resume(payload: ResumeUpdate, user: CurrentUser, db: DbSes
     db.refresh(user)
     # Refresh resume relation explicitly to be safe
     db.refresh(resume)
+    ranking_service.invalidate_profile(user.id)
 
     return ResumeFull(
         website=resume.website,
@@ -1,11 +1,11 @@
 """Voice/Audio REST API Endpoints"""
 
 import logging
-import os
-import tempfile
+import re
+from contextlib import aclosing
 from typing import Literal
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Request, Response
 from fastapi.responses import StreamingResponse
 
 from app.core.deps import DbSession
@@ -17,10 +17,52 @@ router = APIRouter()
 
 InterviewerType = Literal["nice", "neutral", "mean"]
 
+_RANGE_PATTERN = re.compile(r"^bytes=(\d*)-(\d*)$")
+
+
+def _parse_range(range_header: str, size: int) -> tuple[int, int] | None:
+    """
+    Parse a single-range `Range` header into inclusive (start, end) offsets.
+
+    Returns None when the range is malformed or not satisfiable.
+    """
+    match = _RANGE_PATTERN.match(range_header.strip())
+    if not match or size == 0:
+        return None
+
+    start_str, end_str = match.groups()
+    if start_str:
+        start = int(start_str)
+        end = int(end_str) if end_str else size - 1
+    elif end_str:
+        # Suffix range: the last N bytes
+        start = max(size - int(end_str), 0)
+        end = size - 1
+    else:
+        return None
+
+    end = min(end, size - 1)
+    if start > end:
+        return None
+    return start, end
+
+
+@router.get("/cache/stats")
+async def get_tts_cache_stats():
+    """Hit/miss counters and size of the TTS audio cache."""
+    if voice_service.tts_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **voice_service.tts_cache.stats()}
+
 
 @router.get("/interview/{interview_id}/audio")
-async def get_audio(interview_id: int, text: str, db: DbSession):
-    """Convert text to speech and return audio file."""
+async def get_audio(interview_id: int, text: str, db: DbSession, request: Request):
+    """
+    Convert text to speech and stream the audio as it is synthesized.
+
+    Requests carrying a `Range` header (audio element seeking/replay) get a
+    206 partial response built from the fully synthesized audio.
+    """
     try:
         # Verify interview exists
         session_info = interview_service.get_session_info(db, interview_id)
@@ -29,32 +71,58 @@ async def get_audio(interview_id: int, text: str, db: DbSession):
 
         logger.info(f"🔊 Generating audio for interview {interview_id}")
 
-        # Create a temporary file to store the complete audio
-        with tempfile.NamedTemporaryFile(suffix=".mp3", delete=False) as temp_file:
-            temp_path = temp_file.name
+        range_header = request.headers.get("range")
+        if range_header:
+            audio = b"".join(
+                [chunk async for chunk in voice_service.text_to_speech_stream(text)]
+            )
+            byte_range = _parse_range(range_header, len(audio))
+            if byte_range is None:
+                return Response(
+                    status_code=416,
+                    headers={"Content-Range": f"bytes */{len(audio)}"},
+                )
+            start, end = byte_range
+            return Response(
+                content=audio[start : end + 1],
+                status_code=206,
+                media_type="audio/mpeg",
+                headers={
+                    "Content-Range": f"bytes {start}-{end}/{len(audio)}",
+                    "Accept-Ranges": "bytes",
+                    "Content-Disposition": "inline; filename=audio.mp3",
+                },
+            )
 
-            # Collect all audio chunks
-            async for audio_chunk in voice_service.text_to_speech_stream(text):
-                temp_file.write(audio_chunk)
+        stream = voice_service.text_to_speech_stream(text)
 
-        # Create a generator to stream the file
-        def iterfile():
-            try:
-                with open(temp_path, mode="rb") as f:
-                    while chunk := f.read(8192):
-                        yield chunk
-            finally:
-                try:
-                    os.unlink(temp_path)
-                except OSError:
-                    pass
+        # Pull the first chunk before answering so provider errors still
+        # surface as a proper HTTP error instead of a truncated stream
+        try:
+            first_chunk = await anext(stream)
+        except StopAsyncIteration:
+            first_chunk = b""
+        except Exception:
+            await stream.aclose()
+            raise
 
-        logger.info(f"✅ Audio generated for interview {interview_id}")
+        async def forward():
+            # Starlette cancels this generator when the client disconnects;
+            # closing the upstream generator stops the TTS provider too
+            async with aclosing(stream):
+                if first_chunk:
+                    yield first_chunk
+                async for chunk in stream:
+                    yield chunk
+            logger.info(f"✅ Audio streamed for interview {interview_id}")
 
         return StreamingResponse(
-            iterfile(),
+            forward(),
             media_type="audio/mpeg",
-            headers={"Content-Disposition": "inline; filename=audio.mp3"},
+            headers={
+                "Content-Disposition": "inline; filename=audio.mp3",
+                "Accept-Ranges": "bytes",
+            },
         )
 
     except HTTPException:
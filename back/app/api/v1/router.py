@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends
 from app.api.v1.endpoints import (
     applications,
     auth,
+    interview_ws,
     interviews,
     jobs,
     resume,
@@ -46,4 +47,6 @@ protected_router.include_router(
 )
 
 api_router.include_router(auth.router)
+# WebSockets authenticate with a query-string token (no Authorization header)
+api_router.include_router(interview_ws.router, prefix="/ws", tags=["websocket"])
 api_router.include_router(protected_router)
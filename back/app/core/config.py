@@ -38,11 +38,88 @@ class Settings(BaseSettings):
     GROQ_API_KEY: str = Field(default="", env="GROQ_API_KEY")
     GEMINI_API_KEY: str = Field(default="", env="GEMINI_API_KEY")
 
+    # Embedding backend for job ranking: "auto" (Gemini if keyed, else local),
+    # "gemini" or "local" (CPU ONNX model through fastembed, weights cached in
+    # EMBEDDING_LOCAL_CACHE_DIR)
+    EMBEDDING_BACKEND: str = Field(default="auto")
+    EMBEDDING_LOCAL_MODEL: str = Field(
+        default="sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
+    )
+    EMBEDDING_LOCAL_CACHE_DIR: str = Field(default="data/models")
+    EMBEDDING_LOCAL_BATCH_SIZE: int = Field(default=64)
+
+    # Job embedding cache (empty EMBEDDING_CACHE_DIR keeps it memory-only)
+    EMBEDDING_CACHE_ENABLED: bool = Field(default=True)
+    EMBEDDING_CACHE_DIR: str = Field(default="data/embeddings")
+    EMBEDDING_CACHE_MEMORY_MAX_ENTRIES: int = Field(default=20000)
+    EMBEDDING_CACHE_DISK_MAX_ENTRIES: int = Field(default=200000)
+
+    # Ranked jobs returned by a smart search
+    JOB_SEARCH_MAX_RESULTS: int = Field(default=100)
+    # Offers fetched per France Travail search in smart search (pages of 150)
+    JOB_SEARCH_RESULTS_PER_QUERY: int = Field(default=300)
+
+    # DSPy search planning: LLM calls in flight, and cached plans per query+profile
+    DSPY_MAX_CONCURRENCY: int = Field(default=8)
+    DSPY_CACHE_MAX_ENTRIES: int = Field(default=10000)
+    DSPY_CACHE_TTL_HOURS: float = Field(default=24.0)
+
+    # Local ANN index of offers seen in searches (recalled before live results)
+    JOB_INDEX_ENABLED: bool = Field(default=True)
+    JOB_INDEX_TTL_HOURS: float = Field(default=72.0)
+    JOB_INDEX_MAX_ENTRIES: int = Field(default=200000)
+
+    # Background France Travail ingestion (grand domaine codes x region codes;
+    # an empty list means all). Off by default: each scope pages the API.
+    JOB_INGESTION_ENABLED: bool = Field(default=False)
+    JOB_INGESTION_DOMAINS: list[str] = Field(default=[])
+    JOB_INGESTION_REGIONS: list[str] = Field(default=[])
+    JOB_INGESTION_INTERVAL_MINUTES: int = Field(default=30)
+    JOB_INGESTION_INITIAL_WINDOW_DAYS: int = Field(default=3)
+    JOB_INGESTION_RETENTION_DAYS: int = Field(default=31)
+    # Stored offers re-fetched by id once not checked for this long (the search
+    # API cannot filter on modification date), at most a batch per run
+    JOB_INGESTION_REFRESH_HOURS: float = Field(default=24.0)
+    JOB_INGESTION_REFRESH_BATCH: int = Field(default=500)
+
+    # Embedding requests: texts per API call and calls in flight per search
+    EMBEDDING_BATCH_SIZE: int = Field(default=100)
+    EMBEDDING_MAX_CONCURRENCY: int = Field(default=4)
+
+    # Groq connection pool (shared by every async LLM/STT call in a worker)
+    GROQ_MAX_CONNECTIONS: int = Field(default=100)
+    GROQ_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20)
+    GROQ_TIMEOUT: float = Field(default=60.0)
+
+    # Shared HTTP client for France Travail and geo.api.gouv.fr calls
+    HTTP_CLIENT_HTTP2: bool = Field(default=True)
+    HTTP_CLIENT_MAX_CONNECTIONS: int = Field(default=100)
+    HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS: int = Field(default=20)
+    HTTP_CLIENT_KEEPALIVE_EXPIRY: float = Field(default=60.0)
+    HTTP_CLIENT_TIMEOUT: float = Field(default=20.0)
+    HTTP_CLIENT_CONNECT_TIMEOUT: float = Field(default=5.0)
+
     # France Travail API
     FRANCE_TRAVAIL_CLIENT_ID: str = Field(default="", env="FRANCE_TRAVAIL_CLIENT_ID")
     FRANCE_TRAVAIL_CLIENT_SECRET: str = Field(
         default="", env="FRANCE_TRAVAIL_CLIENT_SECRET"
     )
+    # Result pages requested at once by one deep search
+    FRANCE_TRAVAIL_PAGE_CONCURRENCY: int = Field(default=4)
+    # Access token shared by all worker processes (empty: per-process only)
+    FRANCE_TRAVAIL_TOKEN_CACHE_PATH: str = Field(
+        default="data/francetravail_token.json"
+    )
+
+    # Offline French geography (bundled regions/departments, built communes);
+    # empty paths use the dataset shipped in app/data/geo
+    GEO_OFFLINE_ENABLED: bool = Field(default=True)
+    GEO_DATA_DIR: str = Field(default="")
+    GEO_COMMUNES_PATH: str = Field(default="")
+    # Cache of live geo.api.gouv.fr lookups (misses expire sooner)
+    GEO_CACHE_MAX_ENTRIES: int = Field(default=4096)
+    GEO_CACHE_TTL_HOURS: float = Field(default=24.0)
+    GEO_CACHE_NEGATIVE_TTL_MINUTES: float = Field(default=10.0)
 
     # TTS Provider Selection
     USE_ELEVENLABS: bool = Field(default=False, env="USE_ELEVENLABS")
@@ -56,6 +133,24 @@ class Settings(BaseSettings):
     TTS_RATE: str = Field(default="+0%")
     TTS_VOLUME: str = Field(default="+0%")
 
+    # Max sentences synthesized in parallel when streaming TTS behind the LLM
+    TTS_PIPELINE_CONCURRENCY: int = Field(default=3)
+
+    # Max speech segments transcribed in parallel while a WebSocket answer streams in
+    STT_STREAM_CONCURRENCY: int = Field(default=3)
+
+    # Recorded answers above this size are buffered on disk instead of in memory
+    AUDIO_SPOOL_MAX_BYTES: int = Field(default=8 * 1024 * 1024)
+
+    # Trim silence and downsample WAV answers to 16 kHz mono before Whisper
+    STT_PREPROCESS_ENABLED: bool = Field(default=True)
+
+    # TTS audio cache (empty TTS_CACHE_DIR keeps it memory-only)
+    TTS_CACHE_ENABLED: bool = Field(default=True)
+    TTS_CACHE_DIR: str = Field(default="data/tts_cache")
+    TTS_CACHE_MEMORY_MAX_BYTES: int = Field(default=64 * 1024 * 1024)
+    TTS_CACHE_DISK_MAX_BYTES: int = Field(default=1024 * 1024 * 1024)
+
     SENTRY_DSN: str = Field(default="", env="SENTRY_DSN")
 
     # WebSocket
@@ -1,9 +1,13 @@
 import logging
+from datetime import datetime
 
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.interval import IntervalTrigger
 
+from app.core.config import settings
 from app.services.background_tasks import BackgroundTaskService
+from app.services.job_ingestion_service import job_ingestion_service
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +28,24 @@ async def scheduled_cleanup():
         logger.error(f"Scheduled cleanup failed: {str(e)}")
 
 
+async def scheduled_job_ingestion():
+    """Wrapper for scheduled France Travail ingestion"""
+    try:
+        logger.info("Starting scheduled job offer ingestion")
+        stats = await job_ingestion_service.run()
+        logger.info(f"Scheduled job ingestion completed: {stats}")
+    except Exception as e:
+        logger.error(f"Scheduled job ingestion failed: {str(e)}")
+
+
+async def warm_job_index():
+    """Load already ingested offers into the job index at startup"""
+    try:
+        await job_ingestion_service.warm_index()
+    except Exception as e:
+        logger.error(f"Job index warm-up failed: {str(e)}")
+
+
 def start_scheduler():
     """Initialize and start the scheduler"""
     logger.info("Scheduler started successfully")
@@ -35,6 +57,24 @@ def start_scheduler():
         replace_existing=True,
     )
 
+    if settings.JOB_INGESTION_ENABLED:
+        now = datetime.now()
+        scheduler.add_job(
+            warm_job_index,
+            id="warm_job_index",
+            name="Warm job index",
+            replace_existing=True,
+            next_run_time=now,
+        )
+        scheduler.add_job(
+            scheduled_job_ingestion,
+            trigger=IntervalTrigger(minutes=settings.JOB_INGESTION_INTERVAL_MINUTES),
+            id="ingest_job_offers",
+            name="Ingest France Travail offers",
+            replace_existing=True,
+            next_run_time=now,
+        )
+
     scheduler.start()
     logger.info("Scheduler started successfully")
 
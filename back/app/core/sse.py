@@ -0,0 +1,15 @@
+import json
+from typing import Any
+
+
+def format_sse(data: Any, event: str | None = None) -> str:
+    """Serialize a payload as a Server-Sent Events message."""
+    message = ""
+    if event:
+        message += f"event: {event}\n"
+    message += f"data: {json.dumps(data, default=str, ensure_ascii=False)}\n\n"
+    return message
+
+
+# Headers that keep proxies (nginx, etc.) from buffering an SSE stream
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
@@ -10,6 +10,9 @@ from sentry_sdk.integrations.starlette import StarletteIntegration
 from app.api.v1.router import api_router
 from app.core.config import settings
 from app.core.scheduler import shutdown_scheduler, start_scheduler
+from app.services.http_client import http_client
+from app.services.llm_service import llm_service
+from app.services.voice_service import voice_service
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -17,6 +20,8 @@ logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    await http_client.start()
+
     try:
         start_scheduler()
         print("Scheduler initialization completed")
@@ -27,6 +32,9 @@ async def lifespan(app: FastAPI):
     yield
 
     shutdown_scheduler()
+    await llm_service.aclose()
+    await voice_service.aclose()
+    await http_client.aclose()
 
 
 sentry_sdk.init(
@@ -2,6 +2,7 @@ from .application import Application
 from .comment import FeedbackComment, FeedbackCommentType
 from .feedback import Feedback
 from .interview import Interview, InterviewerStyle
+from .job_offer import JobIngestionState, JobOffer
 from .question_answer import QuestionAnswer
 
 __all__ = [
@@ -12,4 +13,6 @@ __all__ = [
     "FeedbackComment",
     "FeedbackCommentType",
     "Application",
+    "JobOffer",
+    "JobIngestionState",
 ]
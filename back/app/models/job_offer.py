@@ -0,0 +1,35 @@
+from datetime import datetime
+
+from sqlalchemy import JSON, Column, DateTime, String
+
+from app.db import Base
+
+
+class JobOffer(Base):
+    """France Travail offer ingested ahead of searches (see job_ingestion_service)."""
+
+    __tablename__ = "job_offers"
+
+    # France Travail offer id
+    id = Column(String, primary_key=True)
+    intitule = Column(String, nullable=True)
+    departement = Column(String, nullable=True, index=True)
+    grand_domaine = Column(String, nullable=True, index=True)
+    # Full offer payload as returned by the search API
+    data = Column(JSON, nullable=False)
+    content_hash = Column(String(64), nullable=False)
+
+    date_creation = Column(DateTime, nullable=True)
+    date_actualisation = Column(DateTime, nullable=True, index=True)
+    fetched_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+class JobIngestionState(Base):
+    """High-water mark of one ingestion scope (grand domaine + region)."""
+
+    __tablename__ = "job_ingestion_state"
+
+    scope = Column(String, primary_key=True)
+    # Latest `dateActualisation` ingested for the scope
+    high_water_mark = Column(DateTime, nullable=True)
+    last_run_at = Column(DateTime, nullable=True)
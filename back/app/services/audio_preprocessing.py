@@ -0,0 +1,238 @@
+"""Shrink recorded answers before speech-to-text: trim silence, downmix and resample"""
+
+import io
+import logging
+import wave
+from dataclasses import dataclass
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Whisper resamples everything to 16 kHz mono internally
+TARGET_SAMPLE_RATE = 16000
+
+# Compressed recordings are re-encoded as Opus at speech bitrate
+OPUS_BIT_RATE = 24000
+
+# Container magic bytes -> PyAV muxer, for the formats browsers record in
+COMPRESSED_CONTAINERS = {b"\x1aE\xdf\xa3": "webm", b"OggS": "ogg"}
+
+
+@dataclass
+class PreprocessedAudio:
+    """Audio ready for STT, with the size it had before preprocessing."""
+
+    data: bytes
+    original_bytes: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.original_bytes - len(self.data)
+
+
+def is_wav(header: bytes) -> bool:
+    """Check for a RIFF/WAVE header."""
+    return header[:4] == b"RIFF" and header[8:12] == b"WAVE"
+
+
+def compressed_container(header: bytes) -> str | None:
+    """Return the muxer name of a webm/ogg recording, or None."""
+    return COMPRESSED_CONTAINERS.get(header[:4])
+
+
+def decode_wav(data: bytes) -> tuple[np.ndarray, int]:
+    """
+    Decode PCM WAV audio.
+
+    Returns:
+        Tuple of (float32 samples in [-1, 1] shaped (frames, channels), sample rate)
+    """
+    with wave.open(io.BytesIO(data)) as reader:
+        channels = reader.getnchannels()
+        width = reader.getsampwidth()
+        rate = reader.getframerate()
+        raw = reader.readframes(reader.getnframes())
+
+    if width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128) / 128
+    elif width == 2:
+        samples = np.frombuffer(raw, dtype="<i2").astype(np.float32) / 32768
+    elif width == 3:
+        # Sign-extend 24-bit little-endian into the top of an int32
+        triplets = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        padded = np.zeros((len(triplets), 4), dtype=np.uint8)
+        padded[:, 1:] = triplets
+        samples = padded.view("<i4").ravel().astype(np.float32) / 2**31
+    elif width == 4:
+        samples = np.frombuffer(raw, dtype="<i4").astype(np.float32) / 2**31
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+
+    return samples.reshape(-1, channels), rate
+
+
+def decode_compressed(data: bytes, sample_rate: int) -> np.ndarray:
+    """
+    Decode a compressed recording (e.g. the browser's webm/opus) with PyAV.
+
+    Returns:
+        Mono float32 samples in [-1, 1], resampled to `sample_rate`
+    """
+    import av
+
+    resampler = av.AudioResampler(format="flt", layout="mono", rate=sample_rate)
+    chunks = []
+    with av.open(io.BytesIO(data)) as container:
+        for frame in container.decode(audio=0):
+            chunks.extend(out.to_ndarray().ravel() for out in resampler.resample(frame))
+        chunks.extend(out.to_ndarray().ravel() for out in resampler.resample(None))
+    if not chunks:
+        return np.zeros(0, dtype=np.float32)
+    return np.concatenate(chunks).astype(np.float32, copy=False)
+
+
+def encode_opus(samples: np.ndarray, sample_rate: int, container: str) -> bytes:
+    """Encode mono float samples as Opus in a webm or ogg container."""
+    import av
+
+    buffer = io.BytesIO()
+    with av.open(buffer, "w", format=container) as output:
+        stream = output.add_stream("libopus", rate=sample_rate)
+        stream.layout = "mono"
+        stream.bit_rate = OPUS_BIT_RATE
+        frame = av.AudioFrame.from_ndarray(
+            np.ascontiguousarray(samples, dtype=np.float32).reshape(1, -1),
+            format="flt",
+            layout="mono",
+        )
+        frame.sample_rate = sample_rate
+        for packet in stream.encode(frame):
+            output.mux(packet)
+        for packet in stream.encode(None):
+            output.mux(packet)
+    return buffer.getvalue()
+
+
+def encode_wav(samples: np.ndarray, sample_rate: int) -> bytes:
+    """Encode mono float samples as 16-bit PCM WAV."""
+    pcm = (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2")
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(1)
+        writer.setsampwidth(2)
+        writer.setframerate(sample_rate)
+        writer.writeframes(pcm.tobytes())
+    return buffer.getvalue()
+
+
+def resample(samples: np.ndarray, rate: int, target_rate: int) -> np.ndarray:
+    """Band-limited resampling of a mono signal in the frequency domain."""
+    if rate == target_rate or not len(samples):
+        return samples
+    target_length = max(1, round(len(samples) * target_rate / rate))
+    spectrum = np.fft.rfft(samples)
+    # Truncating (or zero-padding) the spectrum low-passes at the new Nyquist
+    resampled = np.fft.irfft(spectrum, n=target_length)
+    return (resampled * (target_length / len(samples))).astype(np.float32)
+
+
+def speech_bounds(
+    samples: np.ndarray,
+    sample_rate: int,
+    frame_ms: int = 30,
+    padding_ms: int = 300,
+    min_rms: float = 0.01,
+    noise_ratio: float = 3.0,
+) -> tuple[int, int] | None:
+    """
+    Find the span between the first and last speech frame with an energy VAD.
+
+    A frame counts as speech when its RMS exceeds `noise_ratio` times the noise
+    floor (estimated as the 10th percentile of frame energies) and `min_rms`.
+
+    Returns:
+        (start, end) sample indices including `padding_ms` on both sides, or
+        None if no frame looks like speech
+    """
+    frame = max(1, sample_rate * frame_ms // 1000)
+    frame_count = len(samples) // frame
+    if frame_count == 0:
+        return None
+
+    frames = samples[: frame_count * frame].reshape(frame_count, frame)
+    rms = np.sqrt(np.mean(frames**2, axis=1))
+    threshold = max(min_rms, noise_ratio * float(np.percentile(rms, 10)))
+
+    speech = np.flatnonzero(rms > threshold)
+    if not len(speech):
+        return None
+
+    padding = sample_rate * padding_ms // 1000
+    start = max(0, speech[0] * frame - padding)
+    end = min(len(samples), (speech[-1] + 1) * frame + padding)
+    return start, end
+
+
+def preprocess_for_stt(data: bytes) -> PreprocessedAudio:
+    """
+    Trim leading/trailing silence, downmix to mono and resample to 16 kHz.
+
+    PCM WAV is re-encoded as 16-bit WAV. Compressed webm/ogg recordings (the
+    browser's MediaRecorder output) are decoded with PyAV and re-encoded as
+    Opus in the same container, so the upload name keeps matching its format.
+    Anything else, audio without any detected speech, and results that would
+    not be smaller are returned unchanged so Whisper gets the final say.
+
+    Args:
+        data: Encoded audio bytes
+
+    Returns:
+        PreprocessedAudio with the audio to send to STT
+    """
+    unchanged = PreprocessedAudio(data=data, original_bytes=len(data))
+    container = compressed_container(data)
+    if container is not None:
+        return _preprocess_compressed(data, container) or unchanged
+    if not is_wav(data):
+        return unchanged
+
+    try:
+        samples, rate = decode_wav(data)
+    except (wave.Error, ValueError, EOFError) as e:
+        logger.warning(f"Could not decode WAV for preprocessing: {str(e)}")
+        return unchanged
+
+    mono = samples.mean(axis=1)
+    bounds = speech_bounds(mono, rate)
+    if bounds is None:
+        return unchanged
+
+    start, end = bounds
+    trimmed = resample(mono[start:end], rate, TARGET_SAMPLE_RATE)
+    encoded = encode_wav(trimmed, TARGET_SAMPLE_RATE)
+    if len(encoded) >= len(data):
+        return unchanged
+
+    return PreprocessedAudio(data=encoded, original_bytes=len(data))
+
+
+def _preprocess_compressed(data: bytes, container: str) -> PreprocessedAudio | None:
+    """Trim a webm/ogg recording; None when it cannot or need not be shrunk."""
+    try:
+        mono = decode_compressed(data, TARGET_SAMPLE_RATE)
+        bounds = speech_bounds(mono, TARGET_SAMPLE_RATE)
+        if bounds is None:
+            return None
+        start, end = bounds
+        encoded = encode_opus(mono[start:end], TARGET_SAMPLE_RATE, container)
+    except ImportError:
+        logger.warning("Compressed audio preprocessing needs the 'av' package")
+        return None
+    except Exception as e:
+        logger.warning(f"Could not decode {container} audio for preprocessing: {e}")
+        return None
+
+    if len(encoded) >= len(data):
+        return None
+    return PreprocessedAudio(data=encoded, original_bytes=len(data))
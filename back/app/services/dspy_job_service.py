@@ -1,9 +1,12 @@
+import asyncio
+import hashlib
 import logging
 
 import dspy
 
 from app.core.config import settings
 from app.models.france_travail_params import FranceTravailParams
+from app.services.ttl_cache import AsyncTTLCache
 
 logger = logging.getLogger(__name__)
 
@@ -45,6 +48,47 @@ class DSPyJobService:
         # Create the Predictor (ChainOfThought for reasoning)
         self.predictor = dspy.ChainOfThought(JobSearchSignature)
 
+        # Variations per (normalized query, profile fingerprint): the same search
+        # on an unchanged profile skips the LLM. Failed calls are not cached.
+        self._cache = AsyncTTLCache(
+            max_entries=settings.DSPY_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.DSPY_CACHE_TTL_HOURS * 3600,
+            negative_ttl_seconds=0,
+        )
+        self._semaphore = asyncio.Semaphore(settings.DSPY_MAX_CONCURRENCY)
+
+    @staticmethod
+    def cache_key(query: str, profile: str) -> tuple[str, str]:
+        """Normalized query + fingerprint of the profile it was planned for."""
+        fingerprint = hashlib.sha256(profile.encode("utf-8")).hexdigest()[:16]
+        return " ".join(query.lower().split()), fingerprint
+
+    async def apredict_params(
+        self, query: str, profile: str
+    ) -> list[FranceTravailParams]:
+        """
+        Async `predict_params`: the LLM call never blocks the event loop, at most
+        DSPY_MAX_CONCURRENCY run at once, and repeated searches hit the cache.
+        """
+        try:
+            return await self._cache.get_or_fetch(
+                self.cache_key(query, profile),
+                lambda: self._apredict(query, profile),
+            )
+        except Exception as e:
+            logger.error(f"❌ [DSPy] Error: {e}")
+            return self._fallback_params(query)
+
+    async def _apredict(self, query: str, profile: str) -> list[FranceTravailParams]:
+        logger.info(f"🧠 [DSPy] Analyzing query: '{query}'")
+        async with self._semaphore:
+            result = await self.predictor.acall(user_query=query, user_profile=profile)
+
+        variations = result.variations
+        logger.info(f"✅ [DSPy] Generated {len(variations)} variations.")
+        logger.info(f"✅ [DSPy] Reasoning: {getattr(result, 'rationale', 'N/A')}")
+        return variations
+
     def predict_params(self, query: str, profile: str) -> list[FranceTravailParams]:
         """
         Run the DSPy module to get a list of search variations.
@@ -65,18 +109,22 @@ class DSPyJobService:
 
         except Exception as e:
             logger.error(f"❌ [DSPy] Error: {e}")
-            # Fallback safe params
-            return [
-                FranceTravailParams(
-                    keywords=query,
-                    location_raw=None,
-                    location_type="unknown",
-                    experience_level=None,
-                    experience_exigence=None,
-                    contract_type=None,
-                    is_full_time=None,
-                )
-            ]
+            return self._fallback_params(query)
+
+    @staticmethod
+    def _fallback_params(query: str) -> list[FranceTravailParams]:
+        """Safe params: the raw query as keywords, no location."""
+        return [
+            FranceTravailParams(
+                keywords=query,
+                location_raw=None,
+                location_type="unknown",
+                experience_level=None,
+                experience_exigence=None,
+                contract_type=None,
+                is_full_time=None,
+            )
+        ]
 
 
 dspy_job_service = DSPyJobService()
@@ -0,0 +1,129 @@
+"""Embedding backends used by the ranker: Gemini API or a local CPU model"""
+
+import logging
+import threading
+
+import google.generativeai as genai
+import numpy as np
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingBackend:
+    """
+    Turns texts into embedding vectors.
+
+    `embed` is blocking (run it in a worker thread) and returns a float32 matrix
+    with one row per text. `task_type` is "retrieval_query" for the profile and
+    search query, "retrieval_document" for job offers.
+    """
+
+    # Identifies the vector space; embeddings from different names never mix
+    name: str = ""
+    # Max texts per call to `embed`
+    max_batch_size: int = 100
+
+    def embed(self, texts: list[str], task_type: str) -> np.ndarray:
+        raise NotImplementedError
+
+
+class GeminiEmbeddingBackend(EmbeddingBackend):
+    """Google `text-embedding-004` through the Generative AI API."""
+
+    model = "models/text-embedding-004"
+    name = "text-embedding-004"
+    max_batch_size = 100
+
+    def __init__(self, api_key: str):
+        genai.configure(api_key=api_key)
+
+    def embed(self, texts: list[str], task_type: str) -> np.ndarray:
+        response = genai.embed_content(
+            model=self.model, content=texts, task_type=task_type
+        )
+        # A batch input returns one embedding per text
+        return np.array(response["embedding"], dtype=np.float32).reshape(len(texts), -1)
+
+
+class LocalEmbeddingBackend(EmbeddingBackend):
+    """
+    Small sentence-embedding model run on CPU with ONNX Runtime (via fastembed).
+
+    Works offline once the quantized weights are in EMBEDDING_LOCAL_CACHE_DIR
+    (the Docker image fetches them at build time with
+    `python -m app.services.embedding_backends`), and gives the same vectors
+    for the same text on every run.
+    """
+
+    def __init__(self, model_name: str, cache_dir: str | None = None):
+        try:
+            from fastembed import TextEmbedding
+        except ImportError as e:
+            raise RuntimeError(
+                "Local embeddings need the 'fastembed' package (uv sync)"
+            ) from e
+
+        self.model_name = model_name
+        self.name = "local-" + model_name.replace("/", "--")
+        self.max_batch_size = settings.EMBEDDING_LOCAL_BATCH_SIZE
+        self._model = TextEmbedding(model_name=model_name, cache_dir=cache_dir or None)
+        # ONNX sessions parallelize internally; one inference at a time is fastest
+        self._lock = threading.Lock()
+
+    def embed(self, texts: list[str], task_type: str) -> np.ndarray:
+        with self._lock:
+            vectors = list(self._model.embed(texts, batch_size=self.max_batch_size))
+        return np.array(vectors, dtype=np.float32).reshape(len(texts), -1)
+
+
+def create_embedding_backend() -> EmbeddingBackend | None:
+    """
+    Build the backend selected by EMBEDDING_BACKEND.
+
+    "gemini" and "local" force a backend; "auto" uses Gemini when
+    GEMINI_API_KEY is set and the local model otherwise.
+
+    Returns:
+        The backend, or None if none could be initialized (ranking disabled)
+    """
+    choice = settings.EMBEDDING_BACKEND.lower()
+    if choice == "auto":
+        choice = "gemini" if settings.GEMINI_API_KEY else "local"
+
+    try:
+        if choice == "gemini":
+            if not settings.GEMINI_API_KEY:
+                logger.warning(
+                    "⚠️ GEMINI_API_KEY not configured. Ranking will not work."
+                )
+                return None
+            backend = GeminiEmbeddingBackend(settings.GEMINI_API_KEY)
+            logger.info("✅ Google GenAI initialized successfully (for Embeddings).")
+            return backend
+
+        if choice == "local":
+            backend = LocalEmbeddingBackend(
+                settings.EMBEDDING_LOCAL_MODEL, settings.EMBEDDING_LOCAL_CACHE_DIR
+            )
+            logger.info(f"✅ Local embedding model loaded: {backend.model_name}")
+            return backend
+
+        logger.error(f"❌ Unknown EMBEDDING_BACKEND '{settings.EMBEDDING_BACKEND}'")
+    except Exception as e:
+        logger.error(f"❌ Failed to initialize {choice} embedding backend: {e}")
+    return None
+
+
+if __name__ == "__main__":
+    # Download the local model weights ahead of first use (Docker build step)
+    logging.basicConfig(level=logging.INFO)
+    backend = LocalEmbeddingBackend(
+        settings.EMBEDDING_LOCAL_MODEL, settings.EMBEDDING_LOCAL_CACHE_DIR
+    )
+    backend.embed(["warm-up"], "retrieval_document")
+    logger.info(
+        f"Local embedding model {backend.model_name} cached in "
+        f"{settings.EMBEDDING_LOCAL_CACHE_DIR}"
+    )
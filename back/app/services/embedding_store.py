@@ -0,0 +1,275 @@
+"""Persistent store of job-offer embeddings (memory LRU + memory-mapped float32 matrix)"""
+
+import hashlib
+import logging
+import os
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows: workers then append without coordination
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingStore:
+    """
+    Two-tier cache of embedding vectors keyed by offer id + hash of the embedded text.
+
+    - Memory tier: LRU of float32 vectors bounded by entry count.
+    - Disk tier: `vectors.f32`, an append-only float32 matrix read through
+      np.memmap, with `keys.txt` holding the key of each row. Past
+      `max_disk_entries` the newest 90% of rows are compacted into fresh files.
+
+    All methods are blocking and thread-safe; call them from a worker thread.
+    Several processes (e.g. uvicorn workers) can share a cache directory: disk
+    access holds an flock on `store.lock` and first picks up the rows other
+    processes appended or compacted since the last look.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None,
+        max_memory_entries: int,
+        max_disk_entries: int,
+    ):
+        self.max_memory_entries = max_memory_entries
+        self.max_disk_entries = max_disk_entries
+        self._memory: OrderedDict[str, np.ndarray] = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.dim: int | None = None
+        self._rows: dict[str, int] = {}
+        self._row_count = 0
+        self._matrix: np.memmap | None = None
+        # (inode, size) of keys.txt as of the last sync with the disk
+        self._keys_signature: tuple[int, int] | None = None
+
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        if self.cache_dir:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                with self._disk_lock(exclusive=False):
+                    pass  # Taking the lock loads the index
+                logger.info(f"Embedding disk cache loaded: {len(self._rows)} vectors")
+            except (OSError, ValueError) as e:
+                logger.error(f"Embedding disk cache disabled ({self.cache_dir}): {e}")
+                self.cache_dir = None
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(offer_id: str | None, text: str) -> str:
+        """Key an offer's embedding by its id and the exact text that was embedded."""
+        digest = hashlib.sha256(text.encode("utf-8")).hexdigest()[:32]
+        return f"{offer_id or ''}:{digest}"
+
+    def get_many(self, keys: list[str]) -> dict[str, np.ndarray]:
+        """Return the cached vectors among `keys`, memory first, then disk."""
+        found = {}
+        with self._lock, self._disk_lock(exclusive=False):
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is None:
+                    vector = self._read_row(key)
+                    if vector is not None:
+                        self._remember(key, vector)
+                else:
+                    self._memory.move_to_end(key)
+
+                if vector is None:
+                    self.misses += 1
+                else:
+                    self.hits += 1
+                    found[key] = vector
+        return found
+
+    def put_many(self, items: dict[str, np.ndarray]):
+        """Store vectors in memory and append the new ones to the disk matrix."""
+        if not items:
+            return
+        with self._lock, self._disk_lock(exclusive=True):
+            fresh = {}
+            for key, vector in items.items():
+                vector = np.asarray(vector, dtype=np.float32)
+                self._remember(key, vector)
+                if key not in self._rows:
+                    fresh[key] = vector
+
+            if self.cache_dir is not None and fresh:
+                try:
+                    self._append_rows(fresh)
+                    if self._row_count > self.max_disk_entries:
+                        self._compact()
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Embedding disk cache write failed: {e}")
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_entries": len(self._rows),
+        }
+
+    def _remember(self, key: str, vector: np.ndarray):
+        self._memory[key] = vector
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_memory_entries:
+            self._memory.popitem(last=False)
+
+    @property
+    def _vectors_path(self) -> Path:
+        return self.cache_dir / "vectors.f32"
+
+    @property
+    def _keys_path(self) -> Path:
+        return self.cache_dir / "keys.txt"
+
+    @property
+    def _dim_path(self) -> Path:
+        return self.cache_dir / "dim"
+
+    @property
+    def _lock_path(self) -> Path:
+        return self.cache_dir / "store.lock"
+
+    @contextmanager
+    def _disk_lock(self, exclusive: bool):
+        """Hold the cross-process lock and sync the index with the disk files."""
+        if self.cache_dir is None:
+            yield
+            return
+        fd = os.open(self._lock_path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            if fcntl is not None:
+                fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._load_index()
+            yield
+        finally:
+            # Closing the descriptor releases the lock
+            os.close(fd)
+
+    def _keys_stat(self) -> tuple[int, int] | None:
+        try:
+            stat = self._keys_path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_ino, stat.st_size
+
+    def _load_index(self):
+        """Read the keys added since the last sync, or all of them after a compaction."""
+        signature = self._keys_stat()
+        if signature == self._keys_signature:
+            return
+        if self.dim is None and self._dim_path.exists():
+            self.dim = int(self._dim_path.read_text().strip())
+
+        previous = self._keys_signature
+        offset = 0
+        if (
+            signature is not None
+            and previous is not None
+            and signature[0] == previous[0]
+            and signature[1] > previous[1]
+        ):
+            # Same file, grown: only read the rows appended since
+            offset = previous[1]
+        else:
+            self._rows = {}
+            self._row_count = 0
+            self._matrix = None
+        self._keys_signature = signature
+        if signature is None or self.dim is None:
+            return
+
+        with open(self._keys_path, "rb") as f:
+            f.seek(offset)
+            keys = f.read().decode("utf-8").splitlines()
+        stored_rows = 0
+        if self._vectors_path.exists():
+            stored_rows = self._vectors_path.stat().st_size // (self.dim * 4)
+
+        # Vectors are written before keys, so extra rows are an interrupted
+        # append; only rows with a key are trusted
+        keys = keys[: max(0, stored_rows - self._row_count)]
+        for key in keys:
+            self._rows[key] = self._row_count
+            self._row_count += 1
+
+    def _read_row(self, key: str) -> np.ndarray | None:
+        row = self._rows.get(key)
+        if row is None:
+            return None
+        if self._matrix is None or len(self._matrix) <= row:
+            self._matrix = np.memmap(
+                self._vectors_path,
+                dtype=np.float32,
+                mode="r",
+                shape=(self._row_count, self.dim),
+            )
+        return np.array(self._matrix[row])
+
+    def _append_rows(self, items: dict[str, np.ndarray]):
+        if self.dim is None:
+            self.dim = len(next(iter(items.values())))
+            self._dim_path.write_text(str(self.dim))
+
+        keys = [key for key, vector in items.items() if len(vector) == self.dim]
+        if len(keys) < len(items):
+            logger.warning(
+                f"Skipped {len(items) - len(keys)} embeddings not of dimension {self.dim}"
+            )
+        if not keys:
+            return
+
+        matrix = np.stack([items[key] for key in keys]).astype(np.float32)
+        # Truncate any torn tail so new rows land right after the trusted ones
+        with open(self._vectors_path, "ab") as f:
+            f.truncate(self._row_count * self.dim * 4)
+            f.write(matrix.tobytes())
+        with open(self._keys_path, "a", encoding="utf-8") as f:
+            f.write("".join(f"{key}\n" for key in keys))
+
+        for key in keys:
+            self._rows[key] = self._row_count
+            self._row_count += 1
+        self._keys_signature = self._keys_stat()
+
+    def _compact(self):
+        """Keep the most recently added 90% of rows in freshly written files."""
+        keep = int(self.max_disk_entries * 0.9)
+        latest = sorted(self._rows.items(), key=lambda item: item[1])[-keep:]
+        source = np.memmap(
+            self._vectors_path,
+            dtype=np.float32,
+            mode="r",
+            shape=(self._row_count, self.dim),
+        )
+        matrix = np.array(source[[row for _, row in latest]])
+        del source
+        self._matrix = None
+
+        tmp_vectors = self._vectors_path.with_suffix(".tmp")
+        tmp_keys = self._keys_path.with_suffix(".tmp")
+        tmp_vectors.write_bytes(matrix.tobytes())
+        tmp_keys.write_text("".join(f"{key}\n" for key, _ in latest), encoding="utf-8")
+        # Without a keys file the index loads empty, so a crash between the two
+        # renames loses the cache instead of pairing keys with the wrong rows
+        self._keys_path.unlink(missing_ok=True)
+        os.replace(tmp_vectors, self._vectors_path)
+        os.replace(tmp_keys, self._keys_path)
+
+        self._rows = {key: row for row, (key, _) in enumerate(latest)}
+        self._row_count = len(latest)
+        self._keys_signature = self._keys_stat()
+        logger.info(f"Embedding disk cache compacted to {self._row_count} vectors")
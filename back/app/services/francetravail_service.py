@@ -1,44 +1,123 @@
+import asyncio
+import json
 import logging
+import os
 import time
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from pathlib import Path
 
 import httpx
 
 from app.core.config import settings
+from app.services.http_client import http_client
+
+try:
+    import fcntl
+except ImportError:  # Windows: the token is then shared without locking
+    fcntl = None
 
 logger = logging.getLogger(__name__)
 
+# Search paging limits: at most 150 offers per call, first index at most 3000
+PAGE_SIZE = 150
+MAX_RANGE_START = 3000
+DEFAULT_MAX_RESULTS = 50
+
+# Tokens this close to expiry (seconds) are refreshed in the background
+TOKEN_REFRESH_MARGIN = 300
+
 
 class FranceTravailService:
     BASE_URL = "https://api.francetravail.io"
     AUTH_URL = "https://entreprise.francetravail.fr/connexion/oauth2/access_token?realm=%2Fpartenaire"
     SEARCH_URL = "/partenaire/offresdemploi/v2/offres/search"
+    OFFER_URL = "/partenaire/offresdemploi/v2/offres/{offer_id}"
 
     def __init__(self):
         self.access_token = None
         self.token_expiry = 0
+        # The one token refresh in flight in this process, awaited by all callers
+        self._refresh_task: asyncio.Task | None = None
 
     async def _get_access_token(self) -> str:
-        if self.access_token and time.time() < self.token_expiry:
+        """
+        Return a valid access token, refreshing it at most once at a time.
+
+        Concurrent callers share a single refresh. Once the token is within
+        TOKEN_REFRESH_MARGIN of expiry it is still returned while a background
+        refresh replaces it, so searches never wait on token rollover.
+        """
+        now = time.time()
+        if self.access_token and now < self.token_expiry:
+            if now >= self.token_expiry - TOKEN_REFRESH_MARGIN:
+                self._start_refresh()
             return self.access_token
 
-        async with httpx.AsyncClient() as client:
-            response = await client.post(
-                self.AUTH_URL,
-                data={
-                    "grant_type": "client_credentials",
-                    "client_id": settings.FRANCE_TRAVAIL_CLIENT_ID,
-                    "client_secret": settings.FRANCE_TRAVAIL_CLIENT_SECRET,
-                    "scope": "api_offresdemploiv2 o2dsoffre",
-                },
-                headers={"Content-Type": "application/x-www-form-urlencoded"},
-            )
-            response.raise_for_status()
-            data = response.json()
-            self.access_token = data["access_token"]
-            # Set expiry slightly before actual expiry (expires_in is in seconds)
-            self.token_expiry = time.time() + data["expires_in"] - 60
+        # Shielded so a cancelled search does not cancel the shared refresh
+        return await asyncio.shield(self._start_refresh())
+
+    def _start_refresh(self) -> asyncio.Task:
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_token())
+            self._refresh_task.add_done_callback(self._log_refresh_failure)
+        return self._refresh_task
+
+    @staticmethod
+    def _log_refresh_failure(task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            logger.error(f"France Travail token refresh failed: {task.exception()}")
+
+    async def _refresh_token(self) -> str:
+        """
+        Get a fresh token, through the cache file shared by all worker processes.
+
+        Under an exclusive file lock, a token another worker already refreshed is
+        adopted; otherwise this worker requests one and writes it for the others.
+        """
+        cache_path = settings.FRANCE_TRAVAIL_TOKEN_CACHE_PATH
+        if not cache_path:
+            self.access_token, self.token_expiry = await self._request_token()
+            return self.access_token
+
+        cache_path = Path(cache_path)
+        async with _file_lock(cache_path.with_suffix(".lock")):
+            cached = _read_cached_token(cache_path)
+            if cached and time.time() < cached[1] - TOKEN_REFRESH_MARGIN:
+                logger.info("Using France Travail token refreshed by another worker")
+                self.access_token, self.token_expiry = cached
+                return self.access_token
+
+            self.access_token, self.token_expiry = await self._request_token()
+            try:
+                _write_cached_token(cache_path, self.access_token, self.token_expiry)
+            except OSError as e:
+                logger.warning(f"Could not share France Travail token: {e}")
             return self.access_token
 
+    async def _request_token(self) -> tuple[str, float]:
+        """
+        Request a new token from the OAuth endpoint.
+
+        Returns:
+            Tuple of (access token, expiry timestamp)
+        """
+        response = await http_client.client.post(
+            self.AUTH_URL,
+            data={
+                "grant_type": "client_credentials",
+                "client_id": settings.FRANCE_TRAVAIL_CLIENT_ID,
+                "client_secret": settings.FRANCE_TRAVAIL_CLIENT_SECRET,
+                "scope": "api_offresdemploiv2 o2dsoffre",
+            },
+            headers={"Content-Type": "application/x-www-form-urlencoded"},
+        )
+        response.raise_for_status()
+        data = response.json()
+        logger.info("France Travail access token refreshed")
+        # Set expiry slightly before actual expiry (expires_in is in seconds)
+        return data["access_token"], time.time() + data["expires_in"] - 60
+
     async def search_jobs(
         self,
         keywords: str,
@@ -46,14 +125,143 @@ class FranceTravailService:
         departement: str | None = None,
         region: str | None = None,
         distance: int = 25,
+        max_results: int = DEFAULT_MAX_RESULTS,
         **kwargs,
     ) -> list[dict]:
+        """
+        Search offers, fetching up to `max_results` (at most 3150) across pages.
+
+        Returns:
+            Offers in API order
+        """
+        offers = []
+        async for page in self.iter_job_pages(
+            keywords, location, departement, region, distance, max_results, **kwargs
+        ):
+            offers.extend(page)
+        return offers
+
+    async def iter_job_pages(
+        self,
+        keywords: str,
+        location: str | None = None,
+        departement: str | None = None,
+        region: str | None = None,
+        distance: int = 25,
+        max_results: int = DEFAULT_MAX_RESULTS,
+        **kwargs,
+    ) -> AsyncIterator[list[dict]]:
+        """
+        Yield result pages in order while the following pages are still in flight.
+
+        All ranges up to `max_results` are requested concurrently (bounded by
+        FRANCE_TRAVAIL_PAGE_CONCURRENCY). Iteration stops at the first short page
+        or once the total reported in Content-Range is reached, and the requests
+        still pending are cancelled. A failing first page raises; a failing later
+        page ends the iteration with the pages already yielded.
+        """
+        params = self._search_params(
+            keywords, location, departement, region, distance, **kwargs
+        )
+        max_results = min(max_results, MAX_RANGE_START + PAGE_SIZE)
+        ranges = [
+            (start, min(start + PAGE_SIZE, max_results) - 1)
+            for start in range(0, max_results, PAGE_SIZE)
+        ]
+
         token = await self._get_access_token()
+        semaphore = asyncio.Semaphore(settings.FRANCE_TRAVAIL_PAGE_CONCURRENCY)
+
+        async def fetch(first: int, last: int) -> tuple[list[dict], int | None]:
+            async with semaphore:
+                return await self._fetch_range(token, params, first, last)
+
+        tasks = [asyncio.create_task(fetch(*bounds)) for bounds in ranges]
+        try:
+            for (first, last), task in zip(ranges, tasks, strict=True):
+                try:
+                    offers, total = await task
+                except httpx.HTTPError as e:
+                    if first == 0:
+                        raise
+                    logger.warning(
+                        f"France Travail page {first}-{last} failed, "
+                        f"keeping earlier pages: {e}"
+                    )
+                    break
+
+                if offers:
+                    yield offers
+                if len(offers) <= last - first or (
+                    total is not None and total <= last + 1
+                ):
+                    break
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def get_offer(self, offer_id: str) -> dict | None:
+        """
+        Fetch the current version of one offer.
+
+        Returns:
+            The offer, or None once it has been withdrawn
+        """
+        token = await self._get_access_token()
+        response = await http_client.client.get(
+            f"{self.BASE_URL}{self.OFFER_URL.format(offer_id=offer_id)}",
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        if response.status_code in (204, 404):
+            return None
+        response.raise_for_status()
+        return response.json()
+
+    async def _fetch_range(
+        self,
+        token: str,
+        params: dict,
+        first: int,
+        last: int,
+    ) -> tuple[list[dict], int | None]:
+        """
+        Fetch one range of results.
 
-        params = {
-            "motsCles": keywords,
-            "range": "0-49",  # Limit to 50 results
-        }
+        Returns:
+            Tuple of (offers, total number of matching offers if reported)
+        """
+        response = await http_client.client.get(
+            f"{self.BASE_URL}{self.SEARCH_URL}",
+            headers={"Authorization": f"Bearer {token}"},
+            params={**params, "range": f"{first}-{last}"},
+        )
+        logger.info(f"DEBUG: France Travail request: {params} (range {first}-{last})")
+
+        if response.status_code == 204:  # No content
+            return [], 0
+        # Past the last matching offer the API rejects the range
+        if first > 0 and response.status_code in (400, 416):
+            return [], None
+
+        response.raise_for_status()
+        data = response.json()
+        return data.get("resultats", []), _content_range_total(
+            response.headers.get("Content-Range")
+        )
+
+    @staticmethod
+    def _search_params(
+        keywords: str,
+        location: str | None,
+        departement: str | None,
+        region: str | None,
+        distance: int,
+        **kwargs,
+    ) -> dict:
+        params = {}
+        if keywords:
+            params["motsCles"] = keywords
 
         # Add advanced filters
         if kwargs.get("contract_type"):
@@ -98,22 +306,60 @@ class FranceTravailService:
                 params["commune"] = location
                 params["distance"] = distance
 
-        async with httpx.AsyncClient() as client:
-            logger.info(f"DEBUG: France Travail access token: {token}")
-            response = await client.get(
-                f"{self.BASE_URL}{self.SEARCH_URL}",
-                headers={"Authorization": f"Bearer {token}"},
-                params=params,
-            )
+        return params
+
+
+@asynccontextmanager
+async def _file_lock(path: Path):
+    """Exclusive advisory lock across processes (no-op where flock is unavailable)."""
+    if fcntl is None:
+        yield
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+    try:
+        await asyncio.to_thread(fcntl.flock, fd, fcntl.LOCK_EX)
+        yield
+    finally:
+        # Closing the descriptor releases the lock
+        os.close(fd)
+
+
+def _read_cached_token(path: Path) -> tuple[str, float] | None:
+    """Token shared in the cache file, if it belongs to the configured client."""
+    try:
+        data = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if data.get("client_id") != settings.FRANCE_TRAVAIL_CLIENT_ID or not data.get(
+        "access_token"
+    ):
+        return None
+    return data.get("access_token"), float(data.get("expiry", 0))
+
 
-            logger.info(f"DEBUG: France Travail request: {params}")
+def _write_cached_token(path: Path, token: str, expiry: float):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+    with os.fdopen(fd, "w") as f:
+        json.dump(
+            {
+                "client_id": settings.FRANCE_TRAVAIL_CLIENT_ID,
+                "access_token": token,
+                "expiry": expiry,
+            },
+            f,
+        )
+    os.replace(tmp_path, path)
 
-            if response.status_code == 204:  # No content
-                return []
 
-            response.raise_for_status()
-            data = response.json()
-            return data.get("resultats", [])
+def _content_range_total(header: str | None) -> int | None:
+    """Total from a Content-Range header such as "offres 0-149/3254"."""
+    if not header or "/" not in header:
+        return None
+    total = header.rsplit("/", 1)[1].strip()
+    return int(total) if total.isdigit() else None
 
 
 francetravail_service = FranceTravailService()
@@ -0,0 +1,284 @@
+"""Offline index of French regions, departments and communes (bundled COG data)"""
+
+import gzip
+import heapq
+import json
+import logging
+import re
+import unicodedata
+from bisect import bisect_left, bisect_right
+from collections.abc import Iterable
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+DATA_DIR = Path(__file__).resolve().parent.parent / "data" / "geo"
+# Regions and departments, small enough to ship in the repository
+DIVISIONS_FILE = "divisions.json"
+# Communes (~35k), built from geo.api.gouv.fr by `python -m app.services.geo_index`
+# (a Docker build step; GEO_COMMUNES_PATH points elsewhere than the data dir)
+COMMUNES_FILE = "communes.json.gz"
+# Fewer communes than this means the download was truncated
+MIN_COMMUNES = 30000
+COMMUNES_SOURCE_URL = (
+    "https://geo.api.gouv.fr/communes"
+    "?fields=nom,code,codesPostaux,codeDepartement,population&format=json"
+)
+
+# Leading articles dropped to add a second key ("Le Havre" is also "havre")
+ARTICLES = {"le", "la", "les", "l"}
+# Abbreviations expanded in names and queries
+ABBREVIATIONS = {"st": "saint", "ste": "sainte"}
+# Common region nicknames
+REGION_ALIASES = {"idf": "11", "paca": "93"}
+
+
+def normalize(text: str) -> str:
+    """Lowercase, strip accents and punctuation ("Saint-Étienne" -> "saint etienne")."""
+    text = unicodedata.normalize("NFKD", text)
+    text = "".join(char for char in text if not unicodedata.combining(char))
+    words = re.sub(r"[^a-z0-9]+", " ", text.lower()).split()
+    return " ".join(ABBREVIATIONS.get(word, word) for word in words)
+
+
+def _name_keys(name: str) -> set[str]:
+    key = normalize(name)
+    words = key.split(" ")
+    if len(words) > 1 and words[0] in ARTICLES:
+        return {key, " ".join(words[1:])}
+    return {key}
+
+
+class PrefixIndex:
+    """
+    Normalized keys sorted once and searched with bisect: a flattened trie where
+    all keys sharing a prefix form one contiguous slice.
+    """
+
+    def __init__(self, items: Iterable[tuple[str, int]]):
+        pairs = sorted(set(items))
+        self._keys = [key for key, _ in pairs]
+        self._ids = [item_id for _, item_id in pairs]
+
+    def exact(self, key: str) -> list[int]:
+        lo = bisect_left(self._keys, key)
+        hi = bisect_right(self._keys, key)
+        return self._ids[lo:hi]
+
+    def prefix(self, prefix: str) -> list[int]:
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + "\uffff")
+        return self._ids[lo:hi]
+
+
+class GeoIndex:
+    """
+    In-memory lookups mirroring the geo.api.gouv.fr endpoints the app uses.
+
+    Names match accent- and case-insensitively by prefix, exact names first.
+    Communes are also found by postal code or INSEE code and ranked by
+    population. Results have the same shape as the API responses.
+    """
+
+    def __init__(
+        self,
+        regions: list[dict[str, str]],
+        departements: list[dict[str, str]],
+        communes: list[list[Any]] | None = None,
+        version: str = "",
+    ):
+        self.version = version
+        self.regions = {region["code"]: region for region in regions}
+        self.departements = {dept["code"]: dept for dept in departements}
+        self._region_names = PrefixIndex(
+            (key, i)
+            for i, region in enumerate(regions)
+            for key in _name_keys(region["nom"])
+        )
+        self._region_list = regions
+        self._dept_names = PrefixIndex(
+            (key, i)
+            for i, dept in enumerate(departements)
+            for key in _name_keys(dept["nom"])
+        )
+        self._dept_list = departements
+
+        # Communes as parallel columns: INSEE code, name, postal codes, department, population
+        communes = communes or []
+        self._codes = [row[0] for row in communes]
+        self._names = [row[1] for row in communes]
+        self._postal_codes = [row[2] for row in communes]
+        self._commune_depts = [row[3] for row in communes]
+        self._population = [row[4] or 0 for row in communes]
+        self._by_insee = {code: i for i, code in enumerate(self._codes)}
+        self._by_postal_code: dict[str, list[int]] = {}
+        for i, postal_codes in enumerate(self._postal_codes):
+            for postal_code in postal_codes:
+                self._by_postal_code.setdefault(postal_code, []).append(i)
+        self._commune_names = PrefixIndex(
+            (key, i) for i, name in enumerate(self._names) for key in _name_keys(name)
+        )
+
+    @property
+    def has_communes(self) -> bool:
+        return bool(self._codes)
+
+    @classmethod
+    def load(
+        cls,
+        data_dir: str | Path | None = None,
+        communes_path: str | Path | None = None,
+    ) -> "GeoIndex":
+        """
+        Load the bundled dataset (communes are optional).
+
+        Raises:
+            OSError / ValueError if the divisions file is missing or invalid
+        """
+        data_dir = Path(data_dir or DATA_DIR)
+        divisions = json.loads((data_dir / DIVISIONS_FILE).read_text(encoding="utf-8"))
+
+        communes = None
+        communes_path = Path(communes_path or data_dir / COMMUNES_FILE)
+        if communes_path.exists():
+            with gzip.open(communes_path, "rt", encoding="utf-8") as f:
+                dataset = json.load(f)
+            communes = dataset["communes"]
+            if dataset.get("version") != divisions.get("version"):
+                logger.warning(
+                    f"Commune dataset {dataset.get('version')} does not match "
+                    f"divisions {divisions.get('version')}, rebuild it"
+                )
+        else:
+            logger.error(f"No commune dataset at {communes_path}, cities stay online")
+
+        index = cls(
+            divisions["regions"],
+            divisions["departements"],
+            communes,
+            version=divisions.get("version", ""),
+        )
+        logger.info(
+            f"🗺️ Geo index loaded ({index.version}): {len(index.regions)} regions, "
+            f"{len(index.departements)} departments, {len(index._codes)} communes"
+        )
+        return index
+
+    def search_regions(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        key = normalize(query)
+        if key in REGION_ALIASES:
+            return [self._region(REGION_ALIASES[key])]
+        ids = self._ranked_names(self._region_names, key, limit)
+        return [self._region(self._region_list[i]["code"]) for i in ids]
+
+    def search_departments(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        code = query.strip().upper()
+        if code in self.departements:
+            return [self._departement(code)]
+        ids = self._ranked_names(self._dept_names, normalize(query), limit)
+        return [self._departement(self._dept_list[i]["code"]) for i in ids]
+
+    def search_cities(self, query: str, limit: int = 10) -> list[dict[str, Any]]:
+        """Communes by postal code, INSEE code or name, most populated first."""
+        query = query.strip()
+        if query in self._by_postal_code:
+            ids = self._by_population(self._by_postal_code[query], limit)
+        elif query.upper() in self._by_insee:
+            ids = [self._by_insee[query.upper()]]
+        else:
+            key = normalize(query)
+            if not key:
+                return []
+            exact = self._by_population(self._commune_names.exact(key), limit)
+            seen = set(exact)
+            rest = [i for i in self._commune_names.prefix(key) if i not in seen]
+            ids = exact + self._by_population(rest, limit - len(exact))
+        return [self._commune(i) for i in ids]
+
+    def commune(self, insee_code: str) -> dict[str, Any] | None:
+        i = self._by_insee.get(insee_code)
+        return None if i is None else self._commune(i)
+
+    def _by_population(self, ids: list[int], limit: int) -> list[int]:
+        if limit <= 0:
+            return []
+        return heapq.nlargest(
+            limit, dict.fromkeys(ids), key=self._population.__getitem__
+        )
+
+    @staticmethod
+    def _ranked_names(names: PrefixIndex, key: str, limit: int) -> list[int]:
+        if not key:
+            return []
+        ids = list(dict.fromkeys(names.exact(key) + names.prefix(key)))
+        return ids[:limit]
+
+    def _region(self, code: str) -> dict[str, Any]:
+        region = self.regions[code]
+        return {"nom": region["nom"], "code": region["code"]}
+
+    def _departement(self, code: str) -> dict[str, Any]:
+        dept = self.departements[code]
+        return {
+            "nom": dept["nom"],
+            "code": dept["code"],
+            "region": self._region(dept["codeRegion"]),
+        }
+
+    def _commune(self, i: int) -> dict[str, Any]:
+        dept = self.departements.get(self._commune_depts[i])
+        return {
+            "nom": self._names[i],
+            "code": self._codes[i],
+            "codesPostaux": self._postal_codes[i],
+            "departement": {"code": dept["code"], "nom": dept["nom"]} if dept else None,
+            "region": self._region(dept["codeRegion"]) if dept else None,
+            "population": self._population[i],
+        }
+
+
+def build_communes_dataset(path: str | Path | None = None) -> Path:
+    """
+    Download every commune from geo.api.gouv.fr into the compact bundled file.
+
+    Raises:
+        httpx.HTTPError if the download fails, ValueError if it looks truncated
+    """
+    import httpx
+
+    response = httpx.get(COMMUNES_SOURCE_URL, timeout=120)
+    response.raise_for_status()
+    communes = [
+        [
+            commune["code"],
+            commune["nom"],
+            sorted(commune.get("codesPostaux", [])),
+            commune.get("codeDepartement"),
+            commune.get("population") or 0,
+        ]
+        for commune in response.json()
+    ]
+    communes.sort(key=lambda row: row[0])
+    if len(communes) < MIN_COMMUNES:
+        raise ValueError(f"Only {len(communes)} communes downloaded")
+
+    divisions = json.loads((DATA_DIR / DIVISIONS_FILE).read_text(encoding="utf-8"))
+    path = Path(path or DATA_DIR / COMMUNES_FILE)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump(
+            {"version": divisions.get("version", ""), "communes": communes},
+            f,
+            ensure_ascii=False,
+            separators=(",", ":"),
+        )
+    logger.info(f"Wrote {len(communes)} communes to {path}")
+    return path
+
+
+if __name__ == "__main__":
+    from app.core.config import settings
+
+    logging.basicConfig(level=logging.INFO)
+    build_communes_dataset(settings.GEO_COMMUNES_PATH or None)
@@ -0,0 +1,63 @@
+import importlib.util
+import logging
+
+import httpx
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SharedHttpClient:
+    """
+    App-lifetime `httpx.AsyncClient` for outbound REST calls (France Travail,
+    geo.api.gouv.fr), so concurrent searches reuse warm TLS connections instead
+    of handshaking on every request.
+
+    Opened and closed by the FastAPI lifespan; code running outside the app
+    (MCP server, scripts) gets a client created on first use.
+    """
+
+    def __init__(self):
+        self._client: httpx.AsyncClient | None = None
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+        return self._client
+
+    async def start(self):
+        """Open the connection pool (call once at application startup)."""
+        if self._client is None or self._client.is_closed:
+            self._client = self._create_client()
+
+    async def aclose(self):
+        """Close the connection pool."""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    @staticmethod
+    def _create_client() -> httpx.AsyncClient:
+        http2 = settings.HTTP_CLIENT_HTTP2
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("HTTP/2 needs the 'h2' package, falling back to HTTP/1.1")
+            http2 = False
+
+        logger.info(f"Opening shared HTTP client (HTTP/2: {http2})")
+        return httpx.AsyncClient(
+            http2=http2,
+            limits=httpx.Limits(
+                max_connections=settings.HTTP_CLIENT_MAX_CONNECTIONS,
+                max_keepalive_connections=settings.HTTP_CLIENT_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=settings.HTTP_CLIENT_KEEPALIVE_EXPIRY,
+            ),
+            timeout=httpx.Timeout(
+                settings.HTTP_CLIENT_TIMEOUT,
+                connect=settings.HTTP_CLIENT_CONNECT_TIMEOUT,
+            ),
+        )
+
+
+http_client = SharedHttpClient()
@@ -1,11 +1,15 @@
 """Interview Service - Business logic for managing interviews"""
 
+import asyncio
 import json
 import logging
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass, field
 
 from fastapi import BackgroundTasks, HTTPException, status
 from sqlalchemy.orm import Session
 
+from app.db import SessionLocal
 from app.models.comment import FeedbackComment, FeedbackCommentType
 from app.models.feedback import Feedback
 from app.models.interview import Interview, InterviewerStyle
@@ -13,11 +17,29 @@ from app.models.question_answer import QuestionAnswer
 from app.models.user import User
 from app.services.grading_service import grading_service
 from app.services.llm_service import llm_service
-from app.services.voice_service import voice_service
+from app.services.voice_service import AudioInput, voice_service
 
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class InterviewSession:
+    """
+    In-memory state of a live interview, kept between turns of a WebSocket session
+    so that each turn does not need to reload the interview from the database.
+    """
+
+    interview_id: int
+    user_id: int
+    interviewer_style: InterviewerStyle
+    job_description: str | None
+    candidate_context: str
+    question_count: int
+    history: list[dict[str, str]] = field(default_factory=list)
+    pending_qa_id: int | None = None
+    pending_question: str | None = None
+
+
 class InterviewService:
     """Service for managing interview sessions and interactions."""
 
@@ -27,6 +49,8 @@ class InterviewService:
         self.llm_service = llm_service
         self.voice_service = voice_service
         self.grading_service = grading_service
+        # Keep references to fire-and-forget grading tasks until they finish
+        self._grading_tasks: set[asyncio.Task] = set()
         logger.info("InterviewService initialized!")
 
     async def start_interview(
@@ -94,6 +118,13 @@ class InterviewService:
 
             logger.info(f"Generated {interviewer_style} greeting for {user.first_name}")
 
+            # The greeting is final now: render its audio while the browser is
+            # still handling this response, so the audio request finds it ready
+            try:
+                self.voice_service.presynthesize(greeting_text)
+            except Exception as e:
+                logger.warning(f"Could not start greeting synthesis: {str(e)}")
+
             return {
                 "session_id": str(db_interview.id),
                 "interview_id": db_interview.id,
@@ -108,11 +139,33 @@ class InterviewService:
             logger.error(f"Error starting interview: {str(e)}")
             raise
 
+    def get_owned_interview(
+        self, db: Session, interview_id: int, user_id: int
+    ) -> Interview:
+        """
+        Load an interview and check that it belongs to the given user.
+
+        Raises:
+            ValueError: If the interview does not exist
+            HTTPException: If the interview belongs to another user
+        """
+        interview = db.query(Interview).filter(Interview.id == interview_id).first()
+        if not interview:
+            raise ValueError(f"Interview {interview_id} not found")
+
+        if interview.user_id != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Not authorized to access this interview",
+            )
+
+        return interview
+
     async def process_response(
         self,
         db: Session,
         interview_id: int,
-        audio_file_path: str,
+        audio: AudioInput,
         user_id: int,
         background_tasks: BackgroundTasks,
         language: str = "fr",
@@ -123,7 +176,7 @@ class InterviewService:
         Args:
             db: Database session
             interview_id: Interview identifier
-            audio_file_path: Path to audio file
+            audio: Recorded answer: file path, bytes or binary file object
             user_id: User identifier
             background_tasks: FastAPI BackgroundTasks for async grading
             language: Language code
@@ -132,59 +185,16 @@ class InterviewService:
             Dict with transcription and interviewer response
         """
         try:
-            # Get interview from database
-            interview = db.query(Interview).filter(Interview.id == interview_id).first()
-            if not interview:
-                raise ValueError(f"Interview {interview_id} not found")
-
-            if interview.user_id != user_id:
-                raise HTTPException(
-                    status_code=status.HTTP_403_FORBIDDEN,
-                    detail="Not authorized to access this interview",
-                )
+            interview = self.get_owned_interview(db, interview_id, user_id)
 
             logger.info(f"Processing audio for interview {interview_id}")
 
-            # Step 1: Transcribe audio using voice service
-            logger.info("Transcribing audio...")
-            transcribed_text = await self.voice_service.transcribe_audio(
-                audio_file_path, language=language
-            )
-            logger.info(f"Transcription: {transcribed_text}")
-
-            # Step 2: Update the last question with the user's answer
-            last_qa = (
-                interview.question_answers[-1] if interview.question_answers else None
-            )
-            if last_qa and last_qa.answer is None:
-                last_qa.answer = transcribed_text
-                db.flush()
-            else:
-                logger.warning(
-                    f"No pending question found for interview {interview_id}"
-                )
-
-            # Step 3: Build conversation history from database
-            conversation_history = self._build_conversation_history(interview)
-
-            candidate_context = ""
-            if interview.user:
-                db.refresh(interview.user)
-                if interview.user.raw_resume_text:
-                    logger.info(
-                        f"Found candidate {interview.user.first_name} with resume text length: {len(interview.user.raw_resume_text)}"
-                    )
-                    candidate_context = interview.user.raw_resume_text
-                else:
-                    logger.warning(
-                        f"Candidate {interview.user.first_name} has no resume text."
-                    )
-            else:
-                logger.warning("No candidate associated with this interview.")
-
-            logger.info(
-                f"Passing candidate_context to LLM (Length: {len(candidate_context)})"
-            )
+            (
+                transcribed_text,
+                last_qa,
+                conversation_history,
+                candidate_context,
+            ) = await self._begin_turn(db, interview, audio, language)
 
             # Step 4: Get LLM response with interviewer personality
             logger.info(
@@ -199,27 +209,7 @@ class InterviewService:
             )
             logger.info(f"LLM response: {llm_response[:100]}...")
 
-            # Step 5: Create new question-answer record
-            qa = QuestionAnswer(
-                question=llm_response,
-                answer=None,
-                interview_id=interview.id,
-            )
-            interview.question_count = interview.question_count + 1
-
-            db.add(qa)
-            db.commit()
-
-            # Schedule background grading for the previous answer
-            if last_qa and last_qa.answer:
-                background_tasks.add_task(
-                    self.grading_service.grade_and_update,
-                    qa_id=last_qa.id,
-                    question=last_qa.question,
-                    answer=last_qa.answer,
-                    interviewer_style=interview.interviewer_style,
-                )
-                logger.info(f"Background grading task scheduled for QA {last_qa.id}")
+            self._complete_turn(db, interview, last_qa, llm_response, background_tasks)
 
             return {
                 "transcription": transcribed_text,
@@ -234,6 +224,326 @@ class InterviewService:
             logger.error(f"Error processing response: {str(e)}")
             raise
 
+    async def process_response_stream(
+        self,
+        db: Session,
+        interview_id: int,
+        audio: AudioInput,
+        user_id: int,
+        background_tasks: BackgroundTasks,
+        language: str = "fr",
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Process candidate's audio response, streaming the interviewer reply.
+
+        Yields, in order:
+            {"type": "transcription", "text": ...}
+            {"type": "delta", "text": ...} for each generated token chunk
+            {"type": "done", "question_id": ..., ...} once the reply is persisted
+
+        Args:
+            db: Database session
+            interview_id: Interview identifier
+            audio: Recorded answer: file path, bytes or binary file object
+            user_id: User identifier
+            background_tasks: FastAPI BackgroundTasks for async grading
+            language: Language code
+        """
+        try:
+            interview = self.get_owned_interview(db, interview_id, user_id)
+
+            logger.info(f"Streaming response for interview {interview_id}")
+
+            (
+                transcribed_text,
+                last_qa,
+                conversation_history,
+                candidate_context,
+            ) = await self._begin_turn(db, interview, audio, language)
+
+            yield {"type": "transcription", "text": transcribed_text}
+
+            parts = []
+            async for delta in self.llm_service.chat_stream(
+                transcribed_text,
+                conversation_history,
+                interview.interviewer_style,
+                candidate_context=candidate_context,
+                job_description=interview.job_description,
+            ):
+                parts.append(delta)
+                yield {"type": "delta", "text": delta}
+
+            llm_response = "".join(parts)
+            logger.info(f"LLM response: {llm_response[:100]}...")
+
+            qa = self._complete_turn(
+                db, interview, last_qa, llm_response, background_tasks
+            )
+
+            yield {
+                "type": "done",
+                "question_id": qa.id,
+                "transcription": transcribed_text,
+                "response": llm_response,
+                "session_id": str(interview_id),
+                "question_count": interview.question_count,
+                "interviewer_style": interview.interviewer_style,
+            }
+
+        except Exception as e:
+            db.rollback()
+            logger.error(f"Error streaming response: {str(e)}")
+            raise
+
+    def open_session(
+        self, db: Session, interview_id: int, user_id: int
+    ) -> InterviewSession:
+        """
+        Load an interview once into an in-memory session for a live connection.
+
+        Args:
+            db: Database session
+            interview_id: Interview identifier
+            user_id: User identifier
+
+        Returns:
+            InterviewSession holding the history and context needed for each turn
+        """
+        interview = self.get_owned_interview(db, interview_id, user_id)
+
+        candidate_context = ""
+        if interview.user and interview.user.raw_resume_text:
+            candidate_context = interview.user.raw_resume_text
+
+        last_qa = interview.question_answers[-1] if interview.question_answers else None
+        pending_qa = last_qa if last_qa and last_qa.answer is None else None
+
+        logger.info(f"Opened live session for interview {interview_id}")
+
+        return InterviewSession(
+            interview_id=interview.id,
+            user_id=user_id,
+            interviewer_style=interview.interviewer_style,
+            job_description=interview.job_description,
+            candidate_context=candidate_context,
+            question_count=interview.question_count,
+            history=self._build_conversation_history(interview),
+            pending_qa_id=pending_qa.id if pending_qa else None,
+            pending_question=pending_qa.question if pending_qa else None,
+        )
+
+    async def process_session_turn(
+        self,
+        session: InterviewSession,
+        audio: AudioInput | None = None,
+        language: str = "fr",
+        transcription: str | None = None,
+    ) -> AsyncGenerator[dict, None]:
+        """
+        Process one candidate answer within a live session, streaming the reply.
+
+        Uses the in-memory session state instead of reloading the interview, and
+        only touches the database to persist the turn. Yields the same events as
+        `process_response_stream`.
+
+        Args:
+            session: Live interview session
+            audio: Recorded answer (ignored if transcription is given)
+            language: Language code
+            transcription: Answer already transcribed while the candidate spoke
+        """
+        logger.info(f"Processing live turn for interview {session.interview_id}")
+
+        if transcription is not None:
+            transcribed_text = transcription
+        else:
+            transcribed_text = await self.voice_service.transcribe_audio(
+                audio, language=language
+            )
+        logger.info(f"Transcription: {transcribed_text}")
+
+        yield {"type": "transcription", "text": transcribed_text}
+
+        answered_qa_id = session.pending_qa_id
+        answered_question = session.pending_question
+        history = list(session.history)
+        if answered_qa_id is not None:
+            history.append({"role": "user", "content": transcribed_text})
+        else:
+            logger.warning(
+                f"No pending question found for interview {session.interview_id}"
+            )
+
+        parts = []
+        async for delta in self.llm_service.chat_stream(
+            transcribed_text,
+            history,
+            session.interviewer_style,
+            candidate_context=session.candidate_context,
+            job_description=session.job_description,
+        ):
+            parts.append(delta)
+            yield {"type": "delta", "text": delta}
+
+        llm_response = "".join(parts)
+        logger.info(f"LLM response: {llm_response[:100]}...")
+
+        db = SessionLocal()
+        try:
+            if answered_qa_id is not None:
+                db.query(QuestionAnswer).filter(
+                    QuestionAnswer.id == answered_qa_id
+                ).update({QuestionAnswer.answer: transcribed_text})
+
+            qa = QuestionAnswer(
+                question=llm_response,
+                answer=None,
+                interview_id=session.interview_id,
+            )
+            db.add(qa)
+            db.query(Interview).filter(Interview.id == session.interview_id).update(
+                {Interview.question_count: Interview.question_count + 1}
+            )
+            db.commit()
+            qa_id = qa.id
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        # Only advance the in-memory state once the turn is persisted
+        history.append({"role": "assistant", "content": llm_response})
+        session.history = history
+        session.pending_qa_id = qa_id
+        session.pending_question = llm_response
+        session.question_count += 1
+
+        if answered_qa_id is not None:
+            task = asyncio.create_task(
+                self.grading_service.grade_and_update(
+                    qa_id=answered_qa_id,
+                    question=answered_question,
+                    answer=transcribed_text,
+                    interviewer_style=session.interviewer_style,
+                )
+            )
+            self._grading_tasks.add(task)
+            task.add_done_callback(self._grading_tasks.discard)
+            logger.info(f"Background grading task scheduled for QA {answered_qa_id}")
+
+        yield {
+            "type": "done",
+            "question_id": qa_id,
+            "transcription": transcribed_text,
+            "response": llm_response,
+            "session_id": str(session.interview_id),
+            "question_count": session.question_count,
+            "interviewer_style": session.interviewer_style,
+        }
+
+    async def end_session(self, session: InterviewSession) -> dict:
+        """End the interview behind a live session and return its summary."""
+        db = SessionLocal()
+        try:
+            return await self.end_interview(
+                db=db, interview_id=session.interview_id, user_id=session.user_id
+            )
+        finally:
+            db.close()
+
+    async def _begin_turn(
+        self,
+        db: Session,
+        interview: Interview,
+        audio: AudioInput,
+        language: str,
+    ) -> tuple[str, QuestionAnswer | None, list, str]:
+        """
+        Transcribe the candidate's answer and gather the LLM inputs for a turn.
+
+        Returns:
+            Tuple of (transcription, answered QA, conversation history,
+            candidate context)
+        """
+        # Step 1: Transcribe audio using voice service
+        logger.info("Transcribing audio...")
+        transcribed_text = await self.voice_service.transcribe_audio(
+            audio, language=language
+        )
+        logger.info(f"Transcription: {transcribed_text}")
+
+        # Step 2: Update the last question with the user's answer
+        last_qa = interview.question_answers[-1] if interview.question_answers else None
+        if last_qa and last_qa.answer is None:
+            last_qa.answer = transcribed_text
+            db.flush()
+        else:
+            logger.warning(f"No pending question found for interview {interview.id}")
+
+        # Step 3: Build conversation history from database
+        conversation_history = self._build_conversation_history(interview)
+
+        candidate_context = ""
+        if interview.user:
+            db.refresh(interview.user)
+            if interview.user.raw_resume_text:
+                logger.info(
+                    f"Found candidate {interview.user.first_name} with resume text length: {len(interview.user.raw_resume_text)}"
+                )
+                candidate_context = interview.user.raw_resume_text
+            else:
+                logger.warning(
+                    f"Candidate {interview.user.first_name} has no resume text."
+                )
+        else:
+            logger.warning("No candidate associated with this interview.")
+
+        logger.info(
+            f"Passing candidate_context to LLM (Length: {len(candidate_context)})"
+        )
+
+        return transcribed_text, last_qa, conversation_history, candidate_context
+
+    def _complete_turn(
+        self,
+        db: Session,
+        interview: Interview,
+        last_qa: QuestionAnswer | None,
+        llm_response: str,
+        background_tasks: BackgroundTasks,
+    ) -> QuestionAnswer:
+        """
+        Persist the interviewer reply as the next question and schedule grading.
+
+        Returns:
+            The newly created QuestionAnswer record
+        """
+        # Step 5: Create new question-answer record
+        qa = QuestionAnswer(
+            question=llm_response,
+            answer=None,
+            interview_id=interview.id,
+        )
+        interview.question_count = interview.question_count + 1
+
+        db.add(qa)
+        db.commit()
+
+        # Schedule background grading for the previous answer
+        if last_qa and last_qa.answer:
+            background_tasks.add_task(
+                self.grading_service.grade_and_update,
+                qa_id=last_qa.id,
+                question=last_qa.question,
+                answer=last_qa.answer,
+                interviewer_style=interview.interviewer_style,
+            )
+            logger.info(f"Background grading task scheduled for QA {last_qa.id}")
+
+        return qa
+
     async def end_interview(self, db: Session, interview_id: int, user_id: int) -> dict:
         """
         End interview session and generate summary.
@@ -0,0 +1,223 @@
+"""Approximate nearest-neighbour index over recently seen job offers (IVF on NumPy)"""
+
+import logging
+import threading
+import time
+from typing import Any
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+
+class JobIndex:
+    """
+    In-memory inverted-file (IVF) index of job offer embeddings.
+
+    Vectors are L2-normalized, so inner product is cosine similarity. Once the
+    index holds `train_threshold` offers, spherical k-means splits it into
+    ~sqrt(N) lists and a search only scans the `n_probe` lists closest to each
+    query; below that it scans everything. The lists are retrained whenever the
+    index has doubled since the last training.
+
+    Offers are upserted by their France Travail id and expire `ttl_seconds`
+    after they were last seen. Past `max_entries`, the least recently seen
+    offers are dropped.
+
+    All methods are blocking and thread-safe; `add` may retrain, so call it
+    from a worker thread.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float,
+        max_entries: int,
+        n_probe: int = 8,
+        train_threshold: int = 2048,
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.n_probe = n_probe
+        self.train_threshold = train_threshold
+        self._lock = threading.Lock()
+
+        self.dim: int | None = None
+        self._size = 0  # Slots in use (alive or freed)
+        self._vectors = np.zeros((0, 0), dtype=np.float32)
+        self._seen_at = np.zeros(0)
+        self._alive = np.zeros(0, dtype=bool)
+        self._assign = np.zeros(0, dtype=np.int32)
+        self._jobs: list[dict[str, Any] | None] = []
+        self._slots: dict[str, int] = {}
+
+        self._centroids: np.ndarray | None = None
+        self._trained_at_count = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add(self, jobs: list[dict[str, Any]], vectors: np.ndarray):
+        """Insert or refresh offers (jobs without an id are ignored)."""
+        vectors = normalize_rows(vectors)
+        now = time.time()
+        with self._lock:
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                self._grow(1024)
+            if vectors.shape[1] != self.dim:
+                raise ValueError(
+                    f"Expected {self.dim}-dimensional vectors, got {vectors.shape[1]}"
+                )
+
+            for job, vector in zip(jobs, vectors, strict=True):
+                job_id = job.get("id")
+                if not job_id or not vector.any():
+                    continue
+                slot = self._slots.get(job_id)
+                if slot is None:
+                    if self._size == len(self._vectors):
+                        self._grow(2 * len(self._vectors))
+                    slot = self._size
+                    self._size += 1
+                    self._slots[job_id] = slot
+                    self._alive[slot] = True
+                self._vectors[slot] = vector
+                self._jobs[slot] = job
+                self._seen_at[slot] = now
+                self._assign[slot] = self._nearest_list(vector)
+
+            self._expire(now)
+            if len(self._slots) > self.max_entries:
+                self._evict_oldest(int(self.max_entries * 0.9))
+            if self._size > 1.25 * len(self._slots) + 1024:
+                self._compact()
+            if (
+                len(self._slots) >= self.train_threshold
+                and len(self._slots) >= 2 * self._trained_at_count
+            ):
+                self._train()
+
+    def search(
+        self, queries: np.ndarray, k: int
+    ) -> tuple[list[dict[str, Any]], np.ndarray]:
+        """
+        Approximate top-`k` offers for each query, merged.
+
+        Returns:
+            Tuple of (offers, their normalized vectors as a matrix); empty if
+            the index is empty or the query dimension does not match
+        """
+        queries = normalize_rows(queries)
+        with self._lock:
+            if not self._slots or queries.shape[1] != self.dim:
+                return [], np.zeros((0, queries.shape[1]), dtype=np.float32)
+
+            live = self._alive[: self._size] & (
+                self._seen_at[: self._size] > time.time() - self.ttl_seconds
+            )
+            selected = set()
+            for query in queries:
+                candidates = live
+                if self._centroids is not None:
+                    probes = np.argsort(-(self._centroids @ query))[: self.n_probe]
+                    candidates = live & np.isin(self._assign[: self._size], probes)
+                slots = np.flatnonzero(candidates)
+                if len(slots) > k:
+                    scores = self._vectors[slots] @ query
+                    slots = slots[np.argpartition(-scores, k - 1)[:k]]
+                selected.update(slots.tolist())
+
+            slots = sorted(selected)
+            return [self._jobs[slot] for slot in slots], self._vectors[slots].copy()
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self._slots),
+            "lists": 0 if self._centroids is None else len(self._centroids),
+            "trained_at": self._trained_at_count,
+        }
+
+    def _grow(self, capacity: int):
+        extra = capacity - len(self._vectors)
+        self._vectors = np.vstack(
+            [
+                self._vectors.reshape(-1, self.dim),
+                np.zeros((extra, self.dim), np.float32),
+            ]
+        )
+        self._seen_at = np.concatenate([self._seen_at, np.zeros(extra)])
+        self._alive = np.concatenate([self._alive, np.zeros(extra, dtype=bool)])
+        self._assign = np.concatenate([self._assign, np.full(extra, -1, np.int32)])
+        self._jobs.extend([None] * extra)
+
+    def _nearest_list(self, vector: np.ndarray) -> int:
+        if self._centroids is None:
+            return -1
+        return int(np.argmax(self._centroids @ vector))
+
+    def _free(self, slots: np.ndarray):
+        for slot in slots.tolist():
+            job = self._jobs[slot]
+            self._slots.pop(job.get("id"), None)
+            self._jobs[slot] = None
+            self._alive[slot] = False
+
+    def _expire(self, now: float):
+        stale = np.flatnonzero(
+            self._alive[: self._size]
+            & (self._seen_at[: self._size] <= now - self.ttl_seconds)
+        )
+        if len(stale):
+            self._free(stale)
+            logger.info(f"🗂️ Job index expired {len(stale)} stale offers")
+
+    def _evict_oldest(self, keep: int):
+        alive = np.flatnonzero(self._alive[: self._size])
+        order = np.argsort(self._seen_at[alive])
+        self._free(alive[order[: len(alive) - keep]])
+
+    def _compact(self):
+        """Pack alive slots to the front after expiry/eviction freed many."""
+        alive = np.flatnonzero(self._alive[: self._size])
+        count = len(alive)
+        self._vectors[:count] = self._vectors[alive]
+        self._seen_at[:count] = self._seen_at[alive]
+        self._assign[:count] = self._assign[alive]
+        jobs = [self._jobs[slot] for slot in alive.tolist()]
+        self._jobs[:count] = jobs
+        self._jobs[count : self._size] = [None] * (self._size - count)
+        self._alive[:count] = True
+        self._alive[count : self._size] = False
+        self._size = count
+        self._slots = {job["id"]: slot for slot, job in enumerate(jobs)}
+
+    def _train(self, iterations: int = 10, sample_size: int = 20000):
+        """Spherical k-means over (a sample of) the live vectors."""
+        alive = np.flatnonzero(self._alive[: self._size])
+        n_lists = int(np.clip(np.sqrt(len(alive)), 16, 1024))
+        rng = np.random.default_rng(0)
+        sample = self._vectors[
+            rng.choice(alive, size=min(sample_size, len(alive)), replace=False)
+        ]
+
+        centroids = sample[rng.choice(len(sample), size=n_lists, replace=False)]
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            sums = np.zeros_like(centroids)
+            np.add.at(sums, assignment, sample)
+            # Empty lists keep their previous centroid
+            filled = np.any(sums != 0, axis=1)
+            centroids[filled] = normalize_rows(sums[filled])
+
+        self._centroids = centroids
+        self._assign[: self._size] = -1
+        self._assign[alive] = np.argmax(self._vectors[alive] @ centroids.T, axis=1)
+        self._trained_at_count = len(alive)
+        logger.info(f"🗂️ Job index trained: {len(alive)} offers in {n_lists} lists")
+
+
+def normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    """L2-normalize rows as float32; all-zero rows stay zero."""
+    matrix = np.atleast_2d(np.asarray(matrix, dtype=np.float32))
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.divide(matrix, norms, out=np.zeros_like(matrix), where=norms > 0)
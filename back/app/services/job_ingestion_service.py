@@ -0,0 +1,337 @@
+import asyncio
+import hashlib
+import json
+import logging
+from datetime import datetime, timedelta
+from typing import Any
+
+from app.core.config import settings
+from app.db import SessionLocal
+from app.models.job_offer import JobIngestionState, JobOffer
+from app.services.francetravail_service import francetravail_service
+from app.services.ranking_service import ranking_service
+
+logger = logging.getLogger(__name__)
+
+# `publieeDepuis` values accepted by the offers search API (days)
+PUBLISHED_SINCE_WINDOWS = (1, 3, 7, 14, 31)
+
+# Deepest the search API pages (first index at most 3000, 150 per page)
+MAX_SCOPE_RESULTS = 3150
+
+# Offers loaded per batch when warming the job index from the table
+WARMUP_BATCH_SIZE = 1000
+
+
+def _parse_date(value: str | None) -> datetime | None:
+    """Parse an API timestamp ("2025-01-15T10:23:45.000Z") to naive UTC."""
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is not None:
+        # Shift to UTC without datetime.UTC, which needs Python 3.11
+        parsed = parsed.replace(tzinfo=None) - parsed.utcoffset()
+    return parsed
+
+
+def _offer_department(offer: dict[str, Any]) -> str | None:
+    commune = (offer.get("lieuTravail") or {}).get("commune") or ""
+    if not commune:
+        return None
+    # INSEE commune codes start with the department (3 chars overseas)
+    return commune[:3] if commune.startswith("97") else commune[:2]
+
+
+class JobIngestionService:
+    """
+    Keeps a local copy of recent France Travail offers, ahead of user searches.
+
+    Each run pages through the search API for every configured grand domaine x
+    region scope, restricted to a `publieeDepuis` window that covers the time
+    since the scope's high-water mark (latest `dateActualisation` ingested).
+    New or changed offers are upserted into `job_offers`; every offer seen is
+    embedded (reusing stored vectors) and added to the ranking job index.
+
+    `publieeDepuis` filters on publication date only, so offers modified after
+    an older publication are caught by `refresh_known_offers`, which re-fetches
+    stored offers by id once they have not been checked for a while.
+    """
+
+    async def run(self) -> dict:
+        """
+        Ingest every configured scope, then prune offers past retention.
+
+        Returns:
+            Dict with ingestion statistics
+        """
+        stats = {"scopes": 0, "fetched": 0, "upserted": 0, "indexed": 0, "errors": []}
+
+        for domain in settings.JOB_INGESTION_DOMAINS or [None]:
+            for region in settings.JOB_INGESTION_REGIONS or [None]:
+                scope = f"{domain or '*'}:{region or '*'}"
+                try:
+                    scope_stats = await self.ingest_scope(domain, region)
+                    stats["scopes"] += 1
+                    for key in ("fetched", "upserted", "indexed"):
+                        stats[key] += scope_stats[key]
+                except Exception as e:
+                    logger.error(f"Job ingestion failed for scope {scope}: {str(e)}")
+                    stats["errors"].append(f"{scope}: {str(e)}")
+
+        try:
+            stats["refreshed"] = await self.refresh_known_offers()
+        except Exception as e:
+            logger.error(f"Job offer refresh failed: {str(e)}")
+            stats["errors"].append(f"refresh: {str(e)}")
+
+        stats["pruned"] = self.prune()
+        return stats
+
+    async def ingest_scope(self, domain: str | None, region: str | None) -> dict:
+        """
+        Fetch the offers of one scope published since its high-water mark.
+
+        Args:
+            domain: France Travail grand domaine code (e.g. "M" for IT), or None
+            region: Region code, or None for all of France
+
+        Returns:
+            Dict with fetched/upserted/indexed counts
+        """
+        scope = f"{domain or '*'}:{region or '*'}"
+        db = SessionLocal()
+        try:
+            state = db.get(JobIngestionState, scope) or JobIngestionState(scope=scope)
+            high_water_mark = state.high_water_mark
+            window = self._published_since(high_water_mark)
+            logger.info(
+                f"Ingesting scope {scope} (window: {window} days, "
+                f"high-water mark: {high_water_mark})"
+            )
+
+            offers = await self._fetch_scope(domain, region, window)
+            upserted = self._upsert(db, offers, high_water_mark, domain)
+
+            dates = [_parse_date(offer.get("dateActualisation")) for offer in offers]
+            dates = [date for date in dates if date is not None]
+            if dates:
+                state.high_water_mark = max([*dates, high_water_mark or dates[0]])
+            state.last_run_at = datetime.utcnow()
+            db.merge(state)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        indexed = await ranking_service.index_offers(offers) if offers else 0
+        logger.info(
+            f"Scope {scope}: fetched {len(offers)}, upserted {upserted}, indexed {indexed}"
+        )
+        return {"fetched": len(offers), "upserted": upserted, "indexed": indexed}
+
+    async def refresh_known_offers(self) -> dict:
+        """
+        Re-fetch the stored offers least recently checked, by id.
+
+        Up to JOB_INGESTION_REFRESH_BATCH offers not checked for
+        JOB_INGESTION_REFRESH_HOURS are read again: changed ones are rewritten,
+        withdrawn ones deleted, and live ones re-indexed. Offers whose fetch
+        fails are left for the next run.
+
+        Returns:
+            Dict with checked/updated/deleted counts
+        """
+        cutoff = datetime.utcnow() - timedelta(
+            hours=settings.JOB_INGESTION_REFRESH_HOURS
+        )
+        db = SessionLocal()
+        try:
+            rows = (
+                db.query(JobOffer.id, JobOffer.grand_domaine)
+                .filter(JobOffer.fetched_at < cutoff)
+                .order_by(JobOffer.fetched_at)
+                .limit(settings.JOB_INGESTION_REFRESH_BATCH)
+                .all()
+            )
+        finally:
+            db.close()
+        if not rows:
+            return {"checked": 0, "updated": 0, "deleted": 0}
+
+        semaphore = asyncio.Semaphore(settings.FRANCE_TRAVAIL_PAGE_CONCURRENCY)
+
+        async def fetch(offer_id: str) -> dict | None:
+            async with semaphore:
+                return await francetravail_service.get_offer(offer_id)
+
+        results = await asyncio.gather(
+            *(fetch(offer_id) for offer_id, _ in rows), return_exceptions=True
+        )
+
+        live: dict[str | None, list[dict[str, Any]]] = {}
+        withdrawn, checked = [], []
+        for (offer_id, domain), result in zip(rows, results, strict=True):
+            if isinstance(result, Exception):
+                logger.warning(f"Could not refresh offer {offer_id}: {result}")
+                continue
+            checked.append(offer_id)
+            if result is None:
+                withdrawn.append(offer_id)
+            else:
+                live.setdefault(domain, []).append(result)
+
+        db = SessionLocal()
+        try:
+            updated = sum(
+                self._upsert(db, offers, None, domain)
+                for domain, offers in live.items()
+            )
+            # Unchanged offers were checked too: move them to the back of the queue
+            db.query(JobOffer).filter(JobOffer.id.in_(checked)).update(
+                {JobOffer.fetched_at: datetime.utcnow()}, synchronize_session=False
+            )
+            deleted = (
+                db.query(JobOffer)
+                .filter(JobOffer.id.in_(withdrawn))
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+        offers = [offer for batch in live.values() for offer in batch]
+        if offers:
+            await ranking_service.index_offers(offers)
+        logger.info(
+            f"Refreshed {len(checked)} stored offers: {updated} updated, "
+            f"{deleted} withdrawn"
+        )
+        return {"checked": len(checked), "updated": updated, "deleted": deleted}
+
+    async def warm_index(self) -> int:
+        """
+        Load ingested offers into the job index (e.g. after a restart).
+
+        Returns:
+            Number of offers indexed
+        """
+        cutoff = datetime.utcnow() - timedelta(hours=settings.JOB_INDEX_TTL_HOURS)
+        indexed = 0
+        db = SessionLocal()
+        try:
+            query = (
+                db.query(JobOffer.data)
+                .filter(JobOffer.fetched_at >= cutoff)
+                .order_by(JobOffer.date_actualisation.desc())
+                .limit(settings.JOB_INDEX_MAX_ENTRIES)
+            )
+            batch = []
+            for (offer,) in query.yield_per(WARMUP_BATCH_SIZE):
+                batch.append(offer)
+                if len(batch) == WARMUP_BATCH_SIZE:
+                    indexed += await ranking_service.index_offers(batch)
+                    batch = []
+            if batch:
+                indexed += await ranking_service.index_offers(batch)
+        finally:
+            db.close()
+
+        logger.info(f"Job index warmed with {indexed} ingested offers")
+        return indexed
+
+    def prune(self) -> int:
+        """Delete offers not updated within the retention period."""
+        cutoff = datetime.utcnow() - timedelta(
+            days=settings.JOB_INGESTION_RETENTION_DAYS
+        )
+        db = SessionLocal()
+        try:
+            deleted = (
+                db.query(JobOffer)
+                .filter(JobOffer.date_actualisation < cutoff)
+                .delete(synchronize_session=False)
+            )
+            db.commit()
+            return deleted
+        finally:
+            db.close()
+
+    @staticmethod
+    def _published_since(high_water_mark: datetime | None) -> int:
+        """Smallest accepted `publieeDepuis` window covering the high-water mark."""
+        if high_water_mark is None:
+            return settings.JOB_INGESTION_INITIAL_WINDOW_DAYS
+        age_days = (datetime.utcnow() - high_water_mark).total_seconds() / 86400
+        for window in PUBLISHED_SINCE_WINDOWS:
+            if window >= age_days:
+                return window
+        return PUBLISHED_SINCE_WINDOWS[-1]
+
+    async def _fetch_scope(
+        self, domain: str | None, region: str | None, published_since: int
+    ) -> list[dict[str, Any]]:
+        """Fetch every offer of the scope the search API can page through."""
+        return await francetravail_service.search_jobs(
+            keywords="",
+            region=region,
+            grand_domaine=domain,
+            published_since=published_since,
+            sort_by="date",
+            max_results=MAX_SCOPE_RESULTS,
+        )
+
+    def _upsert(
+        self,
+        db,
+        offers: list[dict[str, Any]],
+        high_water_mark: datetime | None,
+        domain: str | None,
+    ) -> int:
+        """Insert new offers and update changed ones; returns how many were written."""
+        candidates = {}
+        for offer in offers:
+            updated_at = _parse_date(offer.get("dateActualisation"))
+            # Already ingested at or before the high-water mark
+            if high_water_mark and updated_at and updated_at <= high_water_mark:
+                continue
+            if offer.get("id"):
+                candidates[offer["id"]] = offer
+        if not candidates:
+            return 0
+
+        existing = {
+            row.id: row
+            for row in db.query(JobOffer).filter(JobOffer.id.in_(list(candidates)))
+        }
+        written = 0
+        for offer_id, offer in candidates.items():
+            content_hash = hashlib.sha256(
+                json.dumps(offer, sort_keys=True, ensure_ascii=False).encode("utf-8")
+            ).hexdigest()
+            row = existing.get(offer_id)
+            if row is not None and row.content_hash == content_hash:
+                continue
+            if row is None:
+                row = JobOffer(id=offer_id)
+                db.add(row)
+            row.intitule = offer.get("intitule")
+            row.departement = _offer_department(offer)
+            row.grand_domaine = domain
+            row.data = offer
+            row.content_hash = content_hash
+            row.date_creation = _parse_date(offer.get("dateCreation"))
+            row.date_actualisation = _parse_date(offer.get("dateActualisation"))
+            row.fetched_at = datetime.utcnow()
+            written += 1
+        return written
+
+
+job_ingestion_service = JobIngestionService()
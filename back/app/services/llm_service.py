@@ -2,9 +2,11 @@
 
 import json
 import logging
+from collections.abc import AsyncGenerator
 from typing import Any, Literal
 
-from groq import Groq
+import httpx
+from groq import AsyncGroq, DefaultAsyncHttpxClient
 from pydantic import BaseModel, field_validator
 
 from app.core.config import settings
@@ -102,17 +104,32 @@ class LLMService:
         # Get API keys
         groq_api_key = settings.GROQ_API_KEY
 
-        # Initialize Groq
+        # Initialize Groq (async client over a shared keep-alive connection pool,
+        # so concurrent interviews never block the event loop on an LLM call)
         self.groq_client = None
         if groq_api_key:
             try:
-                self.groq_client = Groq(api_key=groq_api_key)
+                self.groq_client = AsyncGroq(
+                    api_key=groq_api_key,
+                    http_client=DefaultAsyncHttpxClient(
+                        limits=httpx.Limits(
+                            max_connections=settings.GROQ_MAX_CONNECTIONS,
+                            max_keepalive_connections=settings.GROQ_MAX_KEEPALIVE_CONNECTIONS,
+                        ),
+                        timeout=httpx.Timeout(settings.GROQ_TIMEOUT, connect=5.0),
+                    ),
+                )
                 logger.info("Groq client initialized successfully!")
             except Exception as e:
                 logger.error(f"Failed to initialize Groq client: {str(e)}")
         else:
             logger.warning("GROQ_API_KEY not configured. LLM features will not work.")
 
+    async def aclose(self):
+        """Close the shared Groq connection pool."""
+        if self.groq_client:
+            await self.groq_client.close()
+
     def get_initial_greeting(
         self,
         candidate_name: str,
@@ -141,6 +158,36 @@ class LLMService:
             candidate_name=candidate_name,
         )
 
+    def _build_chat_messages(
+        self,
+        message: str,
+        conversation_history: list[dict[str, str]],
+        interviewer_type: InterviewerStyle,
+        candidate_context: str = "",
+        job_description: str = "",
+    ) -> list[dict[str, str]]:
+        """Build the Groq message list for an interviewer turn."""
+        # 1. Build System Prompt
+        system_prompt = get_system_prompt(
+            interviewer_type, candidate_context, job_description
+        )
+
+        # 2. Build Messages
+        messages = [{"role": "system", "content": system_prompt}]
+
+        # Add history
+        for msg in conversation_history:
+            # Groq/OpenAI format is 'assistant' for model
+            role = "assistant" if msg["role"] == "assistant" else msg["role"]
+            # Map 'model' back to 'assistant' if it came from Gemini history
+            if role == "model":
+                role = "assistant"
+            messages.append({"role": role, "content": msg["content"]})
+
+        # The current candidate answer is passed separately from the history
+        messages.append({"role": "user", "content": message})
+        return messages
+
     async def chat(
         self,
         message: str,
@@ -160,29 +207,15 @@ class LLMService:
             raise ValueError("Groq client not initialized")
 
         try:
-            # 1. Build System Prompt
-            system_prompt = get_system_prompt(
-                interviewer_type, candidate_context, job_description
+            messages = self._build_chat_messages(
+                message,
+                conversation_history,
+                interviewer_type,
+                candidate_context,
+                job_description,
             )
 
-            # 2. Build Messages
-            messages = [{"role": "system", "content": system_prompt}]
-
-            # Add history
-            for msg in conversation_history:
-                # Groq/OpenAI format is 'assistant' for model
-                role = "assistant" if msg["role"] == "assistant" else msg["role"]
-                # Map 'model' back to 'assistant' if it came from Gemini history
-                if role == "model":
-                    role = "assistant"
-                messages.append({"role": role, "content": msg["content"]})
-
-            # Add current message (if not already in history? usually caller appends it, but let's check)
-            # The signature says 'message' is passed separately.
-            messages.append({"role": "user", "content": message})
-
-            # 3. Call API
-            completion = self.groq_client.chat.completions.create(
+            completion = await self.groq_client.chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=messages,
                 temperature=0.7,
@@ -200,6 +233,56 @@ class LLMService:
             logger.error(f"Chat error: {str(e)}")
             raise
 
+    async def chat_stream(
+        self,
+        message: str,
+        conversation_history: list[dict[str, str]],
+        interviewer_type: InterviewerStyle,
+        candidate_context: str = "",
+        job_description: str = "",
+    ) -> AsyncGenerator[str, None]:
+        """
+        Send message to Groq and stream the interviewer response token by token.
+        """
+        logger.info(f"Streaming candidate response with {interviewer_type} interviewer")
+
+        if not self.groq_client:
+            raise ValueError("Groq client not initialized")
+
+        messages = self._build_chat_messages(
+            message,
+            conversation_history,
+            interviewer_type,
+            candidate_context,
+            job_description,
+        )
+
+        try:
+            stream = await self.groq_client.chat.completions.create(
+                model="llama-3.3-70b-versatile",
+                messages=messages,
+                temperature=0.7,
+                max_tokens=1024,
+                stream=True,
+            )
+
+            total_chars = 0
+            async for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    total_chars += len(delta)
+                    yield delta
+
+            logger.info(
+                f"Streamed {interviewer_type} interviewer response ({total_chars} chars)"
+            )
+
+        except Exception as e:
+            logger.error(f"Chat stream error: {str(e)}")
+            raise
+
     async def grade_response(
         self, question: str, answer: str, interviewer_style: InterviewerStyle
     ) -> dict[str, any]:
@@ -222,7 +305,7 @@ class LLMService:
                 "interview.grading_system_suffix"
             )
 
-            completion = self.groq_client.chat.completions.create(
+            completion = await self.groq_client.chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=[
                     {
@@ -273,7 +356,7 @@ class LLMService:
 
             messages.append({"role": "user", "content": prompt})
 
-            completion = self.groq_client.chat.completions.create(
+            completion = await self.groq_client.chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=messages,
                 response_format={"type": "json_object"},
@@ -323,7 +406,7 @@ class LLMService:
                 job_description=job_description or "Non spécifié",
             )
 
-            completion = self.groq_client.chat.completions.create(
+            completion = await self.groq_client.chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=[
                     {
@@ -451,7 +534,7 @@ class LLMService:
 
             logger.info(f"Groq decided to call {messages}")
 
-            response = self.groq_client.chat.completions.create(
+            response = await self.groq_client.chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=messages,
                 tools=tools_schema,
@@ -1,6 +1,12 @@
+import logging
 from typing import Any
 
-import httpx
+from app.core.config import settings
+from app.services.geo_index import GeoIndex, normalize
+from app.services.http_client import http_client
+from app.services.ttl_cache import AsyncTTLCache
+
+logger = logging.getLogger(__name__)
 
 
 class LocationService:
@@ -8,10 +14,51 @@ class LocationService:
     REGION_API_URL = "https://geo.api.gouv.fr/regions"
     DEPT_API_URL = "https://geo.api.gouv.fr/departements"
 
+    def __init__(self):
+        # Bundled geography answers locally; geo.api.gouv.fr is the fallback
+        self.geo_index = None
+        if settings.GEO_OFFLINE_ENABLED:
+            try:
+                self.geo_index = GeoIndex.load(
+                    settings.GEO_DATA_DIR or None, settings.GEO_COMMUNES_PATH or None
+                )
+            except (OSError, ValueError) as e:
+                logger.error(
+                    f"Offline geo index unavailable, using geo.api.gouv.fr: {e}"
+                )
+
+        # geo.api.gouv.fr answers by (lookup type, normalized query); misses are
+        # kept for less time, and lookups in flight are shared
+        self._cache = AsyncTTLCache(
+            max_entries=settings.GEO_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.GEO_CACHE_TTL_HOURS * 3600,
+            negative_ttl_seconds=settings.GEO_CACHE_NEGATIVE_TTL_MINUTES * 60,
+        )
+
+    def cache_stats(self) -> dict:
+        return self._cache.stats()
+
+    async def _lookup(self, kind: str, query: str, url: str, params: dict) -> list:
+        """GET a geo.api.gouv.fr endpoint through the cache (errors are not cached)."""
+
+        async def fetch() -> list:
+            response = await http_client.client.get(url, params=params)
+            response.raise_for_status()
+            return response.json()
+
+        try:
+            return await self._cache.get_or_fetch((kind, normalize(query)), fetch)
+        except Exception as e:
+            logger.warning(f"Error fetching {kind}: {e}")
+            return []
+
     async def search_cities(self, query: str) -> list[dict[str, Any]]:
         if not query or len(query) < 2:
             return []
 
+        if self.geo_index is not None and self.geo_index.has_communes:
+            return self.geo_index.search_cities(query)
+
         params = {
             "fields": "nom,code,codesPostaux,departement,region",
             "boost": "population",
@@ -23,50 +70,35 @@ class LocationService:
         else:
             params["nom"] = query
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(self.GEO_API_URL, params=params)
-                response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                print(f"Error fetching cities: {e}")
-                return []
+        return await self._lookup("cities", query, self.GEO_API_URL, params)
 
     async def search_regions(self, query: str) -> list[dict[str, Any]]:
         """Search for regions by name."""
         if not query or len(query) < 2:
             return []
 
+        if self.geo_index is not None:
+            return self.geo_index.search_regions(query)
+
         params = {"nom": query, "fields": "nom,code"}
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(self.REGION_API_URL, params=params)
-                response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                print(f"Error fetching regions: {e}")
-                return []
+        return await self._lookup("regions", query, self.REGION_API_URL, params)
 
     async def search_departments(self, query: str) -> list[dict[str, Any]]:
         """Search for departments by name or code."""
         if not query:
             return []
 
+        if self.geo_index is not None:
+            return self.geo_index.search_departments(query)
+
         params = {"fields": "nom,code,region"}
         if query.isdigit() and len(query) in [2, 3]:
             params["code"] = query
         else:
             params["nom"] = query
 
-        async with httpx.AsyncClient() as client:
-            try:
-                response = await client.get(self.DEPT_API_URL, params=params)
-                response.raise_for_status()
-                return response.json()
-            except Exception as e:
-                print(f"Error fetching departments: {e}")
-                return []
+        return await self._lookup("departments", query, self.DEPT_API_URL, params)
 
 
 location_service = LocationService()
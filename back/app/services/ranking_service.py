@@ -1,90 +1,215 @@
 import asyncio
+import hashlib
 import logging
+from collections import OrderedDict
+from pathlib import Path
 from typing import Any
 
-import google.generativeai as genai
 import numpy as np
 
 from app.core.config import settings
+from app.services.embedding_backends import EmbeddingBackend, create_embedding_backend
+from app.services.embedding_store import EmbeddingStore
+from app.services.job_index import JobIndex, normalize_rows
 
 logger = logging.getLogger(__name__)
 
 
-def _generate_embeddings_sync(
-    profile_text: str, query: str | None, job_texts: list[str]
-) -> tuple[np.ndarray, np.ndarray | None, np.ndarray]:
-    """
-    Helper to generate embeddings synchronously (for use in threads).
-    """
-    # A. Embed Profile (Query)
-    profile_resp = genai.embed_content(
-        model="models/text-embedding-004",
-        content=profile_text,
-        task_type="retrieval_query",
-    )
-    p_vec = np.array(profile_resp["embedding"])
-
-    # B. Embed Query (if present)
-    q_vec = None
-    if query:
-        query_resp = genai.embed_content(
-            model="models/text-embedding-004",
-            content=query,
-            task_type="retrieval_query",
-        )
-        q_vec = np.array(query_resp["embedding"])
+# Users whose profile embedding is kept in memory
+PROFILE_CACHE_MAX_USERS = 10000
 
-    # C. Embed Jobs (Batch)
-    jobs_resp = genai.embed_content(
-        model="models/text-embedding-004",
-        content=job_texts,
-        task_type="retrieval_document",
-    )
+# Recent search texts whose embedding is kept in memory
+INTENT_CACHE_MAX_ENTRIES = 5000
 
-    # The response structure for batch input usually contains a list of embeddings
-    j_vecs = np.array(jobs_resp["embedding"])
-    return p_vec, q_vec, j_vecs
+# Fields added to a job for one user, never stored in the shared index
+USER_JOB_FIELDS = {"relevance_score", "relevance_reasoning", "is_applied", "source"}
+
+# `source` of offers recalled from the job index (rather than live results)
+INDEX_SOURCE = "index"
 
 
 class RankingService:
-    def __init__(self):
+    def __init__(self, backend: EmbeddingBackend | None = None):
         logger.info("⚖️ Initializing RankingService...")
-        # Initialize Google GenAI (for Embeddings)
-        gemini_api_key = settings.GEMINI_API_KEY
-        if gemini_api_key:
-            try:
-                genai.configure(api_key=gemini_api_key)
-                logger.info(
-                    "✅ Google GenAI initialized successfully (for Embeddings)."
-                )
-                self.has_gemini = True
-            except Exception as e:
-                logger.error(f"❌ Failed to initialize Google GenAI: {e}")
-                self.has_gemini = False
-        else:
-            logger.warning("⚠️ GEMINI_API_KEY not configured. Ranking will not work.")
-            self.has_gemini = False
+        # Gemini API or local CPU model, per EMBEDDING_BACKEND, unless given
+        self.backend = backend or create_embedding_backend()
+
+        # Job embeddings persist across searches, keyed by offer id + text
+        self.embedding_store = None
+        if settings.EMBEDDING_CACHE_ENABLED and self.backend is not None:
+            cache_dir = settings.EMBEDDING_CACHE_DIR
+            self.embedding_store = EmbeddingStore(
+                # One store per backend: vectors from different models never mix
+                cache_dir=Path(cache_dir) / self.backend.name if cache_dir else None,
+                max_memory_entries=settings.EMBEDDING_CACHE_MEMORY_MAX_ENTRIES,
+                max_disk_entries=settings.EMBEDDING_CACHE_DISK_MAX_ENTRIES,
+            )
+
+        # user id -> (profile text hash, vector); dropped when the resume changes
+        self._profile_vectors: OrderedDict[int, tuple[str, np.ndarray]] = OrderedDict()
+        # search text -> vector, so recall and reranking embed a query once
+        self._intent_vectors: OrderedDict[str, np.ndarray] = OrderedDict()
+
+        # Offers seen in any user's search, for instant semantic recall
+        self.job_index = None
+        if settings.JOB_INDEX_ENABLED and self.backend is not None:
+            self.job_index = JobIndex(
+                ttl_seconds=settings.JOB_INDEX_TTL_HOURS * 3600,
+                max_entries=settings.JOB_INDEX_MAX_ENTRIES,
+            )
+
+    def invalidate_profile(self, user_id: int):
+        """Forget a user's cached profile embedding (call after resume edits)."""
+        if self._profile_vectors.pop(user_id, None) is not None:
+            logger.info(f"🗑️ Profile embedding invalidated for user {user_id}")
+
+    async def _embed_profile(
+        self, profile_text: str, user_id: int | None
+    ) -> np.ndarray:
+        """
+        Embed the candidate profile, reusing the user's vector while the text is unchanged.
+        """
+        text_hash = hashlib.sha256(profile_text.encode("utf-8")).hexdigest()
+        cached = self._profile_vectors.get(user_id) if user_id is not None else None
+        if cached is not None and cached[0] == text_hash:
+            self._profile_vectors.move_to_end(user_id)
+            return cached[1]
+
+        vector = await self._embed_query(profile_text)
+        if user_id is not None:
+            self._profile_vectors[user_id] = (text_hash, vector)
+            self._profile_vectors.move_to_end(user_id)
+            while len(self._profile_vectors) > PROFILE_CACHE_MAX_USERS:
+                self._profile_vectors.popitem(last=False)
+        return vector
+
+    async def _embed_jobs(
+        self, jobs: list[dict[str, Any]], job_texts: list[str]
+    ) -> np.ndarray:
+        """
+        Embed job texts, only calling the API for offers not already in the store.
+
+        Returns:
+            Matrix with one embedding row per job text
+        """
+        keys = [
+            EmbeddingStore.make_key(job.get("id"), text)
+            for job, text in zip(jobs, job_texts, strict=True)
+        ]
+
+        vectors = {}
+        if self.embedding_store is not None:
+            vectors = await asyncio.to_thread(self.embedding_store.get_many, keys)
+
+        missing = [i for i, key in enumerate(keys) if key not in vectors]
+        logger.info(
+            f"🗃️ Job embeddings: {len(keys) - len(missing)} cached, {len(missing)} to embed"
+        )
+        if missing:
+            embedded = await self._embed_documents([job_texts[i] for i in missing])
+            fresh = {
+                keys[i]: vector
+                for i, vector in zip(missing, embedded, strict=True)
+                if vector is not None
+            }
+            vectors.update(fresh)
+            if self.embedding_store is not None:
+                await asyncio.to_thread(self.embedding_store.put_many, fresh)
+
+        if not vectors:
+            raise RuntimeError("No job could be embedded")
+
+        # Jobs whose batch failed twice still get scored (as zero similarity)
+        failed = len(keys) - sum(key in vectors for key in keys)
+        if failed:
+            logger.warning(f"⚠️ {failed} jobs could not be embedded, scoring them 0")
+        placeholder = np.zeros_like(next(iter(vectors.values())))
+        return np.stack([vectors.get(key, placeholder) for key in keys])
+
+    async def _embed_intents(self, texts: list[str]) -> np.ndarray:
+        """Embed search texts (query, variation keywords) in one call, reusing recent ones."""
+        missing = [text for text in texts if text not in self._intent_vectors]
+        if missing:
+            embedded = await asyncio.to_thread(
+                self.backend.embed, missing, "retrieval_query"
+            )
+            self._intent_vectors.update(zip(missing, embedded, strict=True))
+        for text in texts:
+            self._intent_vectors.move_to_end(text)
+        vectors = np.stack([self._intent_vectors[text] for text in texts])
+        while len(self._intent_vectors) > INTENT_CACHE_MAX_ENTRIES:
+            self._intent_vectors.popitem(last=False)
+        return vectors
+
+    async def _embed_query(self, text: str) -> np.ndarray:
+        embedded = await asyncio.to_thread(
+            self.backend.embed, [text], "retrieval_query"
+        )
+        return embedded[0]
+
+    async def _embed_documents(self, texts: list[str]) -> list[np.ndarray | None]:
+        """
+        Embed texts in provider-sized batches sent concurrently.
+
+        A failed batch is retried once; if it fails again its texts map to None
+        while the other batches' vectors are kept.
+        """
+        batch_size = min(settings.EMBEDDING_BATCH_SIZE, self.backend.max_batch_size)
+        semaphore = asyncio.Semaphore(settings.EMBEDDING_MAX_CONCURRENCY)
+
+        async def embed_batch(start: int) -> list[np.ndarray | None]:
+            batch = texts[start : start + batch_size]
+            for attempt in range(2):
+                try:
+                    async with semaphore:
+                        embedded = await asyncio.to_thread(
+                            self.backend.embed, batch, "retrieval_document"
+                        )
+                    return list(embedded)
+                except Exception as e:
+                    logger.warning(
+                        f"⚠️ Embedding batch at {start} failed (attempt {attempt + 1}): {e}"
+                    )
+            return [None] * len(batch)
+
+        starts = range(0, len(texts), batch_size)
+        if len(starts) > 1:
+            logger.info(f"📦 Embedding {len(texts)} jobs in {len(starts)} batches")
+        batches = await asyncio.gather(*(embed_batch(start) for start in starts))
+        return [vector for batch in batches for vector in batch]
 
     async def compute_similarity_ranking(
         self,
         candidate_profile: str,
         jobs: list[dict[str, Any]],
         query: str | None = None,
+        user_id: int | None = None,
+        variation_keywords: list[str] | None = None,
+        limit: int | None = None,
+        index_jobs: bool = True,
     ) -> list[dict[str, Any]]:
         """
-        Rerank jobs using Google Embeddings (text-embedding-004) with Batching + Async safety.
+        Rerank jobs using embeddings (Gemini or local backend) with Batching + Async safety.
         Implements Weighted Hybrid Search:
-        - If query is provided: Score = 0.7 * Query_Sim + 0.3 * Profile_Sim
+        - If query is provided: Score = 0.7 * Intent_Sim + 0.3 * Profile_Sim, where
+          Intent_Sim is the best match among the query and the keywords of each
+          search variation
         - If query is missing: Score = Profile_Sim
-        """
-        logger.info(f"⚖️ Reranking {len(jobs)} jobs using Google Embeddings...")
-        if query:
-            logger.info(f"🎯 using Weighted Hybrid Reranking (Query: '{query}')")
 
+        When `user_id` is given, the profile embedding is cached for that user.
+        With `limit`, only the top `limit` jobs are selected and annotated.
+        `index_jobs=False` leaves the job index untouched (intermediate rankings).
+        """
         # 1. Fast fail checks
-        if not jobs or not self.has_gemini:
+        if not jobs or self.backend is None:
             return jobs
 
+        logger.info(
+            f"⚖️ Reranking {len(jobs)} jobs using {self.backend.name} embeddings..."
+        )
+        if query:
+            logger.info(f"🎯 using Weighted Hybrid Reranking (Query: '{query}')")
+
         # 2. Prepare Data (Sync part is fast enough to run in main thread)
         try:
             # Truncate profile to fit model limits (approx 2048 tokens ~ 8000 chars)
@@ -95,83 +220,52 @@ class RankingService:
 
             # Pre-filter jobs to avoid empty text errors
             for job in jobs:
-                title = job.get("intitule", "")
-                desc = job.get("description", "")[:2000]
-                # Skip jobs with literally no info
-                if not title and len(desc) < 10:
+                text = job_embedding_text(job)
+                if text is None:
                     continue
-
-                text = f"Title: {title}\nDescription: {desc}"
                 job_texts.append(text)
                 valid_jobs.append(job)
 
             if not job_texts:
                 return jobs
 
-            # Cap at 100 to respect batch limits for now (simple safety)
-            if len(job_texts) > 100:
-                logger.warning(
-                    f"⚠️ Capping reranking at 100 jobs (received {len(job_texts)})"
-                )
-                job_texts = job_texts[:100]
-                valid_jobs = valid_jobs[:100]
+            # The query and each variation's keywords are embedded in one call
+            intent_texts = []
+            if query:
+                intent_texts = list(dict.fromkeys([query, *(variation_keywords or [])]))
+                intent_texts = [text for text in intent_texts if text and text.strip()]
 
             # 4. Run blocking network calls in a thread pool
-            profile_vector, query_vector, job_vectors = await asyncio.to_thread(
-                _generate_embeddings_sync, profile_text, query, job_texts
+            embeddings = [
+                self._embed_profile(profile_text, user_id),
+                self._embed_jobs(valid_jobs, job_texts),
+            ]
+            if intent_texts:
+                embeddings.append(self._embed_intents(intent_texts))
+            profile_vector, job_vectors, *intent_vectors = await asyncio.gather(
+                *embeddings
             )
 
-            # Ensure job_vectors is at least 2D
-            if job_vectors.ndim == 1:
-                job_vectors = job_vectors.reshape(1, -1)
-
-            # 5. Compute Similarity (Vectorized Math is faster)
-            # Normalize vectors
-            norm_jobs = np.linalg.norm(job_vectors, axis=1)
-            norm_profile = np.linalg.norm(profile_vector)
-
-            # Avoid division by zero
-            valid_norms_p = (norm_profile > 0) & (norm_jobs > 0)
-
-            # --- Score Profile ---
-            scores_p = np.zeros(len(valid_jobs))
-            if norm_profile > 0:
-                dot_products_p = np.dot(job_vectors, profile_vector)
-                similarities_p = np.divide(
-                    dot_products_p,
-                    norm_profile * norm_jobs,
-                    out=np.zeros_like(dot_products_p),
-                    where=valid_norms_p,
-                )
-                scores_p = similarities_p * 100
-
-            # --- Score Query (if exists) ---
-            if query_vector is not None:
-                norm_query = np.linalg.norm(query_vector)
-                valid_norms_q = (norm_query > 0) & (norm_jobs > 0)
-                scores_q = np.zeros(len(valid_jobs))
-
-                if norm_query > 0:
-                    dot_products_q = np.dot(job_vectors, query_vector)
-                    similarities_q = np.divide(
-                        dot_products_q,
-                        norm_query * norm_jobs,
-                        out=np.zeros_like(dot_products_q),
-                        where=valid_norms_q,
-                    )
-                    scores_q = similarities_q * 100
+            if index_jobs and self.job_index is not None:
+                await self._index_jobs(valid_jobs, job_vectors)
 
-                # WEIGHTED HYBRID SCORE: 70% Query + 30% Profile
-                final_scores = (0.7 * scores_q) + (0.3 * scores_p)
-                logger.info("⚖️ Applied weights: 0.7 * Query + 0.3 * Profile")
+            # 5. Score every job against every query in one matrix product
+            final_scores = score_jobs(
+                job_vectors,
+                profile_vector,
+                intent_vectors[0] if intent_vectors else None,
+            )
+            if intent_vectors:
+                logger.info(
+                    f"⚖️ Applied weights: 0.7 * Intent ({len(intent_texts)} queries) + 0.3 * Profile"
+                )
             else:
-                # Fallback to pure profile match
-                final_scores = scores_p
                 logger.info("⚖️ Using 100% Profile match (no query provided)")
 
-            # 6. Assign Scores & Reasoning
+            # 6. Select the page, then assign Scores & Reasoning to it only
             reranked_jobs = []
-            for i, job in enumerate(valid_jobs):
+            for i in top_k(final_scores, limit):
+                job = valid_jobs[i]
                 final_score = int(final_scores[i])
                 job["relevance_score"] = final_score
 
@@ -193,9 +287,6 @@ class RankingService:
                 job["relevance_reasoning"] = reasoning
                 reranked_jobs.append(job)
 
-            # 7. Sort
-            reranked_jobs.sort(key=lambda x: x["relevance_score"], reverse=True)
-
             logger.info(
                 f"✅ Jobs reranked via Hybrid Embeddings (Top: {reranked_jobs[0]['relevance_score'] if reranked_jobs else 0})"
             )
@@ -206,5 +297,155 @@ class RankingService:
             # Fallback: Return original list order if AI fails
             return jobs
 
+    async def _index_jobs(self, jobs: list[dict[str, Any]], vectors: np.ndarray):
+        """
+        Add live offers to the shared index, without any per-user annotations.
+
+        Offers recalled from the index itself are skipped: re-adding them would
+        reset their age, so stale offers would never expire.
+        """
+        live = [i for i, job in enumerate(jobs) if job.get("source") != INDEX_SOURCE]
+        if not live:
+            return
+        offers = [
+            {key: value for key, value in jobs[i].items() if key not in USER_JOB_FIELDS}
+            for i in live
+        ]
+        try:
+            await asyncio.to_thread(self.job_index.add, offers, vectors[live])
+        except Exception as e:
+            logger.warning(f"⚠️ Could not index jobs: {e}")
+
+    async def index_offers(self, jobs: list[dict[str, Any]]) -> int:
+        """
+        Embed offers (reusing stored vectors) and add them to the job index.
+
+        Used to warm the index from ingested offers, ahead of any search.
+
+        Returns:
+            Number of offers indexed
+        """
+        if self.job_index is None:
+            return 0
+        pairs = [(job, job_embedding_text(job)) for job in jobs]
+        pairs = [(job, text) for job, text in pairs if text is not None]
+        if not pairs:
+            return 0
+        offers, texts = (list(column) for column in zip(*pairs, strict=True))
+        vectors = await self._embed_jobs(offers, texts)
+        await self._index_jobs(offers, vectors)
+        return len(offers)
+
+    async def prefetch_embeddings(self, jobs: list[dict[str, Any]]):
+        """
+        Embed offers into the store ahead of reranking (e.g. as result pages arrive).
+
+        No-op without an embedding store, since the vectors would not be reused.
+        """
+        if self.embedding_store is None:
+            return
+        pairs = [(job, job_embedding_text(job)) for job in jobs]
+        pairs = [(job, text) for job, text in pairs if text is not None]
+        if pairs:
+            offers, texts = (list(column) for column in zip(*pairs, strict=True))
+            await self._embed_jobs(offers, texts)
+
+    async def recall_jobs(
+        self,
+        candidate_profile: str,
+        query: str | None = None,
+        user_id: int | None = None,
+        limit: int | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Recall relevant offers from the local job index, without calling France Travail.
+
+        Scored like `compute_similarity_ranking`, against the profile and query.
+
+        Returns:
+            Copies of the best indexed offers, with relevance scores and
+            `source` set to "index"
+        """
+        if self.job_index is None or not len(self.job_index):
+            return []
+
+        profile_vector = await self._embed_profile(candidate_profile[:8000], user_id)
+        intent_vectors = await self._embed_intents([query]) if query else None
+        queries = (
+            np.vstack([profile_vector, intent_vectors])
+            if intent_vectors is not None
+            else profile_vector
+        )
+
+        limit = limit or settings.JOB_SEARCH_MAX_RESULTS
+        # Off the event loop: the index lock is held while k-means trains
+        offers, vectors = await asyncio.to_thread(
+            self.job_index.search, queries, k=limit
+        )
+        if not offers:
+            return []
+
+        scores = score_jobs(vectors, profile_vector, intent_vectors)
+        recalled = []
+        for i in top_k(scores, limit):
+            job = dict(offers[i])
+            job["relevance_score"] = int(scores[i])
+            job["source"] = INDEX_SOURCE
+            recalled.append(job)
+        logger.info(f"🗂️ Recalled {len(recalled)} jobs from the local index")
+        return recalled
+
+
+def job_embedding_text(job: dict[str, Any]) -> str | None:
+    """Text embedded for an offer, or None if it has too little content."""
+    title = job.get("intitule", "")
+    desc = job.get("description", "")[:2000]
+    # Skip jobs with literally no info
+    if not title and len(desc) < 10:
+        return None
+    return f"Title: {title}\nDescription: {desc}"
+
+
+def score_jobs(
+    job_vectors: np.ndarray,
+    profile_vector: np.ndarray,
+    intent_vectors: np.ndarray | None = None,
+) -> np.ndarray:
+    """
+    Score jobs (0-100) with a single (jobs x queries) cosine similarity matrix.
+
+    Column 0 is the profile; the remaining columns are the search intents
+    (query and variation keywords), of which each job keeps its best match.
+
+    Returns:
+        Float scores, one per job
+    """
+    queries = [np.atleast_2d(profile_vector)]
+    if intent_vectors is not None and len(intent_vectors):
+        queries.append(np.atleast_2d(intent_vectors))
+
+    similarities = normalize_rows(job_vectors) @ normalize_rows(np.vstack(queries)).T
+    similarities *= 100
+
+    if similarities.shape[1] == 1:
+        return similarities[:, 0]
+    # WEIGHTED HYBRID SCORE: 70% Intent + 30% Profile
+    return 0.7 * similarities[:, 1:].max(axis=1) + 0.3 * similarities[:, 0]
+
+
+def top_k(scores: np.ndarray, k: int | None = None) -> np.ndarray:
+    """
+    Indices of the `k` highest scores, best first (all of them if `k` is None).
+
+    Uses argpartition so only the selected page is fully sorted.
+    """
+    if k is not None and 0 < k < len(scores):
+        # Back in original order so the stable sort below breaks ties by it
+        selected = np.sort(np.argpartition(-scores, k - 1)[:k])
+    else:
+        selected = np.arange(len(scores))
+    # Stable sort keeps the original order between equal scores
+    return selected[np.argsort(-scores[selected], kind="stable")]
+
 
 ranking_service = RankingService()
@@ -84,7 +84,7 @@ class ResumeAnalyzerService:
             }}
             """
 
-            completion = llm_service.groq_client.chat.completions.create(
+            completion = await llm_service.groq_client.chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=[
                     {
@@ -21,6 +21,7 @@ from app.models.resume_models import (
 )
 from app.models.user import User
 from app.services.llm_service import llm_service
+from app.services.ranking_service import ranking_service
 
 logger = logging.getLogger(__name__)
 
@@ -65,7 +66,7 @@ class ResumeParserService:
         system_content = prompt_manager.get("resume.extraction_system")
 
         try:
-            completion = llm_service.groq_client.chat.completions.create(
+            completion = await llm_service.groq_client.chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=[
                     {
@@ -240,7 +241,7 @@ class ResumeParserService:
         system_content = prompt_manager.get("resume.tailoring_system")
 
         try:
-            completion = llm_service.groq_client.chat.completions.create(
+            completion = await llm_service.groq_client.chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=[
                     {
@@ -350,7 +351,7 @@ class ResumeParserService:
         system = prompt_manager.format_prompt("cover_letter.system")
 
         try:
-            completion = llm_service.groq_client.chat.completions.create(
+            completion = await llm_service.groq_client.chat.completions.create(
                 model="llama-3.3-70b-versatile",
                 messages=[
                     {
@@ -513,6 +514,7 @@ Je reste à votre disposition pour un entretien afin de vous présenter plus en
             db.add(user)
             db.commit()
             db.refresh(user)
+            ranking_service.invalidate_profile(user.id)
 
             return {
                 "message": "Resume uploaded and parsed successfully",
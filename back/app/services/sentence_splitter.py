@@ -0,0 +1,214 @@
+"""Incremental sentence segmentation for streamed LLM text (French-aware)."""
+
+from collections.abc import AsyncGenerator, AsyncIterable
+
+# Abbreviations whose trailing period does not end a sentence (lowercase, no dot)
+ABBREVIATIONS = frozenset(
+    {
+        "m",
+        "mm",
+        "mme",
+        "mmes",
+        "mlle",
+        "mlles",
+        "me",
+        "dr",
+        "pr",
+        "st",
+        "ste",
+        "etc",
+        "cf",
+        "ex",
+        "env",
+        "av",
+        "apr",
+        "vs",
+        "no",
+        "tél",
+        "tel",
+        "réf",
+        "ref",
+        "fig",
+        "chap",
+        "art",
+        "bd",
+        "cie",
+        "inc",
+        "jr",
+        "sr",
+    }
+)
+
+# Nouns naming something by a capital letter ("permis B", "plan A"): the letter
+# after them is a label, not an initial, so its period can end a sentence
+LETTER_LABEL_NOUNS = frozenset(
+    {
+        "permis",
+        "catégorie",
+        "categorie",
+        "classe",
+        "type",
+        "plan",
+        "niveau",
+        "option",
+        "annexe",
+        "groupe",
+        "série",
+        "serie",
+        "partie",
+        "section",
+        "vitamine",
+        "bâtiment",
+        "batiment",
+    }
+)
+
+SENTENCE_TERMINATORS = ".!?…"
+# Characters that may trail a terminator and still belong to the sentence
+SENTENCE_CLOSERS = "»\"'”’)]"
+# Closers that French typography separates from the terminator with a space
+# ("Oui ! »"), so they are attached across whitespace too
+SPACED_CLOSERS = "»”)]"
+
+
+class SentenceSplitter:
+    """
+    Accumulates text chunks and emits complete sentences as soon as their
+    boundary is certain.
+
+    A period only ends a sentence when it is followed by whitespace and a
+    character that is not lowercase, and is not attached to a known
+    abbreviation, a capital-letter initial ("J. Dupont") or a list number.
+    One-letter words ("Il y en a.") and letter labels ("permis B.") do end
+    sentences.
+    Question/exclamation marks and ellipses followed by whitespace always end
+    a sentence, and so do line breaks.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text: str) -> list[str]:
+        """Add a chunk of text and return the sentences it completed."""
+        self._buffer += text
+        sentences = []
+
+        while True:
+            boundary = self._find_boundary()
+            if boundary is None:
+                break
+            end, next_start = boundary
+            sentence = self._buffer[:end].strip()
+            self._buffer = self._buffer[next_start:]
+            if sentence:
+                sentences.append(sentence)
+
+        return sentences
+
+    def flush(self) -> str | None:
+        """Return whatever text remains once the stream has ended."""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        return remainder or None
+
+    def _find_boundary(self) -> tuple[int, int] | None:
+        """
+        Locate the first certain sentence boundary in the buffer.
+
+        Returns:
+            (end of sentence, start of the next one), or None if no boundary
+            can be confirmed yet
+        """
+        buffer = self._buffer
+        length = len(buffer)
+        i = 0
+
+        while i < length:
+            char = buffer[i]
+
+            if char == "\n":
+                if buffer[:i].strip():
+                    return i, i + 1
+                i += 1
+                continue
+
+            if char not in SENTENCE_TERMINATORS:
+                i += 1
+                continue
+
+            # Consume runs like "?!" or "..." and any closing quotes
+            j = i
+            while j < length and buffer[j] in SENTENCE_TERMINATORS:
+                j += 1
+            terminators = buffer[i:j]
+
+            while True:
+                while j < length and buffer[j] in SENTENCE_CLOSERS:
+                    j += 1
+                k = j
+                while k < length and buffer[k].isspace():
+                    k += 1
+                if k == length:
+                    # Need to see what follows before deciding
+                    return None
+                if k > j and buffer[k] in SPACED_CLOSERS:
+                    j = k
+                    continue
+                break
+
+            if k == j:
+                # Not followed by whitespace ("3.5", "www.site.fr")
+                i = j
+                continue
+
+            if set(terminators) == {"."} and not self._period_ends_sentence(
+                buffer[:i], buffer[k]
+            ):
+                i = k
+                continue
+
+            return j, k
+
+        return None
+
+    @staticmethod
+    def _period_ends_sentence(before: str, next_char: str) -> bool:
+        """Decide whether a period preceded by `before` ends the sentence."""
+        if next_char.islower():
+            return False
+
+        words = before.split()
+        if not words:
+            return False
+        last_word = words[-1].lstrip("(«\"'")
+
+        if last_word.lower() in ABBREVIATIONS:
+            return False
+        # Initials such as "J. Dupont" or "A.-M. Durand"; lowercase one-letter
+        # words ("a", "y", "à") and labels ("permis B") are not initials
+        if "." in last_word:
+            return False
+        letter = last_word.rstrip("-")
+        if (
+            len(letter) == 1
+            and letter.isupper()
+            and not (len(words) > 1 and words[-2].lower() in LETTER_LABEL_NOUNS)
+        ):
+            return False
+        # List numbering ("1. Présentez-vous")
+        if last_word.isdigit() and len(words) == 1:
+            return False
+
+        return True
+
+
+async def iter_sentences(chunks: AsyncIterable[str]) -> AsyncGenerator[str, None]:
+    """Re-chunk an async stream of text fragments into whole sentences."""
+    splitter = SentenceSplitter()
+    async for chunk in chunks:
+        for sentence in splitter.feed(chunk):
+            yield sentence
+
+    remainder = splitter.flush()
+    if remainder:
+        yield remainder
@@ -1,7 +1,9 @@
 import asyncio
 import logging
+from collections.abc import AsyncGenerator, Callable
 from typing import Any
 
+from app.core.config import settings
 from app.models.user import User
 from app.services.dspy_job_service import dspy_job_service
 from app.services.francetravail_service import francetravail_service
@@ -10,6 +12,11 @@ from app.services.ranking_service import ranking_service
 
 logger = logging.getLogger(__name__)
 
+# Receives each page of search results as soon as it is fetched
+PageCallback = Callable[[list[dict[str, Any]]], None]
+# Receives a variation's resolved (location params, location metadata)
+LocationCallback = Callable[[dict[str, str], dict[str, Any]], None]
+
 
 class SmartJobService:
     def __init__(self):
@@ -43,142 +50,427 @@ class SmartJobService:
     ) -> tuple[dict[str, str], dict[str, Any]]:
         """
         Resolves a raw location string to (API params, metadata).
+
+        The lookups allowed by the hint run concurrently; the first non-empty
+        one in priority order (region, department, city) wins and the others
+        are cancelled.
         """
-        # 1. Try Region
+        lookups = {}
         if type_hint == "region" or type_hint == "unknown":
-            regions = await location_service.search_regions(raw)
-            if regions:
-                logger.info(
-                    f"📍 Resolved '{raw}' to Region: {regions[0]['nom']} ({regions[0]['code']})"
-                )
-                return {"region": regions[0]["code"]}, {}
-
-        # 2. Try Department
+            lookups["region"] = location_service.search_regions(raw)
         if type_hint == "departement" or type_hint == "unknown":
-            depts = await location_service.search_departments(raw)
-            if depts:
-                logger.info(
-                    f"📍 Resolved '{raw}' to Department: {depts[0]['nom']} ({depts[0]['code']})"
-                )
-                return {"departement": depts[0]["code"]}, {}
-
-        # 3. Try City (Commune)
+            lookups["departement"] = location_service.search_departments(raw)
         if type_hint == "commune" or type_hint == "unknown":
-            cities = await location_service.search_cities(raw)
-            if cities:
-                city = cities[0]
-                logger.info(
-                    f"📍 Resolved '{raw}' to City: {city['nom']} ({city['code']})"
-                )
+            lookups["commune"] = location_service.search_cities(raw)
+        tasks = {kind: asyncio.create_task(lookup) for kind, lookup in lookups.items()}
+
+        try:
+            # 1. Try Region
+            if "region" in tasks:
+                regions = await tasks["region"]
+                if regions:
+                    logger.info(
+                        f"📍 Resolved '{raw}' to Region: {regions[0]['nom']} ({regions[0]['code']})"
+                    )
+                    return {"region": regions[0]["code"]}, {}
+
+            # 2. Try Department
+            if "departement" in tasks:
+                depts = await tasks["departement"]
+                if depts:
+                    logger.info(
+                        f"📍 Resolved '{raw}' to Department: {depts[0]['nom']} ({depts[0]['code']})"
+                    )
+                    return {"departement": depts[0]["code"]}, {}
+
+            # 3. Try City (Commune)
+            if "commune" in tasks:
+                cities = await tasks["commune"]
+                if cities:
+                    city = cities[0]
+                    logger.info(
+                        f"📍 Resolved '{raw}' to City: {city['nom']} ({city['code']})"
+                    )
 
-                # Extract department for fallback
-                meta = {}
-                if "departement" in city and "code" in city["departement"]:
-                    meta["dept"] = city["departement"]["code"]
+                    # Extract department for fallback
+                    meta = {}
+                    if "departement" in city and "code" in (city["departement"] or {}):
+                        meta["dept"] = city["departement"]["code"]
 
-                return {"location": city["code"]}, meta
+                    return {"location": city["code"]}, meta
+        finally:
+            for task in tasks.values():
+                task.cancel()
 
         logger.warning(f"⚠️ Could not resolve location '{raw}' (Hint: {type_hint})")
         return {}, {}
 
+    @staticmethod
+    def _in_departments(job: dict[str, Any], departments: set[str] | None) -> bool:
+        """Whether an offer lies in one of the searched departments (None: anywhere)."""
+        if departments is None:
+            return True
+        commune = (job.get("lieuTravail") or {}).get("commune") or ""
+        # INSEE commune codes start with the department (3 chars overseas)
+        department = commune[:3] if commune.startswith("97") else commune[:2]
+        return department in departments
+
+    async def _search_and_prefetch(
+        self, on_page: PageCallback | None = None, **search_params
+    ) -> list[dict[str, Any]]:
+        """
+        Run one deep France Travail search, embedding each page as it arrives.
+
+        Reranking then finds most vectors already in the embedding store instead
+        of embedding every offer after the slowest page. `on_page` is called with
+        each page as soon as it is fetched.
+        """
+        jobs = []
+        prefetches = []
+        async for page in francetravail_service.iter_job_pages(
+            max_results=settings.JOB_SEARCH_RESULTS_PER_QUERY, **search_params
+        ):
+            jobs.extend(page)
+            if on_page is not None:
+                on_page(page)
+            prefetches.append(
+                asyncio.create_task(ranking_service.prefetch_embeddings(page))
+            )
+
+        for result in await asyncio.gather(*prefetches, return_exceptions=True):
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️ Embedding prefetch failed: {result}")
+        return jobs
+
+    async def _search_variation(
+        self,
+        params: Any,
+        on_page: PageCallback | None = None,
+        on_location: LocationCallback | None = None,
+    ) -> tuple[dict[str, str], dict[str, Any], list[list[dict[str, Any]] | Exception]]:
+        """
+        Resolve one DSPy variation's location, then run its searches at once.
+
+        `on_location` receives the resolved location before the searches start,
+        and `on_page` each result page of the searches as it arrives.
+
+        Returns:
+            Tuple of (location params, location metadata, one result or
+            exception per search)
+        """
+        # 3. Resolve Location (Deterministic) for this variation
+        ft_location_params = {}
+        location_meta = {}
+
+        # Safe attribute access
+        loc_raw = getattr(params, "location_raw", None)
+        loc_type = getattr(params, "location_type", "unknown")
+
+        if loc_raw:
+            ft_location_params, location_meta = await self._resolve_location(
+                loc_raw, loc_type
+            )
+        if on_location is not None:
+            on_location(ft_location_params, location_meta)
+
+        filters = {
+            "keywords": getattr(params, "keywords", ""),
+            "experience": getattr(params, "experience_level", None),
+            "experience_exigence": getattr(params, "experience_exigence", None),
+            "contract_type": getattr(params, "contract_type", None),
+            "is_full_time": getattr(params, "is_full_time", None),
+        }
+
+        # Task A: Primary Search (Strict Location)
+        searches = [self._search_and_prefetch(on_page, **filters, **ft_location_params)]
+
+        # Task B: Secondary Search (Department Scope)
+        if "dept" in location_meta and "departement" not in ft_location_params:
+            searches.append(
+                self._search_and_prefetch(
+                    on_page, **filters, departement=location_meta["dept"]
+                )
+            )
+
+        results = await asyncio.gather(*searches, return_exceptions=True)
+        return ft_location_params, location_meta, results
+
     async def smart_search(
         self, user: User, query: str | None = None
     ) -> list[dict[str, Any]]:
         """
         Performs a smart job search using DSPy for reasoning + Deterministic Resolution.
         """
+        jobs = []
+        async for event in self.smart_search_stream(user, query, progressive=False):
+            if event["type"] == "done":
+                jobs = event["jobs"]
+        return jobs
+
+    async def smart_search_stream(
+        self, user: User, query: str | None = None, progressive: bool = True
+    ) -> AsyncGenerator[dict[str, Any], None]:
+        """
+        Run the smart search pipeline, yielding results as they become available.
+
+        Events:
+            - `jobs`: new offers (unranked), keyed by id; `source` is "index"
+              (local recall, usually first), "search" or "fallback". A live
+              offer replaces an indexed one with the same id.
+            - `removed`: ids of indexed offers streamed before the search
+              scopes were known, and outside them
+            - `ranking`: current top offers as `{id, relevance_score}`, after a
+              variation's searches and embeddings finish (only if `progressive`)
+            - `done`: the final reranked offers, same as `smart_search`
+        """
         logger.info(f"🧠 Starting smart search for user {user.id}")
 
         # 1. Build context
         profile_summary = self._build_profile_summary(user)
         user_query = query or "Find jobs matching my profile"
+        applied_job_ids = {app.job_id for app in user.applications}
+
+        # Pages, location scopes and finished tasks arrive on one queue, in
+        # completion order
+        events: asyncio.Queue = asyncio.Queue()
+
+        # Local index recall runs while intent extraction and live search
+        # proceed, and is streamed as soon as it finishes
+        recall_task = asyncio.create_task(
+            ranking_service.recall_jobs(profile_summary, query, user_id=user.id)
+        )
+        recall_task.add_done_callback(events.put_nowait)
 
         # 2. DSPy Reasoning (Extract Intent - Multiple Variations)
-        try:
-            raw_variations = dspy_job_service.predict_params(
-                user_query, profile_summary
-            )
-        except Exception as e:
-            logger.error(f"❌ DSPy failed: {e}")
-            return []
+        plan_task = asyncio.create_task(
+            dspy_job_service.apredict_params(user_query, profile_summary)
+        )
+        plan_task.add_done_callback(events.put_nowait)
 
-        # Flatten variations (handle cases where DSPy returns nested lists)
         variations = []
-        if isinstance(raw_variations, list):
-            for v in raw_variations:
-                if isinstance(v, list):
-                    variations.extend(v)
-                else:
-                    variations.append(v)
-        else:
-            variations = [raw_variations]
-
-        # 4. Prepare Parallel Search Tasks (Expansion Strategy)
+        variation_keywords = []
         tasks = []
+        ranking_task: asyncio.Task | None = None
+
+        # id -> offer, in arrival order; ids of offers that came from the index
+        all_jobs: dict[str, dict[str, Any]] = {}
+        indexed_ids: set[str] = set()
+
+        def add_new(
+            jobs: list[dict[str, Any]], from_index: bool = False
+        ) -> list[dict[str, Any]]:
+            """Deduplicate into all_jobs; returns the offers to stream."""
+            new_jobs = []
+            for job in jobs:
+                job_id = job.get("id")
+                if not job_id or (
+                    job_id in all_jobs and (from_index or job_id not in indexed_ids)
+                ):
+                    continue
+                job["is_applied"] = job_id in applied_job_ids
+                all_jobs[job_id] = job
+                if from_index:
+                    indexed_ids.add(job_id)
+                else:
+                    indexed_ids.discard(job_id)
+                new_jobs.append(job)
+            return new_jobs
+
+        def rank(index_jobs: bool = True):
+            return ranking_service.compute_similarity_ranking(
+                profile_summary,
+                list(all_jobs.values()),
+                query=query,
+                user_id=user.id,
+                variation_keywords=variation_keywords,
+                limit=settings.JOB_SEARCH_MAX_RESULTS,
+                index_jobs=index_jobs,
+            )
 
-        for params in variations:
-            # 3. Resolve Location (Deterministic) for this variation
-            ft_location_params = {}
-            location_meta = {}
-
-            # Safe attribute access
-            loc_raw = getattr(params, "location_raw", None)
-            loc_type = getattr(params, "location_type", "unknown")
-
-            if loc_raw:
-                ft_location_params, location_meta = await self._resolve_location(
-                    loc_raw, loc_type
-                )
+        # Departments the searches are scoped to (None: some search is
+        # unscoped or region-wide), complete once every variation has reported
+        # its location
+        search_departments: set[str] | None = set()
+        unlocated: set[int] = set()
 
-            # Task A: Primary Search (Strict Location)
-            tasks.append(
-                francetravail_service.search_jobs(
-                    keywords=getattr(params, "keywords", ""),
-                    experience=getattr(params, "experience_level", None),
-                    experience_exigence=getattr(params, "experience_exigence", None),
-                    contract_type=getattr(params, "contract_type", None),
-                    is_full_time=getattr(params, "is_full_time", None),
-                    **ft_location_params,
-                )
+        def add_scope(ft_location_params: dict, location_meta: dict):
+            nonlocal search_departments
+            department = ft_location_params.get("departement") or location_meta.get(
+                "dept"
             )
+            if search_departments is None:
+                return
+            if department:
+                search_departments.add(department)
+            else:
+                # Nationwide or region search: offers cannot be checked per
+                # department, so indexed offers from anywhere qualify
+                search_departments = None
+
+        def withdraw_out_of_scope() -> list[str]:
+            """Drop indexed offers outside the (now known) search scopes."""
+            removed = [
+                job_id
+                for job_id, job in all_jobs.items()
+                if job_id in indexed_ids
+                and not self._in_departments(job, search_departments)
+            ]
+            for job_id in removed:
+                del all_jobs[job_id]
+                indexed_ids.discard(job_id)
+            return removed
+
+        def locate(i: int, location: tuple[dict, dict] | None) -> list[str]:
+            """
+            Record a variation's location (None if it failed before resolving).
+
+            Returns:
+                Ids withdrawn once the last location (and the recall) is in
+            """
+            if i not in unlocated:
+                return []
+            unlocated.discard(i)
+            if location is not None:
+                add_scope(*location)
+            if unlocated or recall_pending:
+                return []
+            return withdraw_out_of_scope()
 
-            # Task B: Secondary Search (Department Scope)
-            if "dept" in location_meta and "departement" not in ft_location_params:
-                tasks.append(
-                    francetravail_service.search_jobs(
-                        keywords=getattr(params, "keywords", ""),
-                        experience=getattr(params, "experience_level", None),
-                        experience_exigence=getattr(
-                            params, "experience_exigence", None
-                        ),
-                        contract_type=getattr(params, "contract_type", None),
-                        is_full_time=getattr(params, "is_full_time", None),
-                        departement=location_meta["dept"],
+        planned = False
+        recall_pending = True
+        remaining = 0
+        ranking_stale = False
+        try:
+            while not planned or recall_pending or remaining:
+                item = await events.get()
+
+                # 5. Stream new offers from each page as it arrives
+                if isinstance(item, list):
+                    new_jobs = add_new(item)
+                    if new_jobs:
+                        yield {"type": "jobs", "source": "search", "jobs": new_jobs}
+                    continue
+
+                # A variation's resolved location
+                if isinstance(item, tuple):
+                    removed = locate(*item)
+                    if removed:
+                        yield {"type": "removed", "ids": removed}
+                    continue
+
+                if item is plan_task:
+                    planned = True
+                    try:
+                        raw_variations = plan_task.result()
+                    except Exception as e:
+                        logger.error(f"❌ DSPy failed: {e}")
+                        yield {"type": "done", "jobs": []}
+                        return
+
+                    # Flatten variations (handle cases where DSPy returns nested lists)
+                    if isinstance(raw_variations, list):
+                        for v in raw_variations:
+                            if isinstance(v, list):
+                                variations.extend(v)
+                            else:
+                                variations.append(v)
+                    else:
+                        variations = [raw_variations]
+                    variation_keywords = [
+                        getattr(params, "keywords", "") or "" for params in variations
+                    ]
+
+                    # 4. Resolve and search every variation concurrently: each
+                    # variation's searches start as soon as its own location is
+                    # resolved
+                    logger.info(
+                        f"🚀 Resolving and searching {len(variations)} variations in parallel..."
                     )
-                )
-
-        # 5. Execute Parallel
-        logger.info(
-            f"🚀 Executing {len(tasks)} search tasks in parallel (from {len(variations)} variations)..."
-        )
-        results_list = await asyncio.gather(*tasks, return_exceptions=True)
-
-        # 6. Merge & Deduplicate
-        all_jobs = []
-        seen_ids = set()
-
-        for i, res in enumerate(results_list):
-            if isinstance(res, list):  # Success
-                count = 0
-                for job in res:
-                    job_id = job.get("id")
-                    if job_id and job_id not in seen_ids:
-                        all_jobs.append(job)
-                        seen_ids.add(job_id)
-                        count += 1
-                logger.info(f"✅ Task {i} returned {len(res)} jobs ({count} new).")
-            else:
-                logger.warning(f"⚠️ Task {i} failed: {res}")
+                    for i, params in enumerate(variations):
+                        unlocated.add(i)
+                        task = asyncio.create_task(
+                            self._search_variation(
+                                params,
+                                on_page=events.put_nowait,
+                                on_location=lambda *location, i=i: events.put_nowait(
+                                    (i, location)
+                                ),
+                            )
+                        )
+                        task.add_done_callback(events.put_nowait)
+                        tasks.append(task)
+                    remaining = len(tasks)
+                    if not variations and not recall_pending:
+                        removed = withdraw_out_of_scope()
+                        if removed:
+                            yield {"type": "removed", "ids": removed}
+                    continue
+
+                if item is recall_task:
+                    recall_pending = False
+                    try:
+                        indexed_jobs = recall_task.result()
+                    except Exception as e:
+                        logger.warning(f"⚠️ Job index recall failed: {e}")
+                        indexed_jobs = []
+                    if planned and not unlocated:
+                        indexed_jobs = [
+                            job
+                            for job in indexed_jobs
+                            if self._in_departments(job, search_departments)
+                        ]
+                    recalled = add_new(indexed_jobs, from_index=True)
+                    if recalled:
+                        logger.info(
+                            f"🗂️ Added {len(recalled)} jobs from the local index."
+                        )
+                        yield {"type": "jobs", "source": "index", "jobs": recalled}
+                    continue
+
+                if item is ranking_task:
+                    ranking_task = None
+                    if ranking_stale:
+                        # Superseded by a newer ranking: drop it, start that one
+                        ranking_stale = False
+                        ranking_task = asyncio.create_task(rank(index_jobs=False))
+                        ranking_task.add_done_callback(events.put_nowait)
+                    elif not item.cancelled() and item.exception() is None:
+                        yield {"type": "ranking", "jobs": self._ranking(item.result())}
+                    elif not item.cancelled():
+                        logger.warning(
+                            f"⚠️ Intermediate ranking failed: {item.exception()}"
+                        )
+                    continue
+
+                # A variation finished
+                remaining -= 1
+                removed = locate(tasks.index(item), None)
+                if removed:
+                    yield {"type": "removed", "ids": removed}
+                if item.cancelled():
+                    continue
+                if item.exception() is not None:
+                    logger.warning(f"⚠️ Variation failed: {item.exception()}")
+                    continue
+                ft_location_params, location_meta, results = item.result()
+                for res in results:
+                    if isinstance(res, list):  # Success
+                        logger.info(f"✅ Search task returned {len(res)} jobs.")
+                    else:
+                        logger.warning(f"⚠️ Search task failed: {res}")
+
+                # 6. Intermediate ranking in the background, so pages keep
+                # streaming; only the latest request is kept
+                if progressive and remaining and all_jobs:
+                    if ranking_task is None:
+                        ranking_task = asyncio.create_task(rank(index_jobs=False))
+                        ranking_task.add_done_callback(events.put_nowait)
+                    else:
+                        ranking_stale = True
+        finally:
+            for task in [*tasks, recall_task, plan_task, ranking_task]:
+                if task is not None:
+                    task.cancel()
 
         # 7. Fallback: National Search (if absolutely nothing found)
         if not all_jobs:
@@ -191,28 +483,27 @@ class SmartJobService:
                     else user_query
                 )
 
-                found_jobs = await francetravail_service.search_jobs(
-                    keywords=fallback_keywords
-                )
+                found_jobs = await self._search_and_prefetch(keywords=fallback_keywords)
                 logger.info(f"✅ Found {len(found_jobs)} jobs via National fallback.")
-                all_jobs = found_jobs
+                new_jobs = add_new(found_jobs)
+                if new_jobs:
+                    yield {"type": "jobs", "source": "fallback", "jobs": new_jobs}
             except Exception as e:
                 logger.error(f"❌ National fallback search also failed: {e}")
-                return []
-
-        found_jobs = all_jobs
-
-        # 6. Rerank
-        reranked_jobs = await ranking_service.compute_similarity_ranking(
-            profile_summary, found_jobs, query=query
-        )
 
-        # 7. Mark applied jobs
-        applied_job_ids = {app.job_id for app in user.applications}
-        for job in reranked_jobs:
-            job["is_applied"] = job.get("id") in applied_job_ids
-
-        return reranked_jobs
+        if not all_jobs:
+            yield {"type": "done", "jobs": []}
+            return
+
+        # 8. Rerank
+        yield {"type": "done", "jobs": await rank()}
+
+    @staticmethod
+    def _ranking(jobs: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [
+            {"id": job.get("id"), "relevance_score": job.get("relevance_score")}
+            for job in jobs
+        ]
 
 
 # Singleton instance
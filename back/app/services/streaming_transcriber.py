@@ -0,0 +1,234 @@
+"""Incremental speech-to-text: silence-segmented PCM transcribed while the candidate speaks"""
+
+import asyncio
+import io
+import logging
+import wave
+from collections.abc import Awaitable, Callable
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# 16-bit little-endian mono PCM
+SAMPLE_WIDTH = 2
+
+# PCM sample rates accepted from clients
+SUPPORTED_SAMPLE_RATES = (8000, 16000, 22050, 24000, 32000, 44100, 48000)
+
+
+class IncompleteTranscriptionError(RuntimeError):
+    """Some segments of the answer could not be transcribed."""
+
+
+def pcm_to_wav(pcm: bytes, sample_rate: int) -> bytes:
+    """Wrap raw 16-bit mono PCM in a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(sample_rate)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+class EnergyVAD:
+    """
+    Frame-level voice activity detection on RMS energy with an adaptive noise floor.
+
+    A frame is speech when its RMS exceeds `ratio` times the running noise floor
+    (and an absolute minimum). The floor tracks non-speech frames with an EMA.
+    """
+
+    def __init__(self, min_rms: float = 300.0, ratio: float = 3.0):
+        self.min_rms = min_rms
+        self.ratio = ratio
+        self.noise_floor = min_rms / ratio
+
+    def is_speech(self, frame: np.ndarray) -> bool:
+        rms = float(np.sqrt(np.mean(frame.astype(np.float32) ** 2)))
+        speech = rms > max(self.min_rms, self.noise_floor * self.ratio)
+        if not speech:
+            self.noise_floor = 0.95 * self.noise_floor + 0.05 * rms
+        return speech
+
+
+class StreamingTranscriber:
+    """
+    Accepts PCM chunks while the candidate speaks, cuts them into segments at
+    pauses, and transcribes finished segments concurrently in the background.
+
+    When the candidate stops, `finish()` only has to wait for the last segment,
+    so the remaining STT latency no longer grows with the length of the answer.
+    """
+
+    def __init__(
+        self,
+        transcribe_segment: Callable[[bytes], Awaitable[str]],
+        sample_rate: int = 16000,
+        frame_ms: int = 30,
+        silence_ms: int = 700,
+        padding_ms: int = 300,
+        min_speech_ms: int = 250,
+        max_segment_ms: int = 20000,
+        max_concurrency: int = 3,
+        on_partial: Callable[[str], Awaitable[None]] | None = None,
+    ):
+        """
+        Args:
+            transcribe_segment: Coroutine transcribing one WAV segment to text
+            sample_rate: Sample rate of the incoming PCM
+            frame_ms: VAD frame length
+            silence_ms: Pause length that closes a segment
+            padding_ms: Audio kept before speech starts and after it ends
+            min_speech_ms: Segments with less speech than this are dropped
+            max_segment_ms: Segments are force-cut at this length
+            max_concurrency: Max segments transcribed at once
+            on_partial: Called with the stitched transcript of every
+                contiguous finished segment whenever it grows
+        """
+        if sample_rate not in SUPPORTED_SAMPLE_RATES:
+            raise ValueError(f"Unsupported sample rate: {sample_rate}")
+        self.transcribe_segment = transcribe_segment
+        self.sample_rate = sample_rate
+        self.on_partial = on_partial
+
+        self._frame_bytes = int(sample_rate * frame_ms / 1000) * SAMPLE_WIDTH
+        self._silence_frames = max(1, silence_ms // frame_ms)
+        self._padding_frames = max(1, padding_ms // frame_ms)
+        self._min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self._max_segment_frames = max(1, max_segment_ms // frame_ms)
+
+        self._vad = EnergyVAD()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending = b""
+        self._preroll: list[bytes] = []
+        self._segment: list[bytes] = []
+        self._speech_frames = 0
+        self._trailing_silence = 0
+
+        self._tasks: list[asyncio.Task] = []
+        self._results: list[str | None] = []
+        self._failed: list[int] = []
+        self._published = 0
+
+    def feed(self, pcm: bytes):
+        """Add raw PCM audio; finished segments start transcribing immediately."""
+        self._pending += pcm
+        frame_count = len(self._pending) // self._frame_bytes
+        for i in range(frame_count):
+            start = i * self._frame_bytes
+            self._process_frame(self._pending[start : start + self._frame_bytes])
+        self._pending = self._pending[frame_count * self._frame_bytes :]
+
+    async def finish(self) -> str:
+        """
+        Close the last segment and return the full stitched transcript.
+
+        Raises:
+            IncompleteTranscriptionError if a segment failed twice, rather than
+            returning a transcript with a gap
+        """
+        if self._pending and self._segment:
+            self._segment.append(self._pending)
+        self._pending = b""
+        self._close_segment()
+
+        if self._tasks:
+            await asyncio.gather(*self._tasks)
+        if self._failed:
+            raise IncompleteTranscriptionError(
+                f"{len(self._failed)} of {len(self._results)} speech segments "
+                "could not be transcribed"
+            )
+        return self._stitch(self._results)
+
+    async def cancel(self):
+        """Abort in-flight segment transcriptions."""
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+
+    def _process_frame(self, frame: bytes):
+        speech = self._vad.is_speech(np.frombuffer(frame, dtype="<i2"))
+
+        if not self._segment:
+            # Waiting for speech: keep a short pre-roll so onsets are not clipped
+            self._preroll.append(frame)
+            if len(self._preroll) > self._padding_frames:
+                self._preroll.pop(0)
+            if speech:
+                self._segment = self._preroll
+                self._preroll = []
+                self._speech_frames = 1
+                self._trailing_silence = 0
+            return
+
+        self._segment.append(frame)
+        if speech:
+            self._speech_frames += 1
+            self._trailing_silence = 0
+        else:
+            self._trailing_silence += 1
+
+        if (
+            self._trailing_silence >= self._silence_frames
+            or len(self._segment) >= self._max_segment_frames
+        ):
+            self._close_segment()
+
+    def _close_segment(self):
+        if not self._segment:
+            return
+
+        # Keep only `padding` of the trailing silence
+        excess = max(0, self._trailing_silence - self._padding_frames)
+        frames = self._segment[: len(self._segment) - excess]
+        speech_frames = self._speech_frames
+
+        self._segment = []
+        self._speech_frames = 0
+        self._trailing_silence = 0
+
+        if speech_frames < self._min_speech_frames:
+            return
+
+        index = len(self._results)
+        self._results.append(None)
+        wav = pcm_to_wav(b"".join(frames), self.sample_rate)
+        self._tasks.append(asyncio.create_task(self._transcribe(index, wav)))
+
+    async def _transcribe(self, index: int, wav: bytes):
+        async with self._semaphore:
+            for attempt in range(2):
+                try:
+                    self._results[index] = (await self.transcribe_segment(wav)).strip()
+                    break
+                except Exception as e:
+                    logger.error(
+                        f"Segment {index} transcription failed "
+                        f"(attempt {attempt + 1}): {str(e)}"
+                    )
+            else:
+                # Partials carry on past the gap; finish() reports it
+                self._failed.append(index)
+                self._results[index] = ""
+
+        await self._publish_partial()
+
+    async def _publish_partial(self):
+        """Report the transcript of the contiguous prefix of finished segments."""
+        ready = 0
+        while ready < len(self._results) and self._results[ready] is not None:
+            ready += 1
+        if ready <= self._published or self.on_partial is None:
+            return
+        self._published = ready
+        try:
+            await self.on_partial(self._stitch(self._results[:ready]))
+        except Exception as e:
+            logger.warning(f"Partial transcript callback failed: {str(e)}")
+
+    @staticmethod
+    def _stitch(results: list[str | None]) -> str:
+        return " ".join(text for text in results if text).strip()
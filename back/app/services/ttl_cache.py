@@ -0,0 +1,97 @@
+"""In-memory LRU cache of async lookups with TTLs, negative caching and coalescing"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class AsyncTTLCache:
+    """
+    Caches the results of async lookups by key.
+
+    - Results expire after `ttl_seconds`; empty results ("misses", as decided by
+      `is_negative`) after the shorter `negative_ttl_seconds`.
+    - Concurrent lookups of a key share one in-flight fetch.
+    - Exceptions are never cached: every waiter gets it, the next call retries.
+    - Past `max_entries`, the least recently used entries are dropped.
+
+    Cached values are shared between callers and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_seconds: float,
+        negative_ttl_seconds: float,
+        is_negative: Callable[[Any], bool] = lambda value: not value,
+    ):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.is_negative = is_negative
+        self._entries: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._inflight: dict[Hashable, asyncio.Task] = {}
+
+        self.hits = 0
+        self.negative_hits = 0
+        self.coalesced = 0
+        self.misses = 0
+
+    async def get_or_fetch(
+        self, key: Hashable, fetch: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """Return the cached value for `key`, or await `fetch()` and cache it."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            expires_at, value = entry
+            if time.monotonic() < expires_at:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                if self.is_negative(value):
+                    self.negative_hits += 1
+                return value
+            del self._entries[key]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.ensure_future(fetch())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._store(key, done))
+
+        # Shielded so one cancelled caller does not cancel the shared fetch
+        return await asyncio.shield(task)
+
+    def invalidate(self, key: Hashable):
+        self._entries.pop(key, None)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.coalesced + self.misses
+        return {
+            "hits": self.hits,
+            "negative_hits": self.negative_hits,
+            "coalesced": self.coalesced,
+            "misses": self.misses,
+            "hit_rate": (
+                round((self.hits + self.coalesced) / lookups, 3) if lookups else 0.0
+            ),
+            "entries": len(self._entries),
+        }
+
+    def _store(self, key: Hashable, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if task.cancelled() or task.exception() is not None:
+            return
+
+        value = task.result()
+        ttl = self.negative_ttl_seconds if self.is_negative(value) else self.ttl_seconds
+        if ttl <= 0:
+            return
+        self._entries[key] = (time.monotonic() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
@@ -0,0 +1,203 @@
+"""Content-addressed cache for synthesized TTS audio (memory LRU + disk tier)"""
+
+import asyncio
+import hashlib
+import logging
+import mmap
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+from collections.abc import AsyncGenerator
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class TTSAudioCache:
+    """
+    Two-tier cache of MP3 bytes keyed by a hash of everything that shapes the audio.
+
+    - Memory tier: size-bounded LRU of raw bytes.
+    - Disk tier: one file per key under `cache_dir`, read back through mmap and
+      evicted oldest-first (by mtime, refreshed on every hit) past `max_disk_bytes`.
+
+    Disk reads and writes run in worker threads; the memory tier and counters
+    are only touched from the event loop.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None,
+        max_memory_bytes: int,
+        max_disk_bytes: int,
+    ):
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+        self._memory: OrderedDict[str, bytes] = OrderedDict()
+        self._memory_bytes = 0
+
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._disk_bytes = 0
+        # Concurrent puts write (and evict) from several worker threads
+        self._disk_lock = threading.Lock()
+        if self.cache_dir:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                self._disk_bytes = sum(
+                    p.stat().st_size for p in self.cache_dir.glob("*/*.mp3")
+                )
+            except OSError as e:
+                logger.error(f"TTS disk cache disabled ({self.cache_dir}): {e}")
+                self.cache_dir = None
+
+        self.hits = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(text: str, provider: str, voice: str, *options: str) -> str:
+        """Hash the text together with the provider, voice and rendering options."""
+        payload = "\x1f".join([provider, voice, *options, text])
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    async def get(self, key: str) -> bytes | mmap.mmap | None:
+        """
+        Look up cached audio, memory first, then disk (in a worker thread).
+
+        Disk hits are returned as a read-only mmap; the caller must close it.
+        """
+        audio = self._memory.get(key)
+        if audio is not None:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            self.memory_hits += 1
+            return audio
+
+        if self.cache_dir is not None:
+            mapped = await asyncio.to_thread(self._read_from_disk, key)
+            if mapped is not None:
+                self.hits += 1
+                self.disk_hits += 1
+                # Promote small entries so repeat hits skip the filesystem
+                if len(mapped) <= self.max_memory_bytes // 16:
+                    self._remember(key, mapped[:])
+                return mapped
+
+        self.misses += 1
+        return None
+
+    async def put(self, key: str, audio: bytes):
+        """Store audio in memory and, in a worker thread, on disk."""
+        if not audio:
+            return
+        self._remember(key, audio)
+        if self.cache_dir is not None:
+            await asyncio.to_thread(self._write_to_disk, key, audio)
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "memory_hits": self.memory_hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "memory_bytes": self._memory_bytes,
+            "disk_bytes": self._disk_bytes,
+        }
+
+    @staticmethod
+    async def iter_chunks(
+        audio: bytes | mmap.mmap, chunk_size: int = 8192
+    ) -> AsyncGenerator[bytes, None]:
+        """Stream a cache hit back in chunks, releasing the mmap when done."""
+        try:
+            for offset in range(0, len(audio), chunk_size):
+                yield audio[offset : offset + chunk_size]
+        finally:
+            if isinstance(audio, mmap.mmap):
+                audio.close()
+
+    def _remember(self, key: str, audio: bytes):
+        if len(audio) > self.max_memory_bytes:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous)
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _path(self, key: str) -> Path | None:
+        if self.cache_dir is None:
+            return None
+        return self.cache_dir / key[:2] / f"{key}.mp3"
+
+    def _read_from_disk(self, key: str) -> mmap.mmap | None:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            os.utime(path)  # Refresh recency for disk eviction
+            return mapped
+        except (FileNotFoundError, ValueError):
+            # Missing or empty file
+            return None
+        except OSError as e:
+            logger.warning(f"TTS disk cache read failed for {key}: {e}")
+            return None
+
+    def _write_to_disk(self, key: str, audio: bytes):
+        path = self._path(key)
+        try:
+            if path.exists():
+                return
+            path.parent.mkdir(parents=True, exist_ok=True)
+            # Write then rename so readers never map a partial file
+            fd, tmp_path = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(audio)
+            with self._disk_lock:
+                if path.exists():
+                    # A concurrent put of the same key got there first
+                    os.unlink(tmp_path)
+                    return
+                os.replace(tmp_path, path)
+                self._disk_bytes += len(audio)
+                if self._disk_bytes > self.max_disk_bytes:
+                    self._evict_disk()
+        except OSError as e:
+            logger.warning(f"TTS disk cache write failed for {key}: {e}")
+
+    def _evict_disk(self):
+        """
+        Delete least recently used files until back under 90% of the budget.
+
+        Called with `_disk_lock` held.
+        """
+        entries = []
+        for path in self.cache_dir.glob("*/*.mp3"):
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+
+        total = sum(size for _, size, _ in entries)
+        target = int(self.max_disk_bytes * 0.9)
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                path.unlink()
+                total -= size
+            except FileNotFoundError:
+                pass
+        self._disk_bytes = total
+        logger.info(f"TTS disk cache pruned to {total} bytes")
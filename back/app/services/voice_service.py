@@ -1,16 +1,37 @@
+import asyncio
 import io
 import logging
-from collections.abc import AsyncGenerator
+import os
+from collections.abc import AsyncGenerator, AsyncIterable
+from contextlib import aclosing
+from typing import BinaryIO
 
 import edge_tts
 from elevenlabs.client import AsyncElevenLabs
-from groq import Groq
+from groq import AsyncGroq
 
 from app.core.config import settings
+from app.services.audio_preprocessing import (
+    compressed_container,
+    is_wav,
+    preprocess_for_stt,
+)
+from app.services.sentence_splitter import iter_sentences
+from app.services.streaming_transcriber import StreamingTranscriber
+from app.services.tts_cache import TTSAudioCache
 
 # Setup logging
 logger = logging.getLogger(__name__)
 
+# Audio accepted for transcription: a path, raw bytes, or a binary file object
+AudioInput = str | os.PathLike | bytes | BinaryIO
+
+# Marks the end of one sentence's audio in the TTS pipeline
+_END_OF_SENTENCE = object()
+
+# How long finished background syntheses stay joinable
+PRESYNTHESIS_TTL_SECONDS = 300
+
 
 class VoiceService:
     def __init__(self):
@@ -30,6 +51,18 @@ class VoiceService:
             logger.info("Using Edge TTS for TTS")
             self.eleven_client = None  # Not using ElevenLabs
 
+        # In-flight/recent background syntheses, keyed like the TTS cache
+        self._presynthesis: dict[str, asyncio.Task] = {}
+
+        # --- 3. Setup TTS audio cache ---
+        self.tts_cache = None
+        if settings.TTS_CACHE_ENABLED:
+            self.tts_cache = TTSAudioCache(
+                cache_dir=settings.TTS_CACHE_DIR or None,
+                max_memory_bytes=settings.TTS_CACHE_MEMORY_MAX_BYTES,
+                max_disk_bytes=settings.TTS_CACHE_DISK_MAX_BYTES,
+            )
+
     def _init_groq(self):
         """Helper to initialize Groq."""
         api_key = settings.GROQ_API_KEY
@@ -37,12 +70,16 @@ class VoiceService:
             raise ValueError("GROQ_API_KEY not found in settings!")
 
         try:
-            self.groq_client = Groq(api_key=api_key)
+            self.groq_client = AsyncGroq(api_key=api_key)
             logger.info("Groq client initialized successfully!")
         except Exception as e:
             logger.error(f"Failed to initialize Groq client: {str(e)}")
             raise
 
+    async def aclose(self):
+        """Close the Groq STT connection pool."""
+        await self.groq_client.close()
+
     def _init_elevenlabs(self):
         """Helper to initialize ElevenLabs."""
         # Check for API Key
@@ -61,33 +98,218 @@ class VoiceService:
             logger.error(f"Failed to initialize ElevenLabs client: {str(e)}")
             self.eleven_client = None
 
-    async def transcribe_audio(self, audio_file_path: str, language: str = "fr") -> str:
+    async def transcribe_audio(
+        self,
+        audio: AudioInput,
+        language: str = "fr",
+        filename: str = "audio.wav",
+        preprocess: bool = True,
+    ) -> str:
         """
         Transcribe audio using Groq Whisper API.
-        """
-        logger.info(f"Transcribing audio: {audio_file_path}")
 
+        In-memory audio and open file objects (such as an upload's spooled
+        buffer) are sent as they are, without a round trip through disk.
+        WAV and webm/ogg recordings are trimmed and downsampled first (see
+        `audio_preprocessing`).
+
+        Args:
+            audio: Path to an audio file, raw audio bytes, or a binary file object
+            language: Language code
+            filename: Upload name for in-memory audio; Whisper reads the
+                container format from its extension
+            preprocess: Set to False for audio that is already trimmed 16 kHz mono
+
+        Returns:
+            Transcribed text
+        """
         try:
-            with open(audio_file_path, "rb") as audio_file:
-                transcription = self.groq_client.audio.transcriptions.create(
-                    file=audio_file,
-                    model="whisper-large-v3",
-                    language=language,
-                    response_format="text",
-                    temperature=0.0,
-                )
-            return transcription.strip()
+            if isinstance(audio, str | os.PathLike):
+                logger.info(f"Transcribing audio: {audio}")
+                with open(audio, "rb") as audio_file:
+                    return await self._transcribe(
+                        audio_file, os.path.basename(audio), language, preprocess
+                    )
+
+            logger.info(f"Transcribing in-memory audio as {filename}")
+            return await self._transcribe(audio, filename, language, preprocess)
         except Exception as e:
             logger.error(f"Transcription error: {str(e)}")
             raise
 
+    async def _transcribe(
+        self,
+        audio: bytes | BinaryIO,
+        filename: str,
+        language: str,
+        preprocess: bool,
+    ) -> str:
+        if not isinstance(audio, bytes | bytearray | memoryview) and audio.seekable():
+            audio.seek(0)
+        if preprocess and settings.STT_PREPROCESS_ENABLED:
+            audio = await self._preprocess_audio(audio)
+
+        transcription = await self.groq_client.audio.transcriptions.create(
+            file=(filename, audio),
+            model="whisper-large-v3",
+            language=language,
+            response_format="text",
+            temperature=0.0,
+        )
+        return transcription.strip()
+
+    async def _preprocess_audio(self, audio: bytes | BinaryIO) -> bytes | BinaryIO:
+        """Trim WAV and webm/ogg audio; anything else is returned untouched."""
+        if isinstance(audio, bytes | bytearray | memoryview):
+            header = bytes(audio[:12])
+        elif audio.seekable():
+            header = audio.read(12)
+            audio.seek(0)
+        else:
+            return audio
+
+        if not is_wav(header) and compressed_container(header) is None:
+            return audio
+
+        if isinstance(audio, bytes | bytearray | memoryview):
+            data = bytes(audio)
+        else:
+            data = audio.read()
+
+        result = await asyncio.to_thread(preprocess_for_stt, data)
+        logger.info(
+            f"🎚️ STT preprocessing: {result.original_bytes} -> {len(result.data)} "
+            f"bytes ({result.bytes_saved} saved)"
+        )
+        return result.data
+
+    def streaming_transcriber(
+        self, sample_rate: int, language: str = "fr", on_partial=None
+    ) -> StreamingTranscriber:
+        """
+        Create a transcriber that segments live PCM audio and transcribes it while it arrives.
+
+        Args:
+            sample_rate: Sample rate of the 16-bit mono PCM the client sends
+            language: Language code
+            on_partial: Optional coroutine receiving the transcript so far
+
+        Returns:
+            StreamingTranscriber bound to this service
+        """
+
+        async def transcribe_segment(wav: bytes) -> str:
+            return await self.transcribe_audio(
+                wav, language=language, filename="segment.wav", preprocess=False
+            )
+
+        return StreamingTranscriber(
+            transcribe_segment,
+            sample_rate=sample_rate,
+            max_concurrency=settings.STT_STREAM_CONCURRENCY,
+            on_partial=on_partial,
+        )
+
     async def text_to_speech_stream(
         self, text: str, voice_id: str = None, chunk_size: int = 8192
     ) -> AsyncGenerator[bytes, None]:
         """
         Convert text to speech and stream audio.
         Uses ElevenLabs if USE_ELEVENLABS=true, otherwise uses Edge TTS.
+        Audio that was already synthesized is served from the TTS cache, and
+        audio being pre-synthesized in the background is joined, not redone.
+        """
+        key = self._tts_cache_key(text, voice_id)
+
+        pending = self._presynthesis.get(key)
+        if pending is not None:
+            try:
+                # shield(): a disconnecting listener must not cancel the shared task
+                audio = await asyncio.shield(pending)
+                logger.info(f"Serving pre-synthesized audio: '{text[:50]}...'")
+                async for chunk in TTSAudioCache.iter_chunks(audio, chunk_size):
+                    yield chunk
+                return
+            except Exception as e:
+                logger.warning(f"Pre-synthesis failed, synthesizing again: {e}")
+
+        if self.tts_cache is None:
+            async for chunk in self._provider_tts_stream(text, voice_id, chunk_size):
+                yield chunk
+            return
+
+        cached = await self.tts_cache.get(key)
+        if cached is not None:
+            logger.info(f"TTS cache hit: '{text[:50]}...'")
+            async for chunk in self.tts_cache.iter_chunks(cached, chunk_size):
+                yield chunk
+            return
+
+        audio = bytearray()
+        async for chunk in self._provider_tts_stream(text, voice_id, chunk_size):
+            audio.extend(chunk)
+            yield chunk
+
+        # Only reached when the provider stream completed (not on disconnect)
+        await self.tts_cache.put(key, bytes(audio))
+
+    def presynthesize(self, text: str, voice_id: str = None) -> asyncio.Task:
+        """
+        Start synthesizing `text` in the background and return the task handle.
+
+        Later `text_to_speech_stream` calls for the same audio join the task (or
+        read its result) instead of calling the provider again. Finished handles
+        are kept for PRESYNTHESIS_TTL_SECONDS so they work without the cache too.
         """
+        key = self._tts_cache_key(text, voice_id)
+        existing = self._presynthesis.get(key)
+        if existing is not None:
+            return existing
+
+        task = asyncio.create_task(self._synthesize_to_bytes(key, text, voice_id))
+        self._presynthesis[key] = task
+
+        def release(finished: asyncio.Task):
+            def forget():
+                if self._presynthesis.get(key) is finished:
+                    del self._presynthesis[key]
+
+            if finished.cancelled() or finished.exception() is not None:
+                forget()
+            else:
+                asyncio.get_running_loop().call_later(PRESYNTHESIS_TTL_SECONDS, forget)
+
+        task.add_done_callback(release)
+        return task
+
+    async def _synthesize_to_bytes(
+        self, key: str, text: str, voice_id: str = None
+    ) -> bytes:
+        """Synthesize the full audio for `text`, going through the TTS cache."""
+        if self.tts_cache is not None:
+            cached = await self.tts_cache.get(key)
+            if cached is not None:
+                return b"".join(
+                    [chunk async for chunk in self.tts_cache.iter_chunks(cached)]
+                )
+
+        try:
+            audio = b"".join(
+                [chunk async for chunk in self._provider_tts_stream(text, voice_id)]
+            )
+        except Exception as e:
+            logger.error(f"Background synthesis error: {str(e)}")
+            raise
+
+        if self.tts_cache is not None:
+            await self.tts_cache.put(key, audio)
+        logger.info(f"Pre-synthesized audio ready ({len(audio)} bytes)")
+        return audio
+
+    async def _provider_tts_stream(
+        self, text: str, voice_id: str = None, chunk_size: int = 8192
+    ) -> AsyncGenerator[bytes, None]:
+        """Stream freshly synthesized audio from the configured provider."""
         if self.use_elevenlabs:
             async for chunk in self._elevenlabs_tts_stream(text, voice_id, chunk_size):
                 yield chunk
@@ -95,6 +317,91 @@ class VoiceService:
             async for chunk in self._edge_tts_stream(text, chunk_size):
                 yield chunk
 
+    def _tts_cache_key(self, text: str, voice_id: str = None) -> str:
+        """Cache key covering the provider and every setting that shapes the audio."""
+        if self.use_elevenlabs:
+            return TTSAudioCache.make_key(
+                text,
+                "elevenlabs",
+                voice_id or settings.ELEVENLABS_VOICE_ID,
+                "eleven_turbo_v2_5",
+                "mp3_44100_128",
+            )
+        return TTSAudioCache.make_key(
+            text, "edge", settings.TTS_VOICE, settings.TTS_RATE, settings.TTS_VOLUME
+        )
+
+    async def text_to_speech_pipeline(
+        self,
+        text_chunks: AsyncIterable[str],
+        max_concurrency: int | None = None,
+        chunk_size: int = 8192,
+    ) -> AsyncGenerator[bytes, None]:
+        """
+        Convert a stream of LLM text chunks to speech while it is still being generated.
+
+        The text is split into sentences as it arrives, each sentence is
+        synthesized as soon as it is complete (at most `max_concurrency` at a
+        time), and the MP3 bytes are yielded in sentence order. The sentence
+        currently being played back is streamed chunk by chunk; the following
+        ones are synthesized ahead into memory.
+        """
+        semaphore = asyncio.Semaphore(
+            max_concurrency or settings.TTS_PIPELINE_CONCURRENCY
+        )
+        # One audio queue per sentence, in sentence order; None ends the text
+        sentence_queues: asyncio.Queue[asyncio.Queue | None] = asyncio.Queue()
+        tasks: list[asyncio.Task] = []
+
+        async def synthesize(sentence: str, audio_queue: asyncio.Queue):
+            try:
+                async with semaphore:
+                    async for chunk in self.text_to_speech_stream(
+                        sentence, chunk_size=chunk_size
+                    ):
+                        await audio_queue.put(chunk)
+            except Exception as e:
+                await audio_queue.put(e)
+            finally:
+                await audio_queue.put(_END_OF_SENTENCE)
+
+        async def dispatch_sentences():
+            try:
+                async for sentence in iter_sentences(text_chunks):
+                    audio_queue = asyncio.Queue()
+                    tasks.append(asyncio.create_task(synthesize(sentence, audio_queue)))
+                    await sentence_queues.put(audio_queue)
+            except Exception as e:
+                # Surface text-stream failures to the consumer in order
+                failed = asyncio.Queue()
+                failed.put_nowait(e)
+                failed.put_nowait(_END_OF_SENTENCE)
+                await sentence_queues.put(failed)
+            finally:
+                await sentence_queues.put(None)
+
+        dispatcher = asyncio.create_task(dispatch_sentences())
+        sentence_count = 0
+
+        try:
+            while (audio_queue := await sentence_queues.get()) is not None:
+                sentence_count += 1
+                while (item := await audio_queue.get()) is not _END_OF_SENTENCE:
+                    if isinstance(item, Exception):
+                        raise item
+                    yield item
+
+            logger.info(f"TTS pipeline complete ({sentence_count} sentences).")
+
+        except Exception as e:
+            logger.error(f"TTS pipeline error: {str(e)}")
+            raise
+
+        finally:
+            dispatcher.cancel()
+            for task in tasks:
+                task.cancel()
+
     async def _elevenlabs_tts_stream(
         self, text: str, voice_id: str = None, chunk_size: int = 8192
     ) -> AsyncGenerator[bytes, None]:
@@ -131,15 +438,17 @@ class VoiceService:
             # Buffer logic to ensure smooth chunks
             buffer = io.BytesIO()
 
-            async for chunk in audio_stream:
-                if chunk:
-                    buffer.write(chunk)
+            # aclosing() aborts the provider request if our consumer goes away
+            async with aclosing(audio_stream):
+                async for chunk in audio_stream:
+                    if chunk:
+                        buffer.write(chunk)
 
-                    # If buffer is big enough, yield it
-                    if buffer.tell() >= chunk_size:
-                        buffer.seek(0)
-                        yield buffer.read()
-                        buffer = io.BytesIO()  # Reset
+                        # If buffer is big enough, yield it
+                        if buffer.tell() >= chunk_size:
+                            buffer.seek(0)
+                            yield buffer.read()
+                            buffer = io.BytesIO()  # Reset
 
             # Yield remaining
             if buffer.tell() > 0:
@@ -173,16 +482,18 @@ class VoiceService:
             # Buffer logic to ensure smooth chunks
             buffer = io.BytesIO()
 
-            async for chunk in communicate.stream():
-                if chunk["type"] == "audio":
-                    audio_data = chunk["data"]
-                    buffer.write(audio_data)
-
-                    # If buffer is big enough, yield it
-                    if buffer.tell() >= chunk_size:
-                        buffer.seek(0)
-                        yield buffer.read()
-                        buffer = io.BytesIO()  # Reset
+            # aclosing() closes the Edge websocket if our consumer goes away
+            async with aclosing(communicate.stream()) as edge_stream:
+                async for chunk in edge_stream:
+                    if chunk["type"] == "audio":
+                        audio_data = chunk["data"]
+                        buffer.write(audio_data)
+
+                        # If buffer is big enough, yield it
+                        if buffer.tell() >= chunk_size:
+                            buffer.seek(0)
+                            yield buffer.read()
+                            buffer = io.BytesIO()  # Reset
 
             # Yield remaining
             if buffer.tell() > 0:
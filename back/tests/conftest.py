@@ -0,0 +1,4 @@
+import os
+
+# Services are instantiated at import time and require a Groq key to exist
+os.environ.setdefault("GROQ_API_KEY", "test-key")
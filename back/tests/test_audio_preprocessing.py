@@ -0,0 +1,67 @@
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from app.services import audio_preprocessing
+from app.services.audio_preprocessing import (
+    TARGET_SAMPLE_RATE,
+    decode_compressed,
+    decode_wav,
+    encode_opus,
+    encode_wav,
+    preprocess_for_stt,
+)
+
+
+def stereo_wav(rate: int, silence_s: float, speech_s: float) -> bytes:
+    silence = np.zeros(int(rate * silence_s))
+    t = np.arange(int(rate * speech_s)) / rate
+    mono = np.concatenate([silence, 0.5 * np.sin(2 * np.pi * 440 * t), silence])
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(2)
+        writer.setsampwidth(2)
+        writer.setframerate(rate)
+        writer.writeframes((np.repeat(mono, 2) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def test_trims_silence_and_downsamples_to_mono_16k():
+    original = stereo_wav(44100, silence_s=2.0, speech_s=1.0)
+    result = preprocess_for_stt(original)
+
+    samples, rate = decode_wav(result.data)
+    assert rate == TARGET_SAMPLE_RATE
+    assert samples.shape[1] == 1
+    # One second of speech plus at most 300 ms padding on each side
+    assert 1.0 <= len(samples) / rate <= 1.7
+    assert result.bytes_saved > 0.9 * len(original)
+
+
+def test_passes_through_non_wav_and_silent_audio():
+    webm = b"\x1aE\xdf\xa3" + b"\x00" * 100
+    assert preprocess_for_stt(webm).data == webm
+
+    silent = encode_wav(np.zeros(TARGET_SAMPLE_RATE), TARGET_SAMPLE_RATE)
+    assert preprocess_for_stt(silent).data == silent
+
+
+def test_trims_browser_webm_opus_and_keeps_its_container(monkeypatch):
+    pytest.importorskip("av")
+    rate = 48000
+    t = np.arange(rate) / rate
+    silence = np.zeros(2 * rate)
+    speech = np.concatenate([silence, 0.5 * np.sin(2 * np.pi * 440 * t), silence])
+    # MediaRecorder's default: 48 kHz Opus at a higher bitrate than speech needs
+    monkeypatch.setattr(audio_preprocessing, "OPUS_BIT_RATE", 64000)
+    original = encode_opus(speech, rate, "webm")
+    monkeypatch.undo()
+
+    result = preprocess_for_stt(original)
+
+    assert result.data[:4] == original[:4]
+    assert result.bytes_saved > 0.5 * len(original)
+    samples = decode_compressed(result.data, TARGET_SAMPLE_RATE)
+    assert 1.0 <= len(samples) / TARGET_SAMPLE_RATE <= 1.7
@@ -0,0 +1,56 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.models.france_travail_params import FranceTravailParams
+from app.services.dspy_job_service import DSPyJobService
+
+
+class FakePredictor:
+    def __init__(self, fail: bool = False):
+        self.calls = []
+        self.fail = fail
+
+    async def acall(self, user_query, user_profile):
+        self.calls.append(user_query)
+        await asyncio.sleep(0.01)
+        if self.fail:
+            raise RuntimeError("LLM unavailable")
+        return SimpleNamespace(
+            variations=[FranceTravailParams(keywords=user_query.lower())]
+        )
+
+
+def test_repeated_searches_reuse_the_plan_per_profile():
+    service = DSPyJobService()
+    service.predictor = FakePredictor()
+
+    async def run():
+        await asyncio.gather(
+            service.apredict_params("Find jobs matching my profile", "Python"),
+            service.apredict_params("find  jobs matching my PROFILE", "Python"),
+        )
+        await service.apredict_params("Find jobs matching my profile", "Python")
+        # A changed profile is planned again
+        return await service.apredict_params("Find jobs matching my profile", "Java")
+
+    variations = asyncio.run(run())
+
+    assert variations[0].keywords == "find jobs matching my profile"
+    assert len(service.predictor.calls) == 2
+
+
+def test_failures_fall_back_and_are_not_cached():
+    service = DSPyJobService()
+    service.predictor = FakePredictor(fail=True)
+
+    async def run():
+        first = await service.apredict_params("Data engineer", "Python")
+        second = await service.apredict_params("Data engineer", "Python")
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first[0].keywords == "Data engineer"
+    assert first[0].location_raw is None
+    assert second[0].keywords == "Data engineer"
+    assert len(service.predictor.calls) == 2
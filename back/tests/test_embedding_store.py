@@ -0,0 +1,60 @@
+import numpy as np
+
+from app.services.embedding_store import EmbeddingStore
+
+
+def vectors(*keys: str) -> dict[str, np.ndarray]:
+    return {key: np.full(4, i, dtype=np.float32) for i, key in enumerate(keys)}
+
+
+def test_key_changes_with_offer_text():
+    assert EmbeddingStore.make_key("123ABC", "Dev Python") != EmbeddingStore.make_key(
+        "123ABC", "Dev Python senior"
+    )
+
+
+def test_vectors_survive_a_restart(tmp_path):
+    store = EmbeddingStore(tmp_path, max_memory_entries=10, max_disk_entries=100)
+    store.put_many(vectors("a", "b", "c"))
+
+    reloaded = EmbeddingStore(tmp_path, max_memory_entries=10, max_disk_entries=100)
+    found = reloaded.get_many(["a", "c", "missing"])
+    assert set(found) == {"a", "c"}
+    np.testing.assert_array_equal(found["c"], np.full(4, 2))
+    assert reloaded.stats()["misses"] == 1
+
+
+def test_disk_compaction_keeps_newest_rows(tmp_path):
+    store = EmbeddingStore(tmp_path, max_memory_entries=1, max_disk_entries=10)
+    for i in range(12):
+        store.put_many({f"k{i}": np.full(4, i, dtype=np.float32)})
+
+    reloaded = EmbeddingStore(tmp_path, max_memory_entries=1, max_disk_entries=10)
+    assert "k0" not in reloaded.get_many(["k0"])
+    np.testing.assert_array_equal(reloaded.get_many(["k11"])["k11"], np.full(4, 11))
+    assert reloaded.stats()["disk_entries"] <= 10
+
+
+def test_processes_sharing_a_directory_never_overwrite_rows(tmp_path):
+    # Two stores stand in for two workers, each with its own in-memory index
+    first = EmbeddingStore(tmp_path, max_memory_entries=1, max_disk_entries=100)
+    second = EmbeddingStore(tmp_path, max_memory_entries=1, max_disk_entries=100)
+    first.put_many({"a": np.full(4, 1, dtype=np.float32)})
+    second.put_many({"b": np.full(4, 2, dtype=np.float32)})
+    first.put_many({"c": np.full(4, 3, dtype=np.float32)})
+
+    reloaded = EmbeddingStore(tmp_path, max_memory_entries=1, max_disk_entries=100)
+    for key, value in {"a": 1, "b": 2, "c": 3}.items():
+        np.testing.assert_array_equal(reloaded.get_many([key])[key], np.full(4, value))
+    np.testing.assert_array_equal(second.get_many(["c"])["c"], np.full(4, 3))
+
+
+def test_rows_are_reread_after_another_process_compacts(tmp_path):
+    reader = EmbeddingStore(tmp_path, max_memory_entries=1, max_disk_entries=10)
+    writer = EmbeddingStore(tmp_path, max_memory_entries=1, max_disk_entries=10)
+    reader.put_many({"k0": np.full(4, 0, dtype=np.float32)})
+    for i in range(1, 12):
+        writer.put_many({f"k{i}": np.full(4, i, dtype=np.float32)})
+
+    np.testing.assert_array_equal(reader.get_many(["k11"])["k11"], np.full(4, 11))
+    assert "k0" not in reader.get_many(["k0"])
@@ -0,0 +1,149 @@
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from app.core.config import settings
+from app.services.francetravail_service import (
+    FranceTravailService,
+    _content_range_total,
+)
+
+
+def make_service(available: int, delays: dict[int, float] | None = None):
+    """Service whose search API holds `available` offers; records requested ranges."""
+    service = FranceTravailService()
+    service.requested = []
+
+    async def get_token():
+        return "token"
+
+    async def fetch_range(token, params, first, last):
+        service.requested.append((first, last))
+        await asyncio.sleep((delays or {}).get(first, 0))
+        offers = [{"id": str(i)} for i in range(first, min(last + 1, available))]
+        return offers, None
+
+    service._get_access_token = get_token
+    service._fetch_range = fetch_range
+    return service
+
+
+def test_search_jobs_fetches_pages_up_to_max_results():
+    service = make_service(available=10000)
+
+    jobs = asyncio.run(service.search_jobs("python", max_results=400))
+
+    assert [job["id"] for job in jobs] == [str(i) for i in range(400)]
+    assert sorted(service.requested) == [(0, 149), (150, 299), (300, 399)]
+
+
+def test_search_jobs_caps_at_api_offset_limit():
+    service = make_service(available=10000)
+
+    jobs = asyncio.run(service.search_jobs("python", max_results=10000))
+
+    assert len(jobs) == 3150
+    assert max(service.requested) == (3000, 3149)
+
+
+def test_iter_job_pages_yields_in_order_and_stops_on_short_page():
+    # Later pages answer first; the third page is short
+    service = make_service(available=320, delays={0: 0.05, 150: 0.02})
+
+    async def collect():
+        return [
+            page async for page in service.iter_job_pages("python", max_results=3150)
+        ]
+
+    pages = asyncio.run(collect())
+
+    assert [len(page) for page in pages] == [150, 150, 20]
+    assert pages[0][0]["id"] == "0"
+
+
+def test_iter_job_pages_keeps_earlier_pages_when_a_later_one_fails():
+    service = make_service(available=10000)
+    fetch_range = service._fetch_range
+
+    async def flaky_fetch(token, params, first, last):
+        if first == 150:
+            raise httpx.ConnectError("boom")
+        return await fetch_range(token, params, first, last)
+
+    service._fetch_range = flaky_fetch
+    jobs = asyncio.run(service.search_jobs("python", max_results=450))
+    assert len(jobs) == 150
+
+
+def test_iter_job_pages_raises_when_first_page_fails():
+    service = make_service(available=10000)
+
+    async def failing_fetch(token, params, first, last):
+        raise httpx.ConnectError("boom")
+
+    service._fetch_range = failing_fetch
+    with pytest.raises(httpx.ConnectError):
+        asyncio.run(service.search_jobs("python"))
+
+
+def test_content_range_total():
+    assert _content_range_total("offres 0-149/3254") == 3254
+    assert _content_range_total("offres 0-49/*") is None
+    assert _content_range_total(None) is None
+
+
+def make_token_service(counter: list, lifetime: float = 1500):
+    service = FranceTravailService()
+
+    async def request_token():
+        counter.append(1)
+        await asyncio.sleep(0.01)
+        return f"token-{len(counter)}", time.time() + lifetime
+
+    service._request_token = request_token
+    return service
+
+
+def test_concurrent_token_requests_share_one_refresh(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        settings, "FRANCE_TRAVAIL_TOKEN_CACHE_PATH", str(tmp_path / "token.json")
+    )
+    requests = []
+    service = make_token_service(requests)
+
+    async def run():
+        return await asyncio.gather(*(service._get_access_token() for _ in range(10)))
+
+    assert asyncio.run(run()) == ["token-1"] * 10
+    assert len(requests) == 1
+
+
+def test_token_near_expiry_is_refreshed_in_background(monkeypatch):
+    monkeypatch.setattr(settings, "FRANCE_TRAVAIL_TOKEN_CACHE_PATH", "")
+    requests = []
+    service = make_token_service(requests)
+    service.access_token = "old"
+    service.token_expiry = time.time() + 60
+
+    async def run():
+        token = await service._get_access_token()
+        await service._refresh_task
+        return token
+
+    assert asyncio.run(run()) == "old"
+    assert service.access_token == "token-1"
+    assert len(requests) == 1
+
+
+def test_token_is_shared_across_processes(tmp_path, monkeypatch):
+    monkeypatch.setattr(
+        settings, "FRANCE_TRAVAIL_TOKEN_CACHE_PATH", str(tmp_path / "token.json")
+    )
+    requests = []
+    first, second = make_token_service(requests), make_token_service(requests)
+
+    assert asyncio.run(first._get_access_token()) == "token-1"
+    assert asyncio.run(second._get_access_token()) == "token-1"
+    assert len(requests) == 1
@@ -0,0 +1,83 @@
+import gzip
+import json
+import shutil
+
+import pytest
+
+from app.services.geo_index import DATA_DIR, DIVISIONS_FILE, GeoIndex, normalize
+
+COMMUNES = [
+    ["13055", "Marseille", ["13001", "13002"], "13", 873076],
+    ["42218", "Saint-Étienne", ["42000", "42100"], "42", 173089],
+    ["69123", "Lyon", ["69001", "69002"], "69", 522250],
+    ["69091", "Givors", ["69700"], "69", 20000],
+    ["76351", "Le Havre", ["76600", "76610"], "76", 166462],
+    ["75056", "Paris", ["75001", "75002"], "75", 2133111],
+    ["91471", "Orsay", ["91400"], "91", 16000],
+    ["02576", "Lyon-la-Forêt", ["27480"], "02", 700],
+]
+
+
+@pytest.fixture(scope="module")
+def index(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp("geo")
+    shutil.copy(DATA_DIR / DIVISIONS_FILE, data_dir / DIVISIONS_FILE)
+    with gzip.open(data_dir / "communes.json.gz", "wt", encoding="utf-8") as f:
+        json.dump({"version": "test", "communes": COMMUNES}, f)
+    return GeoIndex.load(data_dir)
+
+
+def test_normalize_strips_accents_and_expands_abbreviations():
+    assert normalize("Saint-Étienne") == "saint etienne"
+    assert normalize("  ST ÉTIENNE ") == "saint etienne"
+    assert normalize("Val-d'Oise") == "val d oise"
+
+
+def test_bundled_divisions_are_complete():
+    index = GeoIndex.load()
+    assert len(index.regions) == 18
+    assert len(index.departements) == 101
+    assert all(
+        dept["codeRegion"] in index.regions for dept in index.departements.values()
+    )
+
+
+def test_search_cities_by_name_ranks_exact_then_population(index):
+    assert [city["nom"] for city in index.search_cities("lyon")] == [
+        "Lyon",
+        "Lyon-la-Forêt",
+    ]
+    assert index.search_cities("st etienne")[0]["code"] == "42218"
+    assert index.search_cities("havre")[0]["nom"] == "Le Havre"
+
+    lyon = index.search_cities("Lyon")[0]
+    assert lyon["departement"] == {"code": "69", "nom": "Rhône"}
+    assert lyon["region"] == {"code": "84", "nom": "Auvergne-Rhône-Alpes"}
+
+
+def test_search_cities_by_postal_and_insee_code(index):
+    assert [city["nom"] for city in index.search_cities("69002")] == ["Lyon"]
+    assert [city["nom"] for city in index.search_cities("75056")] == ["Paris"]
+    assert index.search_cities("99999") == []
+
+
+def test_search_departments_and_regions(index):
+    assert [dept["code"] for dept in index.search_departments("loire")][:2] == [
+        "42",
+        "44",
+    ]
+    assert index.search_departments("2a")[0]["nom"] == "Corse-du-Sud"
+    assert index.search_departments("Reunion")[0]["code"] == "974"
+    assert index.search_regions("ile de france")[0]["code"] == "11"
+    assert index.search_regions("PACA")[0]["code"] == "93"
+    assert index.search_regions("Loire") == []
+
+
+def test_commune_dataset_can_live_outside_the_data_dir(tmp_path):
+    path = tmp_path / "elsewhere" / "communes.json.gz"
+    path.parent.mkdir()
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        json.dump({"version": "COG 2024", "communes": COMMUNES}, f)
+
+    index = GeoIndex.load(communes_path=path)
+    assert index.search_cities("69001")[0]["nom"] == "Lyon"
@@ -0,0 +1,138 @@
+import json
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from app.api.v1.endpoints import interviews
+from app.core.auth import get_current_db_user
+from app.db import Base, get_db
+from app.models import (  # noqa: F401 (registers related mappers)
+    Interview,
+    InterviewerStyle,
+    QuestionAnswer,
+    resume_models,
+)
+from app.models.user import User
+from app.services.interview_service import interview_service
+
+
+class FakeVoice:
+    async def transcribe_audio(self, audio, language="fr"):
+        return "J'ai cinq ans d'expérience en Python."
+
+
+class FakeLLM:
+    def __init__(self, tokens, error=None):
+        self.tokens = tokens
+        self.error = error
+
+    async def chat_stream(self, message, history, interviewer_type, **kwargs):
+        for token in self.tokens:
+            yield token
+        if self.error:
+            raise self.error
+
+
+class FakeGrading:
+    def __init__(self):
+        self.graded = []
+
+    async def grade_and_update(self, qa_id, question, answer, interviewer_style):
+        self.graded.append((qa_id, answer))
+
+
+@pytest.fixture
+def db():
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    user = User(first_name="Ana", last_name="Martin", email="ana@example.com")
+    interview = Interview(
+        interviewer_style=InterviewerStyle.NICE, user=user, question_count=1
+    )
+    session.add_all(
+        [user, interview, QuestionAnswer(question="Bonjour !", interview=interview)]
+    )
+    session.commit()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def grading(monkeypatch):
+    grading = FakeGrading()
+    monkeypatch.setattr(interview_service, "voice_service", FakeVoice())
+    monkeypatch.setattr(interview_service, "grading_service", grading)
+    return grading
+
+
+def stream_response(db, llm, monkeypatch) -> list[tuple[str, dict]]:
+    monkeypatch.setattr(interview_service, "llm_service", llm)
+    app = FastAPI()
+    app.include_router(interviews.router, prefix="/interviews")
+    app.dependency_overrides[get_db] = lambda: db
+    app.dependency_overrides[get_current_db_user] = lambda: db.query(User).one()
+
+    interview_id = db.query(Interview).one().id
+    with TestClient(app) as client:
+        response = client.post(
+            f"/interviews/{interview_id}/respond/stream",
+            files={"audio": ("answer.webm", b"\x1aE\xdf\xa3", "audio/webm")},
+        )
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = []
+    for message in response.text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in message.splitlines())
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+
+def test_streams_tokens_in_order_then_persists_the_turn(db, grading, monkeypatch):
+    tokens = ["Très ", "bien. ", "Parlez-moi ", "de Django."]
+
+    events = stream_response(db, FakeLLM(tokens), monkeypatch)
+
+    assert [name for name, _ in events] == [
+        "transcription",
+        *["delta"] * len(tokens),
+        "done",
+    ]
+    assert events[0][1]["text"] == "J'ai cinq ans d'expérience en Python."
+    assert [data["text"] for _, data in events[1:-1]] == tokens
+
+    done = events[-1][1]
+    assert done["response"] == "".join(tokens)
+    assert done["question_count"] == 2
+    greeting, reply = db.query(QuestionAnswer).order_by(QuestionAnswer.id).all()
+    assert greeting.answer == "J'ai cinq ans d'expérience en Python."
+    assert (reply.id, reply.question, reply.answer) == (
+        done["question_id"],
+        "".join(tokens),
+        None,
+    )
+    assert grading.graded == [(greeting.id, greeting.answer)]
+
+
+def test_llm_failure_sends_an_error_event_and_persists_nothing(
+    db, grading, monkeypatch
+):
+    llm = FakeLLM(["Très "], error=RuntimeError("Groq unavailable"))
+
+    events = stream_response(db, llm, monkeypatch)
+
+    assert [name for name, _ in events] == ["transcription", "delta", "error"]
+    assert events[-1][1]["detail"] == "Groq unavailable"
+    db.expire_all()
+    assert db.query(Interview).one().question_count == 1
+    (greeting,) = db.query(QuestionAnswer).all()
+    assert greeting.answer is None
+    assert grading.graded == []
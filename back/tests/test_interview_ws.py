@@ -0,0 +1,81 @@
+import asyncio
+
+from app.api.v1.endpoints import interview_ws as module
+from app.api.v1.endpoints.interview_ws import LiveTurn, _answer_turn, _interrupt
+
+
+class FakeSender:
+    def __init__(self):
+        self.events = []
+
+    async def json(self, data):
+        self.events.append(data)
+
+    async def bytes(self, data):
+        pass
+
+
+class FakeInterviewService:
+    """Transcribes, then hangs in the LLM reply until cancelled."""
+
+    def __init__(self):
+        self.transcriptions = []
+
+    async def process_session_turn(self, session, audio, language, transcription):
+        self.transcriptions.append(transcription)
+        yield {"type": "transcription", "text": transcription}
+        await asyncio.Event().wait()
+
+
+class FakeTranscriber:
+    def __init__(self, text):
+        self.text = text
+
+    async def finish(self):
+        return self.text
+
+    async def cancel(self):
+        pass
+
+
+class FakeVoiceService:
+    async def text_to_speech_pipeline(self, text_stream):
+        async for _ in text_stream:
+            pass
+        return
+        yield
+
+
+def test_interrupted_unsaved_answer_is_merged_into_the_next(monkeypatch):
+    interviews = FakeInterviewService()
+    monkeypatch.setattr(module, "interview_service", interviews)
+    monkeypatch.setattr(module, "voice_service", FakeVoiceService())
+    sender = FakeSender()
+
+    async def run():
+        turn = LiveTurn()
+        turn.task = asyncio.create_task(
+            _answer_turn(sender, None, "fr", turn, streaming=FakeTranscriber("Je suis"))
+        )
+        await asyncio.sleep(0.01)
+        assert turn.running
+        carried = await _interrupt(turn)
+
+        turn = LiveTurn()
+        turn.task = asyncio.create_task(
+            _answer_turn(
+                sender,
+                None,
+                "fr",
+                turn,
+                streaming=FakeTranscriber("développeur Python."),
+                carried=carried,
+            )
+        )
+        await asyncio.sleep(0.01)
+        await _interrupt(turn)
+        return carried
+
+    assert asyncio.run(run()) == "Je suis"
+    assert interviews.transcriptions == ["Je suis", "Je suis développeur Python."]
+    assert not [event for event in sender.events if event["type"] == "error"]
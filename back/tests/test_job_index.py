@@ -0,0 +1,38 @@
+import time
+
+import numpy as np
+
+from app.services.job_index import JobIndex
+
+
+def random_offers(count: int, dim: int = 16, seed: int = 0):
+    vectors = np.random.default_rng(seed).normal(size=(count, dim))
+    return [{"id": f"offer-{i}"} for i in range(count)], vectors
+
+
+def test_trained_index_finds_exact_neighbours():
+    index = JobIndex(ttl_seconds=3600, max_entries=10000, train_threshold=500)
+    jobs, vectors = random_offers(2000)
+    index.add(jobs, vectors)
+    assert index.stats()["lists"] > 0
+
+    found, _ = index.search(vectors[:20], k=5)
+    found_ids = {job["id"] for job in found}
+    # Each query vector is itself in the index, in the list it is closest to
+    assert sum(f"offer-{i}" in found_ids for i in range(20)) == 20
+
+
+def test_upsert_and_expiry():
+    index = JobIndex(ttl_seconds=3600, max_entries=100)
+    jobs, vectors = random_offers(10)
+    index.add(jobs, vectors)
+    index.add([{"id": "offer-0", "intitule": "updated"}], vectors[:1])
+    assert len(index) == 10
+
+    found, _ = index.search(vectors[:1], k=1)
+    assert found[0]["intitule"] == "updated"
+
+    index._seen_at[:] = time.time() - 7200
+    index.add([{"id": "fresh"}], vectors[:1])
+    assert len(index) == 1
+    assert index.search(vectors[:1], k=5)[0] == [{"id": "fresh"}]
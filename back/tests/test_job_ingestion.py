@@ -0,0 +1,116 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models import (  # noqa: F401 (registers related mappers)
+    JobIngestionState,
+    JobOffer,
+    resume_models,
+    user,
+)
+from app.services.job_ingestion_service import JobIngestionService, _parse_date
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    JobOffer.__table__.create(engine)
+    JobIngestionState.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+def make_offer(offer_id, updated_at, title="Développeur Python"):
+    return {
+        "id": offer_id,
+        "intitule": title,
+        "lieuTravail": {"commune": "69123"},
+        "dateCreation": "2025-01-01T08:00:00.000Z",
+        "dateActualisation": updated_at,
+    }
+
+
+def test_parse_date_converts_to_naive_utc():
+    assert _parse_date("2025-01-15T10:23:45.000Z") == datetime(2025, 1, 15, 10, 23, 45)
+    assert _parse_date("2025-01-15T12:00:00+02:00") == datetime(2025, 1, 15, 10, 0)
+    assert _parse_date(None) is None
+    assert _parse_date("not a date") is None
+
+
+def test_published_since_covers_gap_since_high_water_mark():
+    now = datetime.utcnow()
+    assert JobIngestionService._published_since(now - timedelta(hours=5)) == 1
+    assert JobIngestionService._published_since(now - timedelta(days=2)) == 3
+    assert JobIngestionService._published_since(now - timedelta(days=10)) == 14
+    assert JobIngestionService._published_since(now - timedelta(days=90)) == 31
+
+
+def test_upsert_skips_unchanged_and_already_ingested_offers(db):
+    service = JobIngestionService()
+    offers = [
+        make_offer("1", "2025-01-10T00:00:00.000Z"),
+        make_offer("2", "2025-01-11T00:00:00.000Z"),
+    ]
+    assert service._upsert(db, offers, None, "M") == 2
+    db.commit()
+
+    row = db.get(JobOffer, "1")
+    assert row.departement == "69"
+    assert row.grand_domaine == "M"
+    assert row.date_actualisation == datetime(2025, 1, 10)
+
+    # Same content again: nothing to write
+    assert service._upsert(db, offers, None, "M") == 0
+
+    # Only offers updated after the high-water mark are considered
+    updated = [
+        make_offer("1", "2025-01-12T00:00:00.000Z", title="Développeur Django"),
+        make_offer("2", "2025-01-11T00:00:00.000Z", title="Ignored"),
+    ]
+    assert service._upsert(db, updated, datetime(2025, 1, 11), "M") == 1
+    db.commit()
+    assert db.get(JobOffer, "1").intitule == "Développeur Django"
+    assert db.get(JobOffer, "2").intitule == "Développeur Python"
+
+
+def test_refresh_known_offers_updates_changed_and_deletes_withdrawn(db, monkeypatch):
+    from app.services import job_ingestion_service as module
+
+    service = JobIngestionService()
+    stale = datetime.utcnow() - timedelta(days=2)
+    offers = [make_offer(str(i), "2025-01-10T00:00:00.000Z") for i in range(1, 5)]
+    service._upsert(db, offers, None, "M")
+    db.query(JobOffer).update({JobOffer.fetched_at: stale})
+    db.commit()
+
+    class FakeFranceTravail:
+        async def get_offer(self, offer_id):
+            if offer_id == "2":
+                return make_offer("2", "2025-02-01T00:00:00.000Z", title="Lead")
+            if offer_id == "3":
+                return None
+            if offer_id == "4":
+                raise RuntimeError("boom")
+            return make_offer("1", "2025-01-10T00:00:00.000Z")
+
+    class FakeRanking:
+        async def index_offers(self, jobs):
+            return len(jobs)
+
+    monkeypatch.setattr(module, "SessionLocal", lambda: db)
+    monkeypatch.setattr(module, "francetravail_service", FakeFranceTravail())
+    monkeypatch.setattr(module, "ranking_service", FakeRanking())
+    monkeypatch.setattr(db, "close", lambda: None)
+
+    stats = asyncio.run(service.refresh_known_offers())
+
+    assert stats == {"checked": 3, "updated": 1, "deleted": 1}
+    assert db.get(JobOffer, "2").intitule == "Lead"
+    assert db.get(JobOffer, "3") is None
+    # Checked offers move to the back of the queue; the failed one is retried
+    assert db.get(JobOffer, "1").fetched_at > stale
+    assert db.get(JobOffer, "4").fetched_at == stale
@@ -0,0 +1,134 @@
+import asyncio
+from unittest.mock import patch
+
+import numpy as np
+
+from app.core.config import settings
+from app.services.embedding_backends import EmbeddingBackend
+from app.services.embedding_store import EmbeddingStore
+from app.services.job_index import JobIndex
+from app.services.ranking_service import RankingService, top_k
+
+
+class KeywordBackend(EmbeddingBackend):
+    """Deterministic offline backend: one dimension per vocabulary word."""
+
+    name = "keywords"
+    max_batch_size = 4
+    vocabulary = ["python", "java", "cuisine", "vente"]
+
+    def __init__(self, failing_word: str | None = None):
+        self.failing_word = failing_word
+        self.calls = []
+
+    def embed(self, texts: list[str], task_type: str) -> np.ndarray:
+        self.calls.append(len(texts))
+        if self.failing_word and any(self.failing_word in t for t in texts):
+            raise RuntimeError("provider error")
+        return np.array(
+            [[1.0 + t.lower().count(w) * 10 for w in self.vocabulary] for t in texts],
+            dtype=np.float32,
+        )
+
+
+def make_service(backend: EmbeddingBackend, tmp_path=None) -> RankingService:
+    # Injected backend: the configured one (possibly a real model) is never built
+    with (
+        patch.object(settings, "EMBEDDING_CACHE_ENABLED", False),
+        patch.object(settings, "JOB_INDEX_ENABLED", False),
+    ):
+        service = RankingService(backend)
+    service.embedding_store = EmbeddingStore(tmp_path, 100, 1000) if tmp_path else None
+    return service
+
+
+def make_jobs(count: int, word: str = "python") -> list[dict]:
+    return [
+        {"id": f"{word}-{i}", "intitule": f"Dev {word} {i}", "description": "x" * 20}
+        for i in range(count)
+    ]
+
+
+def test_scores_every_job_beyond_one_batch():
+    backend = KeywordBackend()
+    jobs = make_jobs(6) + make_jobs(6, "cuisine")
+    ranked = asyncio.run(
+        make_service(backend).compute_similarity_ranking("python", jobs)
+    )
+
+    assert len(ranked) == 12
+    assert all(job["id"].startswith("python") for job in ranked[:6])
+    assert max(backend.calls) <= backend.max_batch_size
+
+
+def test_failed_batch_keeps_its_jobs_with_zero_score():
+    backend = KeywordBackend(failing_word="vente")
+    jobs = make_jobs(4) + make_jobs(4, "vente")
+    ranked = asyncio.run(
+        make_service(backend).compute_similarity_ranking("python", jobs)
+    )
+
+    assert len(ranked) == 8
+    assert [job["relevance_score"] for job in ranked[4:]] == [0] * 4
+
+
+def test_repeat_search_only_embeds_profile_once_and_no_jobs(tmp_path):
+    backend = KeywordBackend()
+    service = make_service(backend, tmp_path)
+    for _ in range(2):
+        asyncio.run(
+            service.compute_similarity_ranking("python", make_jobs(3), user_id=1)
+        )
+
+    # First search: profile + one job batch; second search: nothing
+    assert backend.calls == [1, 3]
+
+
+def test_best_variation_match_drives_intent_score():
+    backend = KeywordBackend()
+    jobs = make_jobs(2) + make_jobs(2, "java") + make_jobs(2, "vente")
+    ranked = asyncio.run(
+        make_service(backend).compute_similarity_ranking(
+            "cuisine",
+            jobs,
+            query="python",
+            variation_keywords=["python", "java"],
+            limit=4,
+        )
+    )
+
+    assert len(ranked) == 4
+    assert {job["id"].split("-")[0] for job in ranked} == {"python", "java"}
+
+
+def test_top_k_orders_page_and_keeps_ties_stable():
+    scores = np.array([5.0, 9.0, 1.0, 9.0, 7.0])
+    assert list(top_k(scores, 3)) == [1, 3, 4]
+    assert list(top_k(scores)) == [1, 3, 4, 0, 2]
+
+
+def test_job_index_recalls_offers_from_earlier_searches():
+    service = make_service(KeywordBackend())
+    service.job_index = JobIndex(ttl_seconds=3600, max_entries=100)
+    asyncio.run(
+        service.compute_similarity_ranking(
+            "profil", make_jobs(3) + make_jobs(3, "cuisine"), query="python"
+        )
+    )
+
+    recalled = asyncio.run(service.recall_jobs("profil", query="cuisine", limit=3))
+    assert [job["id"].split("-")[0] for job in recalled] == ["cuisine"] * 3
+    assert "relevance_reasoning" not in recalled[0]
+
+
+def test_reranking_recalled_offers_does_not_refresh_their_age():
+    service = make_service(KeywordBackend())
+    service.job_index = JobIndex(ttl_seconds=3600, max_entries=100)
+    asyncio.run(service.compute_similarity_ranking("profil", make_jobs(2)))
+    seen_at = service.job_index._seen_at.copy()
+
+    recalled = asyncio.run(service.recall_jobs("profil", query="python"))
+    assert {job["source"] for job in recalled} == {"index"}
+    asyncio.run(service.compute_similarity_ranking("profil", recalled))
+
+    assert (service.job_index._seen_at == seen_at).all()
@@ -0,0 +1,78 @@
+import asyncio
+
+from app.services.sentence_splitter import SentenceSplitter, iter_sentences
+
+
+def split(chunks: list[str]) -> list[str]:
+    splitter = SentenceSplitter()
+    sentences = []
+    for chunk in chunks:
+        sentences.extend(splitter.feed(chunk))
+    remainder = splitter.flush()
+    if remainder:
+        sentences.append(remainder)
+    return sentences
+
+
+def test_splits_on_french_punctuation():
+    text = "Bonjour. Pouvez-vous vous présenter ? Très bien ! Merci… Parlons-en."
+    assert split([text]) == [
+        "Bonjour.",
+        "Pouvez-vous vous présenter ?",
+        "Très bien !",
+        "Merci…",
+        "Parlons-en.",
+    ]
+
+
+def test_handles_abbreviations_initials_and_numbers():
+    text = "Bonjour M. Dupont, etc. et J. Martin. Le budget est de 3.5 M€. Suivant."
+    assert split([text]) == [
+        "Bonjour M. Dupont, etc. et J. Martin.",
+        "Le budget est de 3.5 M€.",
+        "Suivant.",
+    ]
+
+
+def test_one_letter_words_and_letter_labels_end_sentences():
+    assert split(["Il y en a. Ensuite, parlons de vous."]) == [
+        "Il y en a.",
+        "Ensuite, parlons de vous.",
+    ]
+    assert split(["Vous avez le permis B. Parfait. Allons-y."]) == [
+        "Vous avez le permis B.",
+        "Parfait.",
+        "Allons-y.",
+    ]
+    # Capital initials still do not
+    assert split(["Demandez à A. Martin."]) == ["Demandez à A. Martin."]
+
+
+def test_keeps_closing_guillemets_with_sentence():
+    assert split(["Il a dit « Oui ! » Alors on continue."]) == [
+        "Il a dit « Oui ! »",
+        "Alors on continue.",
+    ]
+
+
+def test_waits_for_lookahead_across_chunks():
+    splitter = SentenceSplitter()
+    assert splitter.feed("Bonjour M.") == []
+    assert splitter.feed(" Dupont. Comment") == ["Bonjour M. Dupont."]
+    assert splitter.flush() == "Comment"
+
+
+def test_token_by_token_stream_matches_whole_text():
+    text = "C'est bien... mais non. 1. Première question\nDeuxième point ? Oui."
+    assert split(list(text)) == split([text])
+
+
+def test_iter_sentences_flushes_remainder():
+    async def chunks():
+        for chunk in ["Première phrase. Deu", "xième sans point"]:
+            yield chunk
+
+    async def collect():
+        return [sentence async for sentence in iter_sentences(chunks())]
+
+    assert asyncio.run(collect()) == ["Première phrase.", "Deuxième sans point"]
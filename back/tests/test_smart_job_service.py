@@ -0,0 +1,250 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.services import smart_job_service as module
+from app.services.smart_job_service import SmartJobService
+
+
+class FakeLocations:
+    """Lookups with per-type latency, recording which ones completed."""
+
+    def __init__(self, regions=(), departments=(), cities=(), delay=0.05):
+        self.results = {
+            "region": list(regions),
+            "departement": list(departments),
+            "commune": list(cities),
+        }
+        self.delay = delay
+        self.completed = []
+
+    async def _lookup(self, kind, delay):
+        await asyncio.sleep(delay)
+        self.completed.append(kind)
+        return self.results[kind]
+
+    def search_regions(self, raw):
+        return self._lookup("region", self.delay)
+
+    def search_departments(self, raw):
+        return self._lookup("departement", self.delay)
+
+    def search_cities(self, raw):
+        return self._lookup("commune", self.delay * 2)
+
+
+LYON = {"nom": "Lyon", "code": "69123", "departement": {"code": "69", "nom": "Rhône"}}
+
+
+def test_resolve_location_runs_lookups_concurrently(monkeypatch):
+    class BarrierLocations(FakeLocations):
+        """Each lookup waits until all three have started: sequential would hang."""
+
+        def __init__(self, **kwargs):
+            super().__init__(**kwargs)
+            self.started = 0
+            self.all_started = asyncio.Event()
+
+        async def _lookup(self, kind, delay):
+            self.started += 1
+            if self.started == 3:
+                self.all_started.set()
+            await asyncio.wait_for(self.all_started.wait(), timeout=1)
+            return await super()._lookup(kind, 0)
+
+    locations = BarrierLocations(cities=[LYON])
+    monkeypatch.setattr(module, "location_service", locations)
+
+    params, meta = asyncio.run(SmartJobService()._resolve_location("Lyon", "unknown"))
+
+    assert params == {"location": "69123"}
+    assert meta == {"dept": "69"}
+    assert locations.started == 3
+
+
+def test_resolve_location_prefers_region_and_cancels_other_lookups(monkeypatch):
+    locations = FakeLocations(
+        regions=[{"nom": "Bretagne", "code": "53"}], cities=[LYON]
+    )
+    monkeypatch.setattr(module, "location_service", locations)
+
+    params, meta = asyncio.run(
+        SmartJobService()._resolve_location("Bretagne", "unknown")
+    )
+
+    assert params == {"region": "53"}
+    assert meta == {}
+    assert "commune" not in locations.completed
+
+
+def test_search_variation_adds_department_search_for_cities(monkeypatch):
+    monkeypatch.setattr(module, "location_service", FakeLocations(cities=[LYON]))
+    service = SmartJobService()
+    searches = []
+
+    async def search(on_page=None, **params):
+        searches.append(params)
+        return [{"id": str(len(searches))}]
+
+    service._search_and_prefetch = search
+    variation = SimpleNamespace(
+        keywords="python", location_raw="Lyon", location_type="commune"
+    )
+
+    location, meta, results = asyncio.run(service._search_variation(variation))
+
+    assert location == {"location": "69123"}
+    assert [
+        search.get("location") or search.get("departement") for search in searches
+    ] == [
+        "69123",
+        "69",
+    ]
+    assert results == [[{"id": "1"}], [{"id": "2"}]]
+
+
+class FakeDSPy:
+    async def apredict_params(self, query, profile):
+        return [
+            SimpleNamespace(keywords="python", location_raw=None),
+            SimpleNamespace(keywords="django", location_raw=None),
+        ]
+
+
+class FakeFranceTravail:
+    PAGES = {"python": [["p1", "p2"], ["p3"]], "django": [["p2", "d1"]]}
+
+    async def iter_job_pages(self, keywords, max_results=None, **params):
+        for page in self.PAGES[keywords]:
+            await asyncio.sleep(0.01 if keywords == "python" else 0.03)
+            yield [{"id": job_id, "intitule": job_id} for job_id in page]
+
+
+class FakeRanking:
+    def __init__(self):
+        self.indexed = []
+
+    async def recall_jobs(self, profile, query, user_id=None):
+        return [{"id": "p1"}, {"id": "i1", "lieuTravail": {"commune": "69123"}}]
+
+    async def prefetch_embeddings(self, jobs):
+        pass
+
+    async def compute_similarity_ranking(self, profile, jobs, **kwargs):
+        self.indexed.append(kwargs.get("index_jobs", True))
+        ranked = sorted(jobs, key=lambda job: job["id"])
+        for score, job in enumerate(reversed(ranked)):
+            job["relevance_score"] = score
+        return ranked
+
+
+def collect_stream(user):
+    async def collect():
+        return [event async for event in SmartJobService().smart_search_stream(user)]
+
+    return asyncio.run(collect())
+
+
+def test_smart_search_stream_emits_jobs_then_rankings(monkeypatch):
+    ranking = FakeRanking()
+    monkeypatch.setattr(module, "dspy_job_service", FakeDSPy())
+    monkeypatch.setattr(module, "francetravail_service", FakeFranceTravail())
+    monkeypatch.setattr(module, "ranking_service", ranking)
+    user = SimpleNamespace(
+        id=1,
+        applications=[SimpleNamespace(job_id="d1")],
+        skills_list=[],
+        work_experiences=[],
+        projects=[],
+    )
+
+    events = collect_stream(user)
+
+    assert [(event["type"], event.get("source")) for event in events] == [
+        ("jobs", "index"),
+        ("jobs", "search"),
+        ("jobs", "search"),
+        ("ranking", None),
+        ("jobs", "search"),
+        ("done", None),
+    ]
+    # The local index streams first; a live copy of an indexed offer replaces it
+    assert [job["id"] for job in events[0]["jobs"]] == ["p1", "i1"]
+    assert [job["id"] for job in events[1]["jobs"]] == ["p1", "p2"]
+    assert events[3]["jobs"][0] == {"id": "i1", "relevance_score": 3}
+
+    final = events[-1]["jobs"]
+    assert [job["id"] for job in final] == ["d1", "i1", "p1", "p2", "p3"]
+    assert [job["is_applied"] for job in final] == [True, False, False, False, False]
+    assert final[2]["intitule"] == "p1"
+    # Only the final ranking feeds the job index
+    assert ranking.indexed == [False, True]
+
+
+def test_smart_search_stream_withdraws_indexed_offers_outside_scopes(monkeypatch):
+    class ScopedDSPy:
+        async def apredict_params(self, query, profile):
+            return [
+                SimpleNamespace(
+                    keywords="python", location_raw="75", location_type="departement"
+                )
+            ]
+
+    monkeypatch.setattr(module, "dspy_job_service", ScopedDSPy())
+    monkeypatch.setattr(module, "francetravail_service", FakeFranceTravail())
+    monkeypatch.setattr(module, "ranking_service", FakeRanking())
+    monkeypatch.setattr(
+        module,
+        "location_service",
+        FakeLocations(departments=[{"nom": "Paris", "code": "75"}]),
+    )
+    user = SimpleNamespace(
+        id=1, applications=[], skills_list=[], work_experiences=[], projects=[]
+    )
+
+    events = collect_stream(user)
+
+    assert [event["type"] for event in events[:2]] == ["jobs", "removed"]
+    assert events[0]["source"] == "index"
+    assert events[1]["ids"] == ["p1", "i1"]
+    assert [job["id"] for job in events[-1]["jobs"]] == ["p1", "p2", "p3"]
+
+
+def test_smart_search_stream_keeps_indexed_offers_for_region_scopes(monkeypatch):
+    class RegionDSPy:
+        async def apredict_params(self, query, profile):
+            return [
+                SimpleNamespace(
+                    keywords="python", location_raw="Bretagne", location_type="region"
+                )
+            ]
+
+    monkeypatch.setattr(module, "dspy_job_service", RegionDSPy())
+    monkeypatch.setattr(module, "francetravail_service", FakeFranceTravail())
+    monkeypatch.setattr(module, "ranking_service", FakeRanking())
+    monkeypatch.setattr(
+        module,
+        "location_service",
+        FakeLocations(regions=[{"nom": "Bretagne", "code": "53"}]),
+    )
+    user = SimpleNamespace(
+        id=1, applications=[], skills_list=[], work_experiences=[], projects=[]
+    )
+
+    events = collect_stream(user)
+
+    # Offers cannot be checked against a region: nothing is withdrawn
+    assert "removed" not in [event["type"] for event in events]
+    assert [job["id"] for job in events[-1]["jobs"]] == ["i1", "p1", "p2", "p3"]
+
+
+def test_smart_search_returns_the_final_ranking(monkeypatch):
+    monkeypatch.setattr(module, "dspy_job_service", FakeDSPy())
+    monkeypatch.setattr(module, "francetravail_service", FakeFranceTravail())
+    monkeypatch.setattr(module, "ranking_service", FakeRanking())
+    user = SimpleNamespace(
+        id=1, applications=[], skills_list=[], work_experiences=[], projects=[]
+    )
+
+    jobs = asyncio.run(SmartJobService().smart_search(user, "python"))
+
+    assert [job["id"] for job in jobs] == ["d1", "i1", "p1", "p2", "p3"]
@@ -0,0 +1,92 @@
+import asyncio
+import io
+import wave
+
+import numpy as np
+import pytest
+
+from app.services.streaming_transcriber import (
+    IncompleteTranscriptionError,
+    StreamingTranscriber,
+)
+
+RATE = 16000
+
+
+def tone(ms: int) -> bytes:
+    t = np.arange(int(RATE * ms / 1000)) / RATE
+    return (np.sin(2 * np.pi * 220 * t) * 8000).astype("<i2").tobytes()
+
+
+def silence(ms: int) -> bytes:
+    return np.zeros(int(RATE * ms / 1000), dtype="<i2").tobytes()
+
+
+def test_segments_on_pauses_and_stitches_in_order():
+    durations = []
+    partials = []
+
+    async def transcribe(wav: bytes) -> str:
+        with wave.open(io.BytesIO(wav)) as reader:
+            ms = reader.getnframes() * 1000 // reader.getframerate()
+        durations.append(ms)
+        index = len(durations)
+        # Later segments finish first; the stitched text must stay in order
+        await asyncio.sleep(0.05 if index == 1 else 0)
+        return f"segment{index}"
+
+    async def on_partial(text: str):
+        partials.append(text)
+
+    async def run() -> str:
+        transcriber = StreamingTranscriber(transcribe, RATE, on_partial=on_partial)
+        audio = silence(500) + tone(1000) + silence(1000) + tone(600) + silence(200)
+        for start in range(0, len(audio), 3200):
+            transcriber.feed(audio[start : start + 3200])
+        return await transcriber.finish()
+
+    assert asyncio.run(run()) == "segment1 segment2"
+    assert len(durations) == 2
+    # Speech plus at most the pre-roll and trailing padding
+    assert 1000 <= durations[0] <= 1700
+    assert partials[-1] == "segment1 segment2"
+
+
+def test_silence_only_produces_no_segments():
+    async def transcribe(wav: bytes) -> str:
+        raise AssertionError("silence should not be transcribed")
+
+    async def run() -> str:
+        transcriber = StreamingTranscriber(transcribe, RATE)
+        transcriber.feed(silence(3000))
+        return await transcriber.finish()
+
+    assert asyncio.run(run()) == ""
+
+
+def test_failed_segment_is_retried_then_reported():
+    calls = []
+
+    async def transcribe(wav: bytes) -> str:
+        calls.append(1)
+        if len(calls) <= 3:  # segment 1: both attempts fail; segment 2: first fails
+            raise RuntimeError("stt down")
+        return "ok"
+
+    async def run() -> str:
+        transcriber = StreamingTranscriber(transcribe, RATE, max_concurrency=1)
+        transcriber.feed(tone(600) + silence(1000) + tone(600) + silence(1000))
+        return await transcriber.finish()
+
+    with pytest.raises(IncompleteTranscriptionError):
+        asyncio.run(run())
+    assert len(calls) == 4
+
+
+def test_rejects_unsupported_sample_rates():
+    async def transcribe(wav: bytes) -> str:
+        return ""
+
+    for rate in (0, -16000, 12345):
+        with pytest.raises(ValueError):
+            StreamingTranscriber(transcribe, rate)
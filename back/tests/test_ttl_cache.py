@@ -0,0 +1,75 @@
+import asyncio
+
+import pytest
+
+from app.services.ttl_cache import AsyncTTLCache
+
+
+def make_fetch(calls: list, value, delay: float = 0.01):
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if isinstance(value, Exception):
+            raise value
+        return value
+
+    return fetch
+
+
+def test_concurrent_lookups_share_one_fetch():
+    cache = AsyncTTLCache(max_entries=10, ttl_seconds=60, negative_ttl_seconds=5)
+    calls = []
+
+    async def run():
+        fetch = make_fetch(calls, ["Lyon"])
+        results = await asyncio.gather(
+            *(cache.get_or_fetch("lyon", fetch) for _ in range(5))
+        )
+        results.append(await cache.get_or_fetch("lyon", fetch))
+        return results
+
+    assert asyncio.run(run()) == [["Lyon"]] * 6
+    assert len(calls) == 1
+    assert cache.stats() == {
+        "hits": 1,
+        "negative_hits": 0,
+        "coalesced": 4,
+        "misses": 1,
+        "hit_rate": 0.833,
+        "entries": 1,
+    }
+
+
+def test_misses_expire_before_hits():
+    cache = AsyncTTLCache(max_entries=10, ttl_seconds=60, negative_ttl_seconds=0.05)
+    calls = []
+
+    async def run():
+        await cache.get_or_fetch("sud", make_fetch(calls, []))
+        await cache.get_or_fetch("sud", make_fetch(calls, []))
+        await cache.get_or_fetch("paris", make_fetch(calls, ["Paris"]))
+        await asyncio.sleep(0.06)
+        await cache.get_or_fetch("sud", make_fetch(calls, []))
+        await cache.get_or_fetch("paris", make_fetch(calls, ["Paris"]))
+
+    asyncio.run(run())
+    assert len(calls) == 3
+    assert cache.negative_hits == 1
+
+
+def test_errors_are_not_cached_and_lru_is_bounded():
+    cache = AsyncTTLCache(max_entries=2, ttl_seconds=60, negative_ttl_seconds=5)
+    calls = []
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            await cache.get_or_fetch("a", make_fetch(calls, RuntimeError("down")))
+        assert await cache.get_or_fetch("a", make_fetch(calls, ["A"])) == ["A"]
+        await cache.get_or_fetch("b", make_fetch(calls, ["B"]))
+        await cache.get_or_fetch("a", make_fetch(calls, ["A"]))
+        await cache.get_or_fetch("c", make_fetch(calls, ["C"]))
+        # "b" was least recently used
+        await cache.get_or_fetch("b", make_fetch(calls, ["B"]))
+
+    asyncio.run(run())
+    assert len(calls) == 5
@@ -0,0 +1,92 @@
+import asyncio
+import threading
+
+from app.services import tts_cache as module
+from app.services.tts_cache import TTSAudioCache
+
+
+async def collect(cache: TTSAudioCache, key: str, chunk_size: int = 4) -> bytes | None:
+    audio = await cache.get(key)
+    if audio is None:
+        return None
+    return b"".join([chunk async for chunk in cache.iter_chunks(audio, chunk_size)])
+
+
+def test_key_depends_on_voice_and_options():
+    base = TTSAudioCache.make_key("Bonjour", "edge", "fr-FR-DeniseNeural", "+0%")
+    assert base == TTSAudioCache.make_key(
+        "Bonjour", "edge", "fr-FR-DeniseNeural", "+0%"
+    )
+    assert base != TTSAudioCache.make_key("Bonjour", "edge", "fr-FR-HenriNeural", "+0%")
+    assert base != TTSAudioCache.make_key(
+        "Bonjour", "edge", "fr-FR-DeniseNeural", "+10%"
+    )
+
+
+def test_memory_tier_evicts_least_recently_used():
+    cache = TTSAudioCache(cache_dir=None, max_memory_bytes=10, max_disk_bytes=0)
+    asyncio.run(cache.put("a", b"aaaa"))
+    asyncio.run(cache.put("b", b"bbbb"))
+    assert asyncio.run(cache.get("a")) == b"aaaa"  # "b" is now least recently used
+    asyncio.run(cache.put("c", b"cccc"))
+
+    assert asyncio.run(cache.get("b")) is None
+    assert asyncio.run(cache.get("a")) == b"aaaa"
+    assert asyncio.run(cache.get("c")) == b"cccc"
+    assert cache.stats()["misses"] == 1
+
+
+def test_disk_tier_survives_restart_and_streams_in_chunks(tmp_path):
+    cache = TTSAudioCache(tmp_path, max_memory_bytes=1024, max_disk_bytes=1024)
+    asyncio.run(cache.put("key", b"0123456789"))
+
+    fresh = TTSAudioCache(tmp_path, max_memory_bytes=1024, max_disk_bytes=1024)
+    assert asyncio.run(collect(fresh, "key")) == b"0123456789"
+    assert fresh.stats()["disk_hits"] == 1
+    assert asyncio.run(collect(fresh, "missing")) is None
+    assert fresh.stats()["misses"] == 1
+
+
+def test_disk_tier_is_size_bounded(tmp_path):
+    cache = TTSAudioCache(tmp_path, max_memory_bytes=0, max_disk_bytes=25)
+    for key in ["k1", "k2", "k3"]:
+        asyncio.run(cache.put(key, b"x" * 10))
+
+    assert cache.stats()["disk_bytes"] <= 25
+    assert len(list(tmp_path.glob("*/*.mp3"))) == 2
+
+
+def test_concurrent_puts_keep_disk_size_exact(tmp_path):
+    cache = TTSAudioCache(tmp_path, max_memory_bytes=0, max_disk_bytes=10_000)
+
+    async def put_all():
+        await asyncio.gather(*(cache.put(f"k{i}", b"x" * 10) for i in range(50)))
+
+    asyncio.run(put_all())
+
+    on_disk = sum(path.stat().st_size for path in tmp_path.glob("*/*.mp3"))
+    assert cache.stats()["disk_bytes"] == on_disk == 500
+
+
+def test_racing_puts_of_one_key_count_its_bytes_once(tmp_path, monkeypatch):
+    cache = TTSAudioCache(tmp_path, max_memory_bytes=0, max_disk_bytes=10_000)
+    # Both writers pass the fast exists check before either renames its file
+    barrier = threading.Barrier(2)
+    mkstemp = module.tempfile.mkstemp
+
+    def synchronized_mkstemp(*args, **kwargs):
+        barrier.wait(timeout=5)
+        return mkstemp(*args, **kwargs)
+
+    monkeypatch.setattr(module.tempfile, "mkstemp", synchronized_mkstemp)
+    writers = [
+        threading.Thread(target=cache._write_to_disk, args=("key", b"x" * 10))
+        for _ in range(2)
+    ]
+    for writer in writers:
+        writer.start()
+    for writer in writers:
+        writer.join()
+
+    assert cache.stats()["disk_bytes"] == 10
+    assert [path.name for path in tmp_path.glob("*/*")] == ["key.mp3"]